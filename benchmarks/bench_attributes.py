@@ -0,0 +1,70 @@
+"""
+Compare `attributes` and `attributes_many`, which read values with accessors compiled once per
+type and keys, with the previous implementation reading every key with getattr, then by key.
+
+Run with `PYTHONPATH=. python benchmarks/bench_attributes.py`.
+"""
+import timeit
+
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, List
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZE = 10_000
+
+KEYS = ['name', 'origin', 'rating', 'is_spicy']
+
+DishTuple = namedtuple('DishTuple', KEYS)
+
+
+@dataclass
+class DishRecord:
+    name: str
+    origin: str
+    rating: float
+    is_spicy: bool
+
+
+def legacy_attributes(builder: SpytulaBuilder, obj: Any, keys: List[str]) -> None:
+    for key in keys:
+        try:
+            builder.attribute(key, getattr(obj, key))
+        except AttributeError:
+            builder.attribute(key, obj[key])
+
+
+def legacy(records: List[Any]) -> None:
+    builder = SpytulaBuilder()
+    for dish_builder, record in builder.each('dishes', records):
+        legacy_attributes(dish_builder, record, KEYS)
+
+
+def compiled(records: List[Any]) -> None:
+    builder = SpytulaBuilder()
+    for dish_builder, record in builder.each('dishes', records):
+        dish_builder.attributes(record, KEYS)
+
+
+def many(records: List[Any]) -> None:
+    SpytulaBuilder().attributes_many('dishes', records, KEYS)
+
+
+def main() -> None:
+    workloads = {
+        'dict': [{'name': f'Ramen {i}', 'origin': 'Japan', 'rating': 4.5, 'is_spicy': i % 2 == 0}
+                 for i in range(SIZE)],
+        'dataclass': [DishRecord(f'Ramen {i}', 'Japan', 4.5, i % 2 == 0) for i in range(SIZE)],
+        'namedtuple': [DishTuple(f'Ramen {i}', 'Japan', 4.5, i % 2 == 0) for i in range(SIZE)],
+    }
+    print(f"{'records':>12} {'legacy (s)':>12} {'attributes (s)':>16} {'attributes_many (s)':>20}")
+    for name, records in workloads.items():
+        timings = [min(timeit.repeat(lambda: function(records), number=1, repeat=5))
+                   for function in (legacy, compiled, many)]
+        print(f"{name:>12} {timings[0]:>12.4f} {timings[1]:>16.4f} {timings[2]:>20.4f}")
+
+
+if __name__ == '__main__':
+    main()
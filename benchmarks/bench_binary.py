@@ -0,0 +1,59 @@
+"""
+Compare the encoding time and payload size of MessagePack and CBOR with JSON, on the same builders.
+
+Run with `PYTHONPATH=. python benchmarks/bench_binary.py`. The msgpack and cbor2 libraries are
+used when they are installed, and the pure-Python writers are always measured by `dump_*`.
+"""
+import io
+import timeit
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZES = [1_000, 10_000]
+
+INGREDIENTS = [
+    {'name': 'Noodles', 'type': 'Main', 'weight': 120},
+    {'name': 'Pork', 'type': 'Protein', 'weight': 80},
+    {'name': 'Eggs', 'type': 'Topping', 'weight': 50},
+    {'name': 'Miso', 'type': 'Flavoring', 'weight': 15},
+]
+
+
+def build(size: int) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    for dish_builder, index in builder.each('all_dishes', range(size)):
+        dish_builder.attribute('dish_name', f'Ramen {index}')
+        dish_builder.attribute('average_rating', 4.5)
+        dish_builder.attribute('is_spicy', index % 2 == 0)
+        for ingredient_builder, ingredient in dish_builder.each('main_ingredients', INGREDIENTS):
+            ingredient_builder.attribute('ingredient_name', ingredient['name'])
+            ingredient_builder.attribute('ingredient_weight', ingredient['weight'])
+    return builder
+
+
+def main() -> None:
+    print(f"{'dishes':>8} {'method':>14} {'time (s)':>10} {'size (KB)':>10}")
+    for size in SIZES:
+        builder = build(size)
+        methods = {
+            'to_json': builder.to_json_bytes,
+            'to_msgpack': builder.to_msgpack,
+            'dump_msgpack': lambda: builder.dump_msgpack(io.BytesIO()),
+            'to_cbor': builder.to_cbor,
+            'dump_cbor': lambda: builder.dump_cbor(io.BytesIO()),
+        }
+        sizes = {
+            'to_json': len(builder.to_json_bytes()),
+            'to_msgpack': len(builder.to_msgpack()),
+            'to_cbor': len(builder.to_cbor()),
+        }
+        sizes['dump_msgpack'], sizes['dump_cbor'] = sizes['to_msgpack'], sizes['to_cbor']
+        for name, method in methods.items():
+            elapsed = min(timeit.repeat(method, number=1, repeat=5))
+            print(f"{size:>8} {name:>14} {elapsed:>10.4f} {sizes[name] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
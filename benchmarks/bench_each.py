@@ -0,0 +1,31 @@
+"""
+Measure how `SpytulaBuilder.each` scales with the number of items.
+
+Run with `PYTHONPATH=. python benchmarks/bench_each.py`. The time per item should stay
+roughly constant as the collection grows.
+"""
+import timeit
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZES = [1_000, 10_000, 50_000, 100_000]
+
+
+def render(size: int) -> None:
+    builder = SpytulaBuilder()
+    rows = ({'id': i, 'name': f'Ingredient {i}'} for i in range(size))
+    for ingredient_builder, ingredient in builder.each('ingredients', rows):
+        ingredient_builder.attribute('id', ingredient['id'])
+        ingredient_builder.attribute('name', ingredient['name'])
+
+
+def main() -> None:
+    print(f"{'items':>10} {'total (s)':>12} {'per item (µs)':>15}")
+    for size in SIZES:
+        total = min(timeit.repeat(lambda: render(size), number=1, repeat=3))
+        print(f"{size:>10} {total:>12.4f} {total / size * 1e6:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
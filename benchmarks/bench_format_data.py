@@ -0,0 +1,62 @@
+"""
+Compare the throughput of the iterative `_format_data` with the former recursive version.
+
+Run with `PYTHONPATH=. python benchmarks/bench_format_data.py`.
+"""
+import timeit
+
+from collections import OrderedDict
+from typing import Any
+
+from spytula.builder import SpytulaBuilder
+
+
+def recursive_format_data(builder: SpytulaBuilder, data: Any) -> Any:
+    if isinstance(data, dict):
+        formatted_data = OrderedDict()
+        for key, value in data.items():
+            formatted_key = builder._format_key(key)
+            if isinstance(value, (dict, list)):
+                formatted_value = recursive_format_data(builder, value)
+            else:
+                formatted_value = value
+            formatted_data[formatted_key] = formatted_value
+        return formatted_data
+    elif isinstance(data, list):
+        return [recursive_format_data(builder, value) for value in data]
+    else:
+        return data
+
+
+def wide_tree(width: int) -> dict:
+    return {
+        'menu_items': [
+            {'item_id': i, 'item_name': 'Ramen', 'item_price': {'price_amount': 12.5, 'price_currency': 'EUR'}}
+            for i in range(width)
+        ]
+    }
+
+
+def deep_tree(depth: int) -> dict:
+    data = current = {}
+    for _ in range(depth):
+        current['child_node'] = current = {'node_value': 1}
+    return data
+
+
+def main() -> None:
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    scenarios = [('wide (50k items)', wide_tree(50_000)), ('deep (900 levels)', deep_tree(900))]
+    print(f"{'scenario':<20} {'recursive (s)':>14} {'iterative (s)':>14}")
+    for name, data in scenarios:
+        recursive = min(timeit.repeat(lambda: recursive_format_data(builder, data), number=3, repeat=3))
+        iterative = min(timeit.repeat(lambda: builder._format_data(data), number=3, repeat=3))
+        print(f"{name:<20} {recursive:>14.4f} {iterative:>14.4f}")
+    deep = deep_tree(100_000)
+    iterative = min(timeit.repeat(lambda: builder._format_data(deep), number=1, repeat=3))
+    print(f"{'deep (100k levels)':<20} {'RecursionError':>14} {iterative:>14.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Measure the memory allocated by `to_json` with and without key formatting.
+
+Run with `PYTHONPATH=. python benchmarks/bench_format_memory.py [size in MB]`. The size
+defaults to 10 MB of JSON output; use 100 for a 100 MB-scale document.
+"""
+import sys
+import tracemalloc
+
+from spytula.builder import SpytulaBuilder
+
+
+ROW_SIZE = 96
+
+
+def build(size_mb: int) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    with builder.node('order_items') as items:
+        for row in range(size_mb * (1 << 20) // ROW_SIZE):
+            with items.node(f'order_item_{row}') as item:
+                item.attribute('item_id', row)
+                with item.node('item_details') as details:
+                    details.attribute('product_name', 'Ramen')
+                    details.attribute('unit_price', 12.5)
+    return builder
+
+
+def measure(builder: SpytulaBuilder) -> tuple:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    formatted_data = builder._format_data(builder.data)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del formatted_data
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return blocks, peak
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    scenarios = [
+        ('no key format', {}),
+        ('key format, copy', {'camelize': {'uppercase_first_letter': False}}),
+        ('key format, in place', {'in_place': True, 'camelize': {'uppercase_first_letter': False}}),
+    ]
+    print(f"{'scenario':<24} {'allocations':>12} {'peak (MB)':>10}")
+    for name, options in scenarios:
+        builder = build(size_mb)
+        if options:
+            builder.key_format(**options)
+        blocks, peak = measure(builder)
+        print(f"{name:<24} {blocks:>12} {peak / (1 << 20):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
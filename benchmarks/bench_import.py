@@ -0,0 +1,38 @@
+"""
+Measure the time needed to import spytula, with `python -X importtime`.
+
+Run with `PYTHONPATH=. python benchmarks/bench_import.py`. The script exits with a non-zero
+status when the median import time exceeds the budget.
+"""
+import os
+import subprocess
+import sys
+
+
+RUNS = 10
+
+# Generous budget for the cumulative import time of spytula, in microseconds
+IMPORT_TIME_BUDGET = 150_000
+
+
+def import_time() -> int:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import spytula'],
+                            capture_output=True, text=True, env=env, check=True)
+    for line in result.stderr.splitlines():
+        columns = line.split('|')
+        if len(columns) == 3 and columns[2].strip() == 'spytula':
+            return int(columns[1])
+    raise RuntimeError('spytula was not imported')
+
+
+def main() -> None:
+    times = sorted(import_time() for _ in range(RUNS))
+    median = times[RUNS // 2]
+    print(f"import spytula: min {times[0] / 1000:.1f} ms, median {median / 1000:.1f} ms")
+    if median > IMPORT_TIME_BUDGET:
+        sys.exit(f"The median import time exceeds the budget of {IMPORT_TIME_BUDGET / 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare the JSON backends on the ramen payloads of `docs/usage.md`, scaled up.
+
+Run with `PYTHONPATH=. python benchmarks/bench_json_backends.py`. Backends that are not
+installed are skipped.
+"""
+import timeit
+
+from spytula.builder import SpytulaBuilder
+from spytula.serializers.backends import get_json_backend
+
+
+SIZES = [1_000, 10_000, 100_000]
+
+BACKENDS = ['json', 'orjson', 'ujson']
+
+INGREDIENTS = [
+    {'name': 'Noodles', 'type': 'Main'},
+    {'name': 'Pork', 'type': 'Protein'},
+    {'name': 'Eggs', 'type': 'Topping'},
+    {'name': 'Miso', 'type': 'Flavoring'},
+]
+
+
+def build(size: int) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    for dish_builder, index in builder.each('dishes', range(size)):
+        dish_builder.attribute('name', f'Ramen {index}')
+        dish_builder.attribute('origin', 'Japan')
+        dish_builder.attribute('rating', 4.5)
+        for ingredient_builder, ingredient in dish_builder.each('ingredients', INGREDIENTS):
+            ingredient_builder.attribute('name', ingredient['name'])
+            ingredient_builder.attribute('type', ingredient['type'].upper())
+    return builder
+
+
+def main() -> None:
+    backends = []
+    for name in BACKENDS:
+        try:
+            get_json_backend(name)
+            backends.append(name)
+        except ImportError:
+            print(f"{name} is not installed, skipping")
+    print(f"{'dishes':>8} {'backend':>8} {'to_json (s)':>12} {'to_json_bytes (s)':>18} {'indent=2 (s)':>13}")
+    for size in SIZES:
+        builder = build(size)
+        for name in backends:
+            text = min(timeit.repeat(lambda: builder.to_json(backend=name), number=1, repeat=5))
+            binary = min(timeit.repeat(lambda: builder.to_json_bytes(backend=name), number=1, repeat=5))
+            indented = min(timeit.repeat(lambda: builder.to_json(backend=name, indent=2), number=1, repeat=5))
+            print(f"{size:>8} {name:>8} {text:>12.4f} {binary:>18.4f} {indented:>13.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare building a list with slow lookups evaluated serially, with lazy values resolved
+concurrently in a thread pool, and with a batch loading every key at once.
+
+Run with `PYTHONPATH=. python benchmarks/bench_lazy.py`. Lookups sleep to simulate the
+latency of a cache or of another service.
+"""
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from spytula import Batch, lazy
+from spytula.builder import SpytulaBuilder
+
+
+SIZE = 100
+
+LATENCY = 0.005
+
+
+def fetch_stats(dish_id: int) -> dict:
+    time.sleep(LATENCY)
+    return {'view_count': dish_id * 10}
+
+
+def fetch_many_stats(dish_ids: List[int]) -> List[dict]:
+    time.sleep(LATENCY)
+    return [{'view_count': dish_id * 10} for dish_id in dish_ids]
+
+
+def serial() -> str:
+    builder = SpytulaBuilder()
+    for dish_builder, dish_id in builder.each('dishes', range(SIZE)):
+        dish_builder.attribute('id', dish_id)
+        dish_builder.attribute('stats', fetch_stats(dish_id))
+    return builder.to_json()
+
+
+def concurrent(executor: ThreadPoolExecutor) -> str:
+    builder = SpytulaBuilder()
+    builder.lazy_executor(executor)
+    for dish_builder, dish_id in builder.each('dishes', range(SIZE)):
+        dish_builder.attribute('id', dish_id)
+        dish_builder.attribute('stats', lazy(fetch_stats, dish_id))
+    return builder.to_json()
+
+
+def batched() -> str:
+    stats = Batch(fetch_many_stats)
+    builder = SpytulaBuilder()
+    for dish_builder, dish_id in builder.each('dishes', range(SIZE)):
+        dish_builder.attribute('id', dish_id)
+        dish_builder.attribute('stats', stats.load(dish_id))
+    return builder.to_json()
+
+
+def measure(name: str, operation) -> None:
+    started = time.perf_counter()
+    output = operation()
+    print(f"{name:>24} {time.perf_counter() - started:>10.4f} {len(output):>10}")
+
+
+def main() -> None:
+    print(f"{'method':>24} {'time (s)':>10} {'size':>10}")
+    measure('serial', serial)
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        measure('lazy (32 threads)', lambda: concurrent(executor))
+    measure('batch', batched)
+
+
+if __name__ == '__main__':
+    main()
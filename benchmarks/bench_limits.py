@@ -0,0 +1,53 @@
+"""
+Compare rendering a builder whose list is much longer than its limits: without limits,
+truncated while building, and checked at serialization only, then estimating its size
+and serializing it with a `max_bytes` limit it fits in.
+
+Run with `PYTHONPATH=. python benchmarks/bench_limits.py`.
+"""
+import timeit
+
+from typing import Any, Dict
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZE = 100_000
+
+MAX_ITEMS = 100
+
+
+def render(**limits: Any) -> str:
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    if limits:
+        builder.limits(**limits)
+    for dish_builder, index in builder.each('all_dishes', range(SIZE)):
+        dish_builder.attribute('dish_id', index)
+        dish_builder.attribute('dish_name', f'Ramen {index}')
+    return builder.to_json()
+
+
+def main() -> None:
+    cases: Dict[str, Dict[str, Any]] = {
+        'no limits': {},
+        'max_items (truncate)': {'max_items': MAX_ITEMS, 'overflow': 'truncate'},
+        'max_bytes (truncate)': {'max_bytes': MAX_ITEMS * 40, 'overflow': 'truncate'},
+    }
+    print(f"{'limits':>24} {'time (s)':>10} {'size':>10}")
+    for label, limits in cases.items():
+        elapsed = min(timeit.repeat(lambda: render(**limits), number=1, repeat=3))
+        print(f'{label:>24} {elapsed:>10.4f} {len(render(**limits)):>10}')
+    builder = SpytulaBuilder()
+    builder.attribute('all_dishes', [{'dish_id': index, 'dish_name': f'Ramen {index}'} for index in range(SIZE)])
+    elapsed = min(timeit.repeat(builder.estimated_size, number=1, repeat=3))
+    print(f"{'estimated_size':>24} {elapsed:>10.4f} {builder.estimated_size():>10}")
+    elapsed = min(timeit.repeat(builder.to_json, number=1, repeat=3))
+    print(f"{'to_json':>24} {elapsed:>10.4f} {len(builder.to_json()):>10}")
+    builder.limits(max_bytes=len(builder.to_json()))
+    elapsed = min(timeit.repeat(builder.to_json, number=1, repeat=3))
+    print(f"{'to_json (max_bytes)':>24} {elapsed:>10.4f} {len(builder.to_json()):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare editing one value of a large JSON file by loading it with `json.load` and merging it
+into a builder, with editing it with `SpytulaBuilder.load_json`.
+
+Run with `PYTHONPATH=. python benchmarks/bench_loading.py`.
+"""
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from typing import Callable, Tuple
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZE = 200_000
+
+
+def edit_with_json_load(source: str, target: str) -> None:
+    with open(source, 'rb') as fp:
+        data = json.load(fp)
+    builder = SpytulaBuilder()
+    builder.merge(data)
+    with builder.node('menu_stats') as stats:
+        stats.attribute('view_count', 1)
+    with open(target, 'w') as fp:
+        builder.dump_json(fp)
+
+
+def edit_with_load_json(source: str, target: str) -> None:
+    with open(source, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    with builder.node('menu_stats') as stats:
+        stats.attribute('view_count', 1)
+    with open(target, 'w') as fp:
+        builder.dump_json(fp)
+
+
+def measure(edit: Callable[[str, str], None], source: str, target: str) -> Tuple[float, int]:
+    started = time.perf_counter()
+    edit(source, target)
+    elapsed = time.perf_counter() - started
+    # Memory is measured separately, since tracing slows allocations down
+    tracemalloc.start()
+    edit(source, target)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'menu.json')
+        target = os.path.join(directory, 'menu.new.json')
+        dishes = [{'dish_id': index, 'dish_name': f'Ramen {index}', 'tags': ['hot', 'noodles']}
+                  for index in range(SIZE)]
+        with open(source, 'w') as fp:
+            json.dump({'menu_title': 'Menu', 'menu_stats': {'view_count': 0}, 'all_dishes': dishes}, fp)
+        print(f'document: {os.path.getsize(source) / 1e6:.1f} MB')
+        print(f"{'method':>28} {'time (s)':>10} {'peak (MB)':>10}")
+        for label, edit in (('json.load + merge', edit_with_json_load), ('load_json', edit_with_load_json)):
+            elapsed, peak = measure(edit, source, target)
+            print(f'{label:>28} {elapsed:>10.4f} {peak / 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
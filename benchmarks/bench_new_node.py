@@ -0,0 +1,35 @@
+"""
+Compare the cost of the nodes created by `_new_node`, which are builders created without
+calling `__init__`, with full builders and slotted nodes.
+
+Run with `PYTHONPATH=. python benchmarks/bench_new_node.py`.
+"""
+import timeit
+import tracemalloc
+
+from spytula.builder import SpytulaBuilder
+from spytula.node import SpytulaNode
+
+
+COUNT = 100_000
+
+
+def allocate(node_class: type) -> list:
+    return [node_class() for _ in range(COUNT)]
+
+
+def main() -> None:
+    print(f"{'node class':<24} {'time (s)':>10} {'bytes per node':>16}")
+    for node_class in (SpytulaBuilder, SpytulaBuilder._node_class, SpytulaNode):
+        elapsed = min(timeit.repeat(lambda: allocate(node_class), number=1, repeat=3))
+        tracemalloc.start()
+        nodes = allocate(node_class)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del nodes
+        name = node_class.__name__ + (' (nested)' if node_class is SpytulaBuilder._node_class else '')
+        print(f"{name:<24} {elapsed:>10.4f} {size / COUNT:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
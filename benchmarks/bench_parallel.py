@@ -0,0 +1,49 @@
+"""
+Measure how `render_parallel` scales with the number of workers, compared to `to_ndjson`.
+
+Run with `PYTHONPATH=. python benchmarks/bench_parallel.py`.
+"""
+import os
+import timeit
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZES = [10_000, 100_000, 500_000]
+
+INGREDIENTS = [
+    {'name': 'Noodles', 'type': 'Main'},
+    {'name': 'Pork', 'type': 'Protein'},
+    {'name': 'Eggs', 'type': 'Topping'},
+    {'name': 'Miso', 'type': 'Flavoring'},
+]
+
+
+def render_dish(dish_builder, index):
+    dish_builder.attribute('dish_name', f'Ramen {index}')
+    dish_builder.attribute('origin', 'Japan')
+    dish_builder.attribute('rating', 4.5)
+    for ingredient_builder, ingredient in dish_builder.each('ingredients', INGREDIENTS):
+        ingredient_builder.attribute('name', ingredient['name'])
+        ingredient_builder.attribute('ingredient_type', ingredient['type'].upper())
+
+
+def main() -> None:
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{'dishes':>8} {'workers':>8} {'time (s)':>10} {'speedup':>8}")
+    for size in SIZES:
+        serial = min(timeit.repeat(lambda: builder.to_ndjson(range(size), render_dish), number=1, repeat=3))
+        print(f"{size:>8} {'serial':>8} {serial:>10.4f} {1:>8.2f}")
+        for workers in counts:
+            parallel = min(timeit.repeat(
+                lambda: builder.render_parallel(range(size), render_dish, workers=workers, chunk_size=5000, ndjson=True),
+                number=1,
+                repeat=3,
+            ))
+            print(f"{size:>8} {workers:>8} {parallel:>10.4f} {serial / parallel:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare sending the full JSON of a large builder after a small change with sending a JSON
+Patch, computed with and without change tracking.
+
+Run with `PYTHONPATH=. python benchmarks/bench_patch.py`.
+"""
+import json
+import timeit
+
+from typing import Any, List
+
+from spytula.builder import SpytulaBuilder
+
+
+SIZE = 10_000
+
+
+def build(track: bool) -> List[Any]:
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    if track:
+        builder.track_changes()
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 0)
+    for dish_builder, index in builder.each('all_dishes', range(SIZE)):
+        dish_builder.attribute('dish_id', index)
+        dish_builder.attribute('dish_name', f'Ramen {index}')
+        dish_builder.attribute('average_rating', 4.5)
+    return [builder, stats]
+
+
+def main() -> None:
+    print(f"{'method':>28} {'time (s)':>10} {'size':>10}")
+    for track in (False, True):
+        builder, stats = build(track)
+        snapshot = builder.snapshot()
+        stats.attribute('view_count', 1)
+        label = 'tracked' if track else 'untracked'
+        elapsed = min(timeit.repeat(lambda: builder.diff(snapshot), number=1, repeat=5))
+        print(f"{'diff (' + label + ')':>28} {elapsed:>10.4f} {len(json.dumps(builder.diff(snapshot))):>10}")
+        elapsed = min(timeit.repeat(lambda: builder.merge_patch(snapshot), number=1, repeat=5))
+        print(f"{'merge_patch (' + label + ')':>28} {elapsed:>10.4f} {len(json.dumps(builder.merge_patch(snapshot))):>10}")
+        elapsed = min(timeit.repeat(builder.snapshot, number=1, repeat=5))
+        print(f"{'snapshot (' + label + ')':>28} {elapsed:>10.4f} {'':>10}")
+    elapsed = min(timeit.repeat(builder.to_json, number=1, repeat=5))
+    print(f"{'to_json':>28} {elapsed:>10.4f} {len(builder.to_json()):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare rendering a homogeneous collection with `each` and with a compiled template.
+
+Run with `PYTHONPATH=. python benchmarks/bench_template.py`.
+"""
+import timeit
+
+from spytula.builder import SpytulaBuilder
+
+
+COUNT = 50_000
+
+ROWS = [
+    {'name': f'Ingredient {i}', 'type': 'Main', 'spicy': i % 3 == 0, 'origin': 'Japan'}
+    for i in range(COUNT)
+]
+
+
+def render_each() -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    for ingredient_builder, ingredient in builder.each('ingredients', ROWS):
+        ingredient_builder.attributes(ingredient, ['name', 'type'])
+        ingredient_builder.when('spicy', ingredient['spicy'], lambda spicy: spicy)
+        with ingredient_builder.node('origin') as origin:
+            origin.attribute('country', ingredient['origin'])
+    return builder
+
+
+TEMPLATE = SpytulaBuilder.template()
+TEMPLATE.attributes(['name', 'type'])
+TEMPLATE.when('spicy', 'spicy', lambda spicy: spicy)
+with TEMPLATE.node('origin') as origin:
+    origin.attribute('country', 'origin')
+
+
+def render_template() -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    builder.attribute('ingredients', TEMPLATE.render_many(ROWS))
+    return builder
+
+
+def main() -> None:
+    assert render_each().to_json() == render_template().to_json()
+    each = min(timeit.repeat(render_each, number=1, repeat=5))
+    template = min(timeit.repeat(render_template, number=1, repeat=5))
+    print(f"{'each (s)':>10} {'template (s)':>14} {'speedup':>8}")
+    print(f"{each:>10.4f} {template:>14.4f} {each / template:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
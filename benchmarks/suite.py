@@ -0,0 +1,341 @@
+"""
+Benchmark suite and performance regression harness.
+
+Every scenario builds realistic data (wide flat objects, deep nesting, large lists, heavy key
+formatting) and measures one operation. Timings are the best of several repeats, with the
+garbage collector disabled, and the peak memory of a single run is measured with tracemalloc.
+
+Run with `PYTHONPATH=. python benchmarks/suite.py`, or `make benchmark`. `make benchmark_baseline`
+stores a baseline before a change, and `make benchmark_compare` checks the change against it.
+Options:
+
+- `-k each` only runs the scenarios whose name contains "each"
+- `--save baseline.json` stores the results
+- `--compare baseline.json` compares the results with a stored baseline, and exits with a
+  non-zero status when the throughput of a scenario dropped by more than `--threshold`
+  (10% by default)
+- `--no-memory` skips the tracemalloc measurements, which are slow
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from spytula.builder import SpytulaBuilder
+
+
+Scenario = Callable[[], Callable[[], Any]]
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+INGREDIENTS = [
+    {'name': 'Noodles', 'type': 'Main'},
+    {'name': 'Pork', 'type': 'Protein'},
+    {'name': 'Eggs', 'type': 'Topping'},
+    {'name': 'Miso', 'type': 'Flavoring'},
+]
+
+CAMELIZE = {'camelize': {'uppercase_first_letter': False}}
+
+HEAVY_KEY_FORMAT = {'underscore': {}, 'camelize': {'uppercase_first_letter': False}, 'dasherize': {}}
+
+
+@dataclass
+class Dish:
+    name: str
+    origin: str
+    rating: float
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    """
+    Register a scenario. The decorated function prepares the data and returns the operation to measure.
+    """
+    def register(setup: Scenario) -> Scenario:
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+
+def wide_builder(width: int = 2_000, **key_format: Any) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    if key_format:
+        builder.key_format(**key_format)
+    for index in range(width):
+        builder.attribute(f'attribute_name_{index}', index)
+    return builder
+
+
+def deep_builder(depth: int = 500, **key_format: Any) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    if key_format:
+        builder.key_format(**key_format)
+    node = builder
+    for level in range(depth):
+        node.attribute('level_number', level)
+        with node.node('child_node') as child:
+            pass
+        node = child
+    return builder
+
+
+def dishes_builder(size: int = 10_000, **key_format: Any) -> SpytulaBuilder:
+    builder = SpytulaBuilder()
+    if key_format:
+        builder.key_format(**key_format)
+    render_dishes(builder, size)
+    return builder
+
+
+def render_dishes(builder: SpytulaBuilder, size: int) -> None:
+    for dish_builder, index in builder.each('all_dishes', range(size)):
+        dish_builder.attribute('dish_name', f'Ramen {index}')
+        dish_builder.attribute('country_of_origin', 'Japan')
+        dish_builder.attribute('average_rating', 4.5)
+        for ingredient_builder, ingredient in dish_builder.each('main_ingredients', INGREDIENTS):
+            ingredient_builder.attribute('ingredient_name', ingredient['name'])
+            ingredient_builder.attribute('ingredient_type', ingredient['type'])
+
+
+@scenario('each/large-list')
+def each_large_list() -> Callable[[], Any]:
+    return lambda: render_dishes(SpytulaBuilder(), 10_000)
+
+
+@scenario('attributes/dicts')
+def attributes_dicts() -> Callable[[], Any]:
+    records = [{'name': f'Ramen {index}', 'origin': 'Japan', 'rating': 4.5} for index in range(10_000)]
+    return lambda: SpytulaBuilder().attributes_many('dishes', records, ['name', 'origin', 'rating'])
+
+
+@scenario('attributes/objects')
+def attributes_objects() -> Callable[[], Any]:
+    records = [Dish(f'Ramen {index}', 'Japan', 4.5) for index in range(10_000)]
+    return lambda: SpytulaBuilder().attributes_many('dishes', records, ['name', 'origin', 'rating'])
+
+
+@scenario('format/wide')
+def format_wide() -> Callable[[], Any]:
+    builder = wide_builder(**CAMELIZE)
+    return lambda: builder._format_data(builder.data)
+
+
+@scenario('format/deep')
+def format_deep() -> Callable[[], Any]:
+    builder = deep_builder(**CAMELIZE)
+    return lambda: builder._format_data(builder.data)
+
+
+@scenario('format/large-list')
+def format_large_list() -> Callable[[], Any]:
+    builder = dishes_builder(**CAMELIZE)
+    return lambda: builder._format_data(builder.data)
+
+
+@scenario('format/heavy-key-format')
+def format_heavy_key_format() -> Callable[[], Any]:
+    builder = dishes_builder(**HEAVY_KEY_FORMAT)
+    return lambda: builder._format_data(builder.data)
+
+
+@scenario('format/uncached-keys')
+def format_uncached_keys() -> Callable[[], Any]:
+    builder = wide_builder(**HEAVY_KEY_FORMAT)
+
+    def run() -> Any:
+        builder._key_formatter.cache_clear()
+        return builder._format_data(builder.data)
+    return run
+
+
+@scenario('to_json/wide')
+def to_json_wide() -> Callable[[], Any]:
+    return wide_builder().to_json
+
+
+@scenario('to_json/deep')
+def to_json_deep() -> Callable[[], Any]:
+    return deep_builder(depth=300).to_json
+
+
+@scenario('to_json/large-list')
+def to_json_large_list() -> Callable[[], Any]:
+    return dishes_builder().to_json
+
+
+@scenario('to_json/large-list-key-format')
+def to_json_large_list_key_format() -> Callable[[], Any]:
+    return dishes_builder(**CAMELIZE).to_json
+
+
+@scenario('to_json/large-list-indent')
+def to_json_large_list_indent() -> Callable[[], Any]:
+    builder = dishes_builder()
+    return lambda: builder.to_json(indent=2)
+
+
+@scenario('iter_json/large-list-key-format')
+def iter_json_large_list_key_format() -> Callable[[], Any]:
+    builder = dishes_builder(**CAMELIZE)
+    return lambda: ''.join(builder.iter_json())
+
+
+@scenario('to_json/large-list-limits')
+def to_json_large_list_limits() -> Callable[[], Any]:
+    builder = dishes_builder(**CAMELIZE)
+    builder.limits(max_bytes=1 << 30, max_items=100_000, max_depth=32)
+    return builder.to_json
+
+
+@scenario('to_msgpack/large-list-key-format')
+def to_msgpack_large_list_key_format() -> Callable[[], Any]:
+    return dishes_builder(**CAMELIZE).to_msgpack
+
+
+@scenario('to_cbor/large-list-key-format')
+def to_cbor_large_list_key_format() -> Callable[[], Any]:
+    return dishes_builder(**CAMELIZE).to_cbor
+
+
+@scenario('diff/large-list-tracked')
+def diff_large_list_tracked() -> Callable[[], Any]:
+    builder = SpytulaBuilder()
+    builder.key_format(**CAMELIZE)
+    builder.track_changes()
+    render_dishes(builder, 10_000)
+    snapshot = builder.snapshot()
+    builder.attribute('menu_title', 'Lunch')
+    return lambda: builder.diff(snapshot)
+
+
+@scenario('to_yaml/large-list')
+def to_yaml_large_list() -> Callable[[], Any]:
+    return dishes_builder(size=2_000).to_yaml
+
+
+@scenario('to_yaml/large-list-key-format')
+def to_yaml_large_list_key_format() -> Callable[[], Any]:
+    return dishes_builder(size=2_000, **CAMELIZE).to_yaml
+
+
+def measure_time(operation: Callable[[], Any], repeat: int, min_time: float) -> float:
+    """
+    Return the best time of an operation, in seconds, over `repeat` rounds of at least `min_time` seconds.
+    """
+    operation()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat - 1):
+            gc.collect()
+            start = time.perf_counter()
+            for _ in range(number):
+                operation()
+            best = min(best, (time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def measure_memory(operation: Callable[[], Any]) -> int:
+    """
+    Return the peak memory allocated by a single run of an operation, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def run(names: List[str], repeat: int, min_time: float, memory: bool) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        operation = SCENARIOS[name]()
+        seconds = measure_time(operation, repeat, min_time)
+        results[name] = {'seconds': seconds, 'ops_per_second': 1 / seconds}
+        if memory:
+            results[name]['peak_bytes'] = measure_memory(operation)
+        report(name, results[name])
+    return results
+
+
+def report(name: str, result: Dict[str, float]) -> None:
+    peak = result.get('peak_bytes')
+    memory = f"{peak / (1 << 20):>10.2f}" if peak is not None else f"{'-':>10}"
+    print(f"{name:<36} {result['seconds'] * 1e3:>10.3f} {result['ops_per_second']:>10.2f} {memory}")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> int:
+    """
+    Print the change of throughput of every scenario, and return the number of regressions.
+    """
+    print()
+    print(f"{'scenario':<36} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['ops_per_second'], result['ops_per_second']
+        change = after / before - 1
+        flag = ''
+        if change < -threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{name:<36} {before:>10.2f} {after:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-k', dest='keyword', help='only run the scenarios whose name contains this keyword')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed rounds (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum duration of a round, in seconds')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip the memory measurements')
+    parser.add_argument('--save', metavar='FILE', help='store the results in a baseline file')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results with a baseline file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='maximum throughput drop before failing the comparison (default: 0.1)')
+    args = parser.parse_args(argv)
+
+    names = [name for name in SCENARIOS if not args.keyword or args.keyword in name]
+    print(f"Python {platform.python_version()} on {platform.machine()}")
+    print(f"{'scenario':<36} {'time (ms)':>10} {'ops/s':>10} {'peak (MB)':>10}")
+    results = run(names, args.repeat, args.min_time, args.memory)
+
+    if args.save:
+        with open(args.save, 'w') as fp:
+            json.dump({'python': platform.python_version(), 'results': results}, fp, indent=2)
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} scenario(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,12 @@
-__all__ = ['builder']
+__all__ = ['Batch', 'SpytulaBuilder', 'lazy', 'profile']
 
 from spytula.builder import SpytulaBuilder
+from spytula.profiling import profile
 
-builder = SpytulaBuilder()
 
-ingredients = [
-    {'name': 'Noodles', 'type': 'Main'},
-    {'name': 'Pork', 'type': 'Protein'},
-    {'name': 'Eggs', 'type': 'Topping'},
-    {'name': 'Miso', 'type': 'Flavoring'},
-]
-
-with builder.nodes('ingredients') as add_ingredient:
-    for ingredient in ingredients:
-        with add_ingredient() as ingredient_builder:
-            ingredient_builder.attribute('name', ingredient['name'])
-            ingredient_builder.attribute('type', ingredient['type'].upper())
-            
-print(builder.to_json(indent=2))
\ No newline at end of file
+def __getattr__(name):
+    # The deferred module is only imported when used
+    if name in ('Batch', 'lazy'):
+        from spytula import deferred
+        return getattr(deferred, name)
+    raise AttributeError(f"module 'spytula' has no attribute {name!r}")
@@ -0,0 +1,129 @@
+from collections.abc import Mapping
+from operator import attrgetter, getitem, itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+Accessor = Callable[[Any], Tuple[Any, ...]]
+
+_accessors: Dict[Tuple[type, Tuple[str, ...]], Accessor] = {}
+
+_readers: Dict[type, Callable[[Any, str], Any]] = {}
+
+
+def _read(record: Any, key: str) -> Any:
+    try:
+        return getattr(record, key)
+    except AttributeError:
+        return record[key]
+
+
+def _compile(record_type: type, keys: Tuple[str, ...]) -> Accessor:
+    if not keys:
+        return lambda record: ()
+    if issubclass(record_type, Mapping):
+        getter = itemgetter(*keys)
+    elif issubclass(record_type, tuple) and all(key in getattr(record_type, '_fields', ()) for key in keys):
+        # Named tuples are read by index, which is faster than by attribute
+        getter = itemgetter(*(record_type._fields.index(key) for key in keys))
+    else:
+        # Dataclasses, objects with __slots__, ORM rows...
+        getter = attrgetter(*keys)
+    if len(keys) == 1:
+        return lambda record: (getter(record),)
+    return getter
+
+
+def get_reader(record_type: type) -> Callable[[Any, str], Any]:
+    """
+    Return a function reading a single key from records of the given type: `operator.getitem`
+    for mappings, and `getattr` for any other object. The kind of records is detected once per type.
+
+    Args:
+        record_type (type): The type of the records.
+
+    Returns:
+        callable: Function that takes a record and a key, and returns the value.
+    """
+    reader = _readers.get(record_type)
+    if reader is None:
+        reader = _readers[record_type] = getitem if issubclass(record_type, Mapping) else getattr
+    return reader
+
+
+def get_accessor(record_type: type, keys: Tuple[str, ...]) -> Accessor:
+    """
+    Return a function reading the given keys from records of the given type, as a tuple.
+
+    Mappings are read by key, named tuples by index, and any other object by attribute, with
+    `operator.itemgetter` or `operator.attrgetter`. Accessors are compiled once per type and keys.
+
+    Args:
+        record_type (type): The type of the records.
+        keys (Tuple[str, ...]): The keys or attributes to read.
+
+    Returns:
+        callable: Function that takes a record and returns the tuple of its values.
+    """
+    accessor = _accessors.get((record_type, keys))
+    if accessor is None:
+        accessor = _accessors.setdefault((record_type, keys), _compile(record_type, keys))
+    return accessor
+
+
+def read_values(record: Any, keys: Tuple[str, ...]) -> Tuple[Any, ...]:
+    """
+    Read the given keys from a record with its compiled accessor.
+
+    Records that don't match the accessor of their type, like objects exposing some keys as
+    attributes and the others by key, are read one key at a time: by attribute first, then by key.
+
+    Args:
+        record (Any): The record.
+        keys (Tuple[str, ...]): The keys or attributes to read.
+
+    Returns:
+        Tuple[Any, ...]: The values.
+    """
+    accessor = _accessors.get((type(record), keys))
+    if accessor is None:
+        accessor = get_accessor(type(record), keys)
+    try:
+        return accessor(record)
+    except (AttributeError, LookupError, TypeError):
+        return tuple(_read(record, key) for key in keys)
+
+
+def output_fields(keys: Tuple[str, ...], rename: Optional[Dict[str, str]] = None,
+                  transform: Optional[Dict[str, Callable[[Any], Any]]] = None
+                  ) -> Tuple[Tuple[str, ...], Tuple[Tuple[int, Callable[[Any], Any]], ...]]:
+    """
+    Return the output keys of the given keys, and the transforms to apply to their values by index.
+
+    Args:
+        keys (Tuple[str, ...]): The keys or attributes read from the records.
+        rename (Dict[str, str]): The output key of some keys, by key.
+        transform (Dict[str, callable]): Functions applied to the value of some keys, by key.
+
+    Returns:
+        Tuple: The output keys, and a tuple of (index, function) pairs.
+    """
+    if rename:
+        output_keys = tuple(rename.get(key, key) for key in keys)
+    else:
+        output_keys = keys
+    if transform:
+        transforms = tuple((index, transform[key]) for index, key in enumerate(keys) if key in transform)
+    else:
+        transforms = ()
+    return output_keys, transforms
+
+
+def apply_transforms(values: Tuple[Any, ...],
+                     transforms: Tuple[Tuple[int, Callable[[Any], Any]], ...]) -> List[Any]:
+    """
+    Apply the transforms returned by `output_fields` to values read from a record.
+    """
+    values = list(values)
+    for index, function in transforms:
+        values[index] = function(values[index])
+    return values
@@ -1,14 +1,37 @@
-import json
-import yaml
+import io
+import os
+import time
 
-from contextlib import contextmanager
-from collections import OrderedDict
-from typing import Any, Callable, Dict, List, Tuple, Union
+from functools import lru_cache
+from typing import (TYPE_CHECKING, Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional,
+                    TextIO, Tuple, Union)
 
 from .mixins.format import DataFormattingMixin
+from . import profiling
+from .node import SpytulaNode
+from .serializers.json import JSONWriter, RawJSON, default_value, raw_placeholder, splice_raw_json, stored_items
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from . import limits, patch
+    from .frozen import FrozenNode
+    from .serializers.backends import JSONBackend
+    from .template import Template
+
+
+class SpytulaBuilder(DataFormattingMixin, SpytulaNode):
+    # Defaults of the nested nodes, which are builders created without calling `__init__`
+    _root = None
+    _json_backend = None
+    _lazy_executor: 'Executor' = None
+    _limits: 'limits.Limits' = None
+    _created_at = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if '_node_class' not in cls.__dict__:
+            cls._node_class = nested_node_class(cls)
 
-class SpytulaBuilder(DataFormattingMixin):
     def __init__(self, root: str = None) -> None:
         """
         Initialize a new SpytulaBuilder instance.
@@ -17,29 +40,12 @@ class SpytulaBuilder(DataFormattingMixin):
             root (str): The root key for the output JSON.
         """
         super().__init__()
-        self._data: Dict[str, Any] = OrderedDict()
+        self._data: Dict[str, Any] = {}
         self._root = root
-
-    def __enter__(self) -> 'SpytulaBuilder':
-        """
-        Enter the context of the SpytulaBuilder instance.
-        """
-        return self
-
-    def __exit__(self, type, value, traceback) -> None:
-        """
-        Exit the context of the SpytulaBuilder instance.
-        """
-        pass
-
-    def _new_node(self) -> 'SpytulaBuilder':
-        """
-        Helper method to create a new SpytulaBuilder instance.
-
-        Returns:
-            SpytulaBuilder: New instance of SpytulaBuilder.
-        """
-        return type(self)()
+        self._json_backend = None
+        self._lazy_executor: 'Executor' = None
+        self._limits: 'limits.Limits' = None
+        self._created_at = time.perf_counter() if profiling._observers else None
 
     def root(self, key: str) -> None:
         """
@@ -63,201 +69,441 @@ class SpytulaBuilder(DataFormattingMixin):
         else:
             return self._data
 
-    @contextmanager
-    def node(self, key: str) -> 'SpytulaBuilder':
+    @classmethod
+    def load_json(cls, fp: BinaryIO) -> 'SpytulaBuilder':
         """
-        Create a new node to be added to the JSON.
+        Create a builder holding the JSON object of a file or stream, to edit it without parsing it all.
+
+        Files are mapped into memory, and other streams are read. Values are parsed one level at a
+        time, when they are read or opened with `node`, and the untouched values are written back
+        verbatim, without being parsed nor re-indented. If a key format is configured, they are
+        parsed before being written instead, so their keys are formatted.
 
         Args:
-            key (str): The key for the new node in the JSON.
+            fp (BinaryIO): A file opened in binary mode, or a stream, holding a UTF-8 encoded JSON object.
+
+        Returns:
+            SpytulaBuilder: New instance of SpytulaBuilder.
+
+        Raises:
+            ValueError: If the document isn't a JSON object, or its members are malformed.
 
         Example:
             ```python
-            with builder.node("ingredients") as ingredient_builder:
-                ingredient_builder.attribute("name", "Ramen Noodles")
+            with open('menu.json', 'rb') as fp:
+                builder = SpytulaBuilder.load_json(fp)
+            with builder.node('stats') as stats:
+                stats.attribute('view_count', 1)
+            builder.save_json('menu.json')
             ```
         """
-        new_node = self._new_node()
-        yield new_node
-        self._data[key] = new_node._data
+        from . import loading
+        builder = cls()
+        builder._data = loading.load_json(fp)
+        return builder
 
-    @contextmanager
-    def add_node(self, node_list: List[Dict[str, Any]]) -> 'SpytulaBuilder':
+    @classmethod
+    def load_yaml(cls, fp: BinaryIO) -> 'SpytulaBuilder':
         """
-        Add a new node to the given list.
+        Create a builder holding the YAML mapping of a file or stream, parsing each of its entries
+        only when it is read, opened with `node` or serialized.
 
         Args:
-            node_list (List[Dict[str, Any]]): The list to which the node will be added.
+            fp (BinaryIO): A file opened in binary mode, or a stream, holding a UTF-8 encoded YAML mapping.
+
+        Returns:
+            SpytulaBuilder: New instance of SpytulaBuilder.
+
+        Raises:
+            ValueError: If the document isn't a mapping.
 
         Example:
             ```python
-            with builder.add_node(ingredient_list) as ingredient_builder:
-                ingredient_builder.attribute("name", "Ramen Noodles")
+            with open('menu.yml', 'rb') as fp:
+                builder = SpytulaBuilder.load_yaml(fp)
+            builder.attribute('title', 'Lunch')
             ```
         """
-        new_node = self._new_node()
-        yield new_node
-        node_list.append(new_node._data)
+        from . import loading
+        builder = cls()
+        builder._data = loading.load_yaml(fp)
+        return builder
 
-    @contextmanager
-    def nodes(self, key: str) -> Callable[['SpytulaBuilder'], None]:
+    def freeze(self, default: Callable[[Any], Any] = None) -> 'FrozenNode':
         """
-        Create a new list of nodes to be added to the JSON.
+        Create an immutable snapshot of the data, to share it between many builders without copying it.
+
+        The data is serialized once, with unformatted keys. The snapshot can then be added to other
+        builders with `attribute`, `partial` or `merge`, by reference: modifying this builder
+        afterwards doesn't change the snapshot. Its keys are written with the key format of the
+        builder it is added to, and with the key format of this builder by its own `to_json`.
+        Snapshots are safe to share across threads and requests.
 
         Args:
-            key (str): The key for the new list in the JSON.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            FrozenNode: The snapshot.
 
         Example:
             ```python
-            ingredients = [
-                {'name': 'Noodles', 'type': 'Main'},
-                {'name': 'Pork', 'type': 'Protein'},
-                {'name': 'Eggs', 'type': 'Topping'},
-                {'name': 'Miso', 'type': 'Flavoring'},
-            ]
+            author = SpytulaBuilder()
+            author.attributes(chef, ['name', 'restaurant'])
+            frozen_author = author.freeze()
+
+            for recipe_builder, recipe in builder.each('recipes', recipes):
+                recipe_builder.attribute('title', recipe['title'])
+                recipe_builder.attribute('author', frozen_author)
+            ```
+        """
+        from .frozen import FrozenNode
+        self._resolve_lazy(self._data)
+        return FrozenNode.from_data(self.data, self._key_formatter, default)
 
-            with builder.nodes('ingredients') as add_ingredient:
-                for ingredient in ingredients:
-                    with add_ingredient() as ingredient_builder:
-                        ingredient_builder.attribute('name', ingredient['name'])
-                        ingredient_builder.attribute('type', ingredient['type'].upper())
+    def track_changes(self) -> None:
+        """
+        Record the changes of the nodes created from now on, so `diff` and `merge_patch` skip the
+        nodes that didn't change since a snapshot, without comparing them.
+
+        Values added to a tracking builder must be replaced, with `attribute` for instance,
+        rather than modified in place.
+
+        Example:
+            ```python
+            builder = SpytulaBuilder()
+            builder.track_changes()
             ```
         """
-        new_nodes: List[Dict[str, Any]] = []
-        self._data[key] = new_nodes
-        yield lambda: self.add_node(new_nodes)
+        from .loading import LazyObject
+        from .tracking import TrackedDict, TrackedLazyObject, TrackedList, TrackingNode
+        # The values of loaded documents are kept as slices until they are read
+        tracked_class = TrackedLazyObject if isinstance(self._data, LazyObject) else TrackedDict
+        self._data = tracked_class(stored_items(self._data))
+        self._node_class = nested_node_class(type(self), TrackingNode)
+        self._list_class = TrackedList
+        if self._limits is not None:
+            self._bound_lists()
 
-    def each(self, key: str, items: List[Dict[str, Any]]) -> List[Tuple['SpytulaBuilder', Dict[str, Any]]]:
+    def snapshot(self, default: Callable[[Any], Any] = None) -> 'patch.Snapshot':
         """
-        Iterate over a list of items and create a nested context for each item.
+        Take a snapshot of the data, to compute its changes later with `diff` or `merge_patch`.
 
         Args:
-            key (str): The key for the new list in the JSON.
-            items (List[Dict[str, Any]]): The list of items to iterate over.
+            default (callable): Function called for objects that can't otherwise be serialized.
 
         Returns:
-            List[Tuple[SpytulaBuilder, Dict[str, Any]]]: A list of tuples containing the SpytulaBuilder instance and the current item.
+            Snapshot: The snapshot, holding the plain JSON data with formatted keys in its `data` attribute.
 
         Example:
             ```python
-            ingredients = [
-                {'name': 'Noodles', 'type': 'Main'},
-                {'name': 'Pork', 'type': 'Protein'},
-                {'name': 'Eggs', 'type': 'Topping'},
-                {'name': 'Miso', 'type': 'Flavoring'},
-            ]
+            snapshot = builder.snapshot()
+            builder.attribute('rating', 4.8)
+            websocket.send(json.dumps(builder.diff(snapshot)))
+            ```
+        """
+        from . import patch
+        self._resolve_lazy(self._data)
+        return patch.Snapshot(self.data, self._key_formatter, default)
+
+    def diff(self, snapshot: 'patch.Snapshot', list_keys: Dict[str, str] = None,
+             default: Callable[[Any], Any] = None) -> List[Dict[str, Any]]:
+        """
+        Compute the JSON Patch (RFC 6902) turning a snapshot into the current data.
+
+        Keys are formatted like in `to_json`. Lists are compared by position, after skipping their
+        unchanged items at the beginning and end, unless they are listed in `list_keys`: their
+        items are then matched by id, and moved when they are reordered.
 
-            for ingredient_builder, ingredient in builder.each('ingredients', ingredients):
-                ingredient_builder.attribute('name', ingredient['name'])
-                ingredient_builder.attribute('type', ingredient['type'])
+        Args:
+            snapshot (Snapshot): A snapshot taken with `snapshot`, from this builder or another one.
+            list_keys (Dict[str, str]): The key identifying the items of some lists, by key of the list,
+                                        before formatting.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            List[Dict[str, Any]]: The operations of the patch, ready to be serialized to JSON.
+
+        Example:
+            ```python
+            snapshot = builder.snapshot()
+            for dish_builder, dish in builder.each('dishes', dishes):
+                dish_builder.attributes(dish, ['id', 'name'])
+            operations = builder.diff(snapshot, list_keys={'dishes': 'id'})
             ```
         """
-        item_builders = []
-        for item in items:
-            new_item_builder = self._new_node()
-            item_builders.append((new_item_builder, item))
-            self._data[key] = [item_builder._data for item_builder, _ in item_builders]
-        return item_builders
+        from . import patch
+        self._resolve_lazy(self._data)
+        return patch.diff(snapshot, self.data, self._key_formatter, list_keys, default)
 
-    def attribute(self, key: str, value: Any) -> None:
+    def merge_patch(self, snapshot: 'patch.Snapshot', default: Callable[[Any], Any] = None) -> Any:
         """
-        Add a new attribute to the JSON.
+        Compute the JSON Merge Patch (RFC 7386) turning a snapshot into the current data.
+
+        Merge patches replace lists as a whole, and remove the keys whose new value is null.
 
         Args:
-            key (str): The key for the new attribute in the JSON.
-            value (Any): The value of the new attribute.
+            snapshot (Snapshot): A snapshot taken with `snapshot`, from this builder or another one.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            Any: The merge patch, an empty dictionary when nothing changed.
 
         Example:
             ```python
-            builder.attribute("name", "Ramen Noodles")
+            snapshot = builder.snapshot()
+            builder.attribute('rating', 4.8)
+            builder.merge_patch(snapshot)  # {'rating': 4.8}
             ```
         """
-        self._data[key] = value
+        from . import patch
+        self._resolve_lazy(self._data)
+        return patch.merge_patch(snapshot, self.data, self._key_formatter, default)
 
-    def attributes(self, obj: Any, keys: List[str]) -> None:
+    def limits(self, max_bytes: Optional[int] = None, max_items: Optional[int] = None,
+               max_depth: Optional[int] = None, overflow: str = 'raise', marker: Any = None) -> None:
         """
-        Add multiple new attributes to the JSON.
+        Limit the size of the output, to protect services from unexpectedly large documents.
+
+        `max_items` is enforced while building: `each` stops iterating over its items once the
+        list is full, so the items left out are never fetched nor rendered. Every limit is then
+        checked on the estimated size of the data before it is serialized, and nothing is written
+        when the data doesn't fit. When a limit is exceeded, the overflow strategy decides to:
+
+        - "raise" LimitExceeded,
+        - "truncate" the lists, or the nodes nested too deeply, and end them with the marker,
+        - "paginate" the first list too long, or the largest one: `iter_json_pages` yields every
+          page, and the other outputs raise LimitExceeded, since they can't hold every page.
+
+        `max_items` is enforced while building for the lists created from now on.
 
         Args:
-            obj (Any): The object from which the attributes' values will be retrieved.
-            keys (List[str]): A list of the keys for the new attributes in the JSON.
+            max_bytes (int): The maximum size of the JSON output, in bytes. It is estimated for every output.
+            max_items (int): The maximum number of items of each list.
+            max_depth (int): The maximum number of nested objects and lists.
+            overflow (str): "raise", "truncate" or "paginate".
+            marker (Any): The value ending truncated lists, and replacing the nodes nested too deeply, if any.
+
+        Raises:
+            ValueError: If the overflow strategy is unknown.
 
         Example:
             ```python
-            ramen = {'name': 'Tonkotsu Ramen', 'type': 'Pork-based'}
-            builder.attributes(ramen, ['name', 'type'])
+            builder.limits(max_bytes=1 << 20, max_items=100, overflow='truncate', marker={'truncated': True})
             ```
         """
-        for key in keys:
-            try:
-                self.attribute(key, getattr(obj, key))
-            except AttributeError:
-                self.attribute(key, obj[key])
+        from . import limits
+        self._limits = limits.Limits(max_bytes, max_items, max_depth, overflow, marker)
+        self._bound_lists()
+
+    def _bound_lists(self) -> None:
+        """
+        Helper method to make the lists of nodes created from now on hold at most `max_items` nodes, if
+        the builder has this limit and doesn't paginate.
+        """
+        from . import limits
+        node_class = self._node_class
+        if issubclass(node_class._list_class, limits.BoundedList):
+            node_class = node_class.__bases__[0]
+        if self._limits.max_items is not None and self._limits.overflow != 'paginate':
+            node_class = limits.bounded_node_class(node_class, self._limits)
+        self._node_class = node_class
+        self._list_class = node_class._list_class
 
-    def merge(self, data: Dict[str, Any]) -> None:
+    def estimated_size(self, indent: Union[int, str] = None, ensure_ascii: bool = True,
+                       separators: Tuple[str, str] = None) -> int:
         """
-        Merge given dictionary into the JSON data.
+        Estimate the size of the JSON output, in bytes, without serializing the data.
+
+        The estimate is exact for most documents. It ignores the output of `default` functions.
 
         Args:
-            data (Dict[str, Any]): Dictionary to merge.
+            indent (int or str): The indentation of the JSON, if any.
+            ensure_ascii (bool): Whether non-ASCII characters are escaped, like `to_json` does by default.
+            separators (tuple): The (item_separator, key_separator) tuple of the JSON, if not the default one.
+
+        Returns:
+            int: The estimated size.
 
         Example:
             ```python
-            extra_info = {'rating': 4.5, 'spiciness': 'Medium'}
-            builder.merge(extra_info)
+            if builder.estimated_size() > 1 << 20:
+                response.headers['Transfer-Encoding'] = 'chunked'
             ```
         """
-        if isinstance(data, dict):
-            self._data.update(data)
-        else:
-            raise TypeError("Expected a dictionary to merge.")
+        from . import limits
+        self._resolve_lazy(self._data)
+        return limits.estimated_size(self.data, self._key_formatter, indent, ensure_ascii, separators)
+
+    def _limit_data(self, data: Any, indent: Union[int, str] = None, ensure_ascii: bool = True,
+                    separators: Tuple[str, str] = None, check_bytes: bool = True) -> Any:
+        """
+        Helper method to check the data against the limits of the builder before serializing it, if any.
+
+        Args:
+            data (Any): The data to serialize.
+            indent (int or str): The indentation of the JSON, if any.
+            ensure_ascii (bool): Whether non-ASCII characters are escaped.
+            separators (tuple): The (item_separator, key_separator) tuple of the JSON, if not the default one.
+            check_bytes (bool): Whether the estimated size of the data is checked against `max_bytes`, for
+                                outputs that don't check their own size.
+
+        Returns:
+            Any: The data, or a truncated copy of it.
+
+        Raises:
+            LimitExceeded: If the data exceeds a limit and the builder doesn't truncate it.
+        """
+        if self._limits is None:
+            return data
+        from . import limits
+        return limits.apply_limits(data, self._limits, self._key_formatter, indent, ensure_ascii, separators,
+                                   check_bytes)
+
+    def _streamed_max_bytes(self) -> Optional[int]:
+        """
+        Helper method to return the `max_bytes` limit that streaming writers count while writing, if any.
+
+        Only raised limits are counted while writing: the data is truncated or paginated beforehand
+        otherwise, since the chunks already written can't be taken back.
+        """
+        if self._limits is None or self._limits.overflow != 'raise':
+            return None
+        return self._limits.max_bytes
+
+    def _exceeds_max_bytes(self, output: Union[str, bytes]) -> bool:
+        """
+        Helper method to check the exact size of a serialized document against the `max_bytes` limit.
+        """
+        if self._limits is None or self._limits.max_bytes is None:
+            return False
+        max_bytes = self._limits.max_bytes
+        return len(output) > max_bytes or (isinstance(output, str) and not output.isascii()
+                                           and len(output.encode('utf-8')) > max_bytes)
 
-    def when(self, key: str, value: Any, condition: Union[bool, Callable[[Any], bool]]) -> None:
+    @staticmethod
+    def template() -> 'Template':
         """
-        Add a new attribute to the JSON when the condition is met.
+        Create a template, to record the shape of a node once and render it over many records.
+
+        Returns:
+            Template: New instance of Template.
+
+        Example:
+            ```python
+            template = SpytulaBuilder.template()
+            template.attribute('name')
+            template.attribute('type', lambda ingredient: ingredient['type'].upper())
+
+            builder.attribute('ingredients', template.render_many(ingredients))
+            ```
+        """
+        from .template import Template
+        return Template()
+
+    def json_backend(self, name: str) -> None:
+        """
+        Set the JSON backend used by `to_json` and `to_json_bytes` for this builder.
 
         Args:
-            key (str): The key for the new attribute in the JSON.
-            value: The value of the new attribute.
-            condition (bool or callable): Condition to be met. Can be a boolean or a lambda function that takes a value
-                                          and returns a boolean.
+            name (str): "json", "orjson", "ujson", the name of a backend registered with
+                        `register_json_backend`, or "auto" to use the fastest backend installed.
 
         Example:
             ```python
-            builder.when('has_noodles', True, True)
+            builder.json_backend('auto')
             ```
         """
-        if isinstance(condition, bool):
-            if condition:
-                self.attribute(key, value)
-        elif callable(condition):
-            if condition(value):
-                self.attribute(key, value)
-        else:
-            raise TypeError("Condition must be a boolean or a callable.")
+        from .serializers.backends import get_json_backend
+        get_json_backend(name)
+        self._json_backend = name
 
-    def partial(self, other_builder: 'SpytulaBuilder') -> None:
+    def lazy_executor(self, executor: 'Executor') -> None:
         """
-        Merge given SpytulaBuilder instance into the current instance.
+        Set the executor running the functions of the lazy values when the builder is serialized.
 
         Args:
-            other_builder (SpytulaBuilder): SpytulaBuilder instance to merge.
+            executor (Executor): A thread pool or process pool. Defaults to a thread pool shared by every builder.
+
+        Example:
+            ```python
+            builder.lazy_executor(ThreadPoolExecutor(max_workers=16))
+            ```
+        """
+        self._lazy_executor = executor
+
+    def resolve(self) -> None:
+        """
+        Resolve the lazy values of the builder now, instead of when it is serialized.
+
+        Functions run concurrently in the builder's lazy executor, the keys of each `Batch` are
+        loaded with a single call, and the lazy values are replaced by their results.
+
+        Example:
+            ```python
+            builder.attribute('stats', spytula.lazy(stats_service.fetch, dish.id))
+            builder.resolve()
+            ```
+        """
+        from . import deferred
+        deferred.resolve(self._data, self._lazy_executor)
+
+    async def aresolve(self) -> None:
+        """
+        Resolve the lazy values of the builder in the running event loop.
+
+        Coroutine functions are gathered, and other functions run in the builder's lazy
+        executor, or in the default executor of the loop.
 
         Example:
             ```python
-            other_builder = SpytulaBuilder()
-            other_builder.attribute('type', 'Ramen')
-            builder.partial(other_builder)
+            builder.attribute('stats', spytula.lazy(stats_service.fetch, dish.id))
+            await builder.aresolve()
             ```
         """
-        self._data.update(other_builder._data)
+        from . import deferred
+        await deferred.aresolve(self._data, self._lazy_executor)
+
+    def _resolve_lazy(self, data: Any) -> None:
+        """
+        Helper method to resolve the lazy values of the data before serializing it, if lazy values were
+        added to the builder or its nested nodes and some are still pending.
+        """
+        if self._holds_lazy:
+            from . import deferred
+            if deferred.has_pending():
+                deferred.resolve(data, self._lazy_executor)
+        self._parse_slices(data)
+
+    def _parse_slices(self, data: Any) -> None:
+        """
+        Helper method to parse the untouched values of a loaded document before serializing it, if keys are
+        formatted, since slices are written verbatim.
+        """
+        if self._key_formatter is not None:
+            from . import loading
+            if isinstance(data, loading.LazyObject):
+                loading.parse_slices(data)
+
+    @staticmethod
+    def _stored_data(data: Any) -> Any:
+        """
+        Helper method to copy the objects and arrays of a loaded document, with their values as they are
+        stored, before handing the data to a serialization library. Libraries read dictionaries with
+        `items`, which parses the values of loaded objects.
+        """
+        if isinstance(data, dict) and type(data) is not dict:
+            from . import loading
+            if isinstance(data, loading.LazyObject):
+                return loading.stored_copy(data)
+        return data
 
-    def to_json(self, *args, **kwargs) -> str:
+    def to_json(self, *args, backend: str = None, **kwargs) -> str:
         """
         Convert the data to a JSON-formatted string.
 
         Args:
             *args: Additional positional arguments to pass to json.dumps.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
             **kwargs: Additional keyword arguments to pass to json.dumps.
 
         Returns:
@@ -269,8 +515,628 @@ class SpytulaBuilder(DataFormattingMixin):
             print(json_data)
             ```
         """
-        formatted_data = self._format_data(self.data)
-        return json.dumps(formatted_data, *args, **kwargs)
+        recorder = profiling.Recorder(self, 'to_json') if profiling._observers else None
+        json_output = self._encode_json(self.data, backend, False, *args, recorder=recorder, **kwargs)
+        if recorder is not None:
+            recorder.finish(self.data, json_output)
+        return json_output
+
+    def to_json_bytes(self, *args, backend: str = None, **kwargs) -> bytes:
+        """
+        Convert the data to UTF-8 encoded JSON, ready to be written to a socket.
+
+        Backends producing bytes natively, like orjson, avoid an extra encoding step.
+
+        Args:
+            *args: Additional positional arguments to pass to json.dumps.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            **kwargs: Additional keyword arguments to pass to json.dumps.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON document.
+
+        Example:
+            ```python
+            response.body = builder.to_json_bytes(backend='orjson')
+            ```
+        """
+        recorder = profiling.Recorder(self, 'to_json_bytes') if profiling._observers else None
+        json_output = self._encode_json(self.data, backend, True, *args, recorder=recorder, **kwargs)
+        if recorder is not None:
+            recorder.finish(self.data, json_output)
+        return json_output
+
+    def _encode_json(self, data: Any, backend: str, as_bytes: bool, *args,
+                     recorder: 'profiling.Recorder' = None, **kwargs) -> Union[str, bytes]:
+        """
+        Helper method to format and encode data with a JSON backend.
+
+        Backends can't splice raw JSON, so they write a placeholder string in its place, which
+        is then replaced by the raw JSON. The size of the output is checked against `max_bytes`
+        once it is written, rather than estimated beforehand: data that doesn't fit is then
+        truncated and written again, if the builder truncates it.
+
+        Args:
+            data (Any): The data to encode.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            as_bytes (bool): Return UTF-8 encoded bytes instead of a string.
+            *args: Additional positional arguments to pass to the backend.
+            recorder (Recorder): Records the time spent formatting the data, when profiling.
+            **kwargs: Additional keyword arguments to pass to the backend.
+
+        Returns:
+            str or bytes: The JSON document.
+
+        Raises:
+            LimitExceeded: If the data exceeds a limit and the builder doesn't truncate it.
+        """
+        self._resolve_lazy(data)
+        from .serializers.backends import get_json_backend
+        json_backend = get_json_backend(backend or self._json_backend)
+        indent, ensure_ascii = kwargs.get('indent'), kwargs.get('ensure_ascii', True)
+        separators = json_backend.separators(indent, kwargs.get('separators'))
+        limited_data = self._limit_data(data, indent, ensure_ascii, separators, check_bytes=False)
+        json_output = self._dump_json(json_backend, limited_data, as_bytes, args, kwargs, recorder)
+        if not self._exceeds_max_bytes(json_output):
+            return json_output
+        if self._limits.overflow != 'truncate':
+            from .limits import LimitExceeded
+            raise LimitExceeded('max_bytes', self._limits.max_bytes)
+        limited_data = self._limit_data(data, indent, ensure_ascii, separators)
+        return self._dump_json(json_backend, limited_data, as_bytes, args, kwargs, recorder)
+
+    def _dump_json(self, json_backend: 'JSONBackend', data: Any, as_bytes: bool, args: tuple, kwargs: dict,
+                   recorder: Optional['profiling.Recorder']) -> Union[str, bytes]:
+        """
+        Helper method of `_encode_json` to format and encode data with a JSON backend, splicing its raw JSON.
+        """
+        data = self._stored_data(data)
+        formatted_data = self._format_data(data) if recorder is None else recorder.format_data(self, data)
+        json_default = self._json_default(kwargs.get('default'))
+        options = dict(kwargs, default=json_default)
+        if as_bytes:
+            json_output = json_backend.dumps_bytes(formatted_data, *args, **options)
+        else:
+            json_output = json_backend.dumps(formatted_data, *args, **options)
+        if not json_default.raw_values:
+            return json_output
+        writer = self._json_writer(**kwargs)
+        if as_bytes:
+            return splice_raw_json(json_output.decode('utf-8'), json_default.raw_values, writer).encode('utf-8')
+        return splice_raw_json(json_output, json_default.raw_values, writer)
+
+    @staticmethod
+    def _json_default(default: Callable[[Any], Any] = None) -> Callable[[Any], Any]:
+        """
+        Helper method to wrap a json.dumps `default` function so nested builders are serialized
+        and raw JSON is replaced by placeholders.
+
+        Args:
+            default (callable): The `default` function given by the caller, if any.
+
+        Returns:
+            callable: A function to pass as `default` to json.dumps. Its `raw_values` attribute
+                      lists the raw JSON values replaced by placeholders.
+        """
+        def json_default(o: Any) -> Any:
+            value = default_value(o, default, splice_raw=True)
+            if isinstance(value, RawJSON):
+                # Snapshots are raw JSON too: their memoized JSON is spliced, instead of encoding their data
+                json_default.raw_values.append(value)
+                return raw_placeholder(len(json_default.raw_values) - 1)
+            return value
+        json_default.raw_values = []
+        return json_default
+
+    def _json_writer(self, **kwargs) -> JSONWriter:
+        """
+        Helper method to create a JSONWriter using the configured key format.
+
+        Args:
+            **kwargs: Keyword arguments accepted by json.dumps.
+
+        Returns:
+            JSONWriter: New instance of JSONWriter.
+        """
+        kwargs.pop('cls', None)
+        return JSONWriter(format_key=self._key_formatter, **kwargs)
+
+    def _limit_streamed_data(self, writer: JSONWriter, kwargs: dict) -> Any:
+        """
+        Helper method to check the data against the limits of the builder before streaming it with a writer.
+
+        Writers counting their bytes check `max_bytes` themselves, while writing: its estimate is skipped then.
+        """
+        return self._limit_data(self.data, kwargs.get('indent'), kwargs.get('ensure_ascii', True),
+                                kwargs.get('separators'), check_bytes=writer.max_bytes is None)
+
+    def iter_json(self, **kwargs) -> Iterator[str]:
+        """
+        Convert the data to JSON incrementally, without building a formatted copy or the full string.
+
+        Args:
+            **kwargs: Keyword arguments accepted by json.dumps (indent, sort_keys, ensure_ascii, default...).
+
+        Yields:
+            str: Chunks of the JSON document.
+
+        Example:
+            ```python
+            for chunk in builder.iter_json(indent=2):
+                response.write(chunk)
+            ```
+        """
+        self._resolve_lazy(self._data)
+        writer = self._json_writer(max_bytes=self._streamed_max_bytes(), **kwargs)
+        chunks = writer.iterencode(self._limit_streamed_data(writer, kwargs))
+        if profiling._observers:
+            return profiling.Recorder(self, 'iter_json').iterate(self.data, chunks)
+        return chunks
+
+    def iter_json_pages(self, **kwargs) -> Iterator[str]:
+        """
+        Convert the data to JSON documents fitting in the limits of the builder, splitting its
+        first list too long, or its largest list when the data is too large, into pages.
+
+        Every page holds the other values of the data. Data that fits is a single page.
+
+        Args:
+            **kwargs: Keyword arguments accepted by json.dumps (indent, sort_keys, ensure_ascii, default...).
+
+        Yields:
+            str: One JSON document per page.
+
+        Example:
+            ```python
+            builder.limits(max_items=100, overflow='paginate')
+            for page_number, page in enumerate(builder.iter_json_pages()):
+                storage.write(f'dishes-{page_number}.json', page)
+            ```
+        """
+        self._resolve_lazy(self._data)
+        writer = self._json_writer(**kwargs)
+        if self._limits is None:
+            yield writer.encode(self.data)
+            return
+        from . import limits
+        for page in limits.iter_pages(self.data, self._limits, self._key_formatter, kwargs.get('indent'),
+                                      kwargs.get('ensure_ascii', True), kwargs.get('separators')):
+            yield writer.encode(page)
+
+    def dump_json(self, fp: TextIO, buffer_size: int = 1 << 16, **kwargs) -> None:
+        """
+        Write the data as JSON to a file-like object, chunk by chunk.
+
+        Args:
+            fp (TextIO): Any object with a `write` method accepting strings (file, socket wrapper, response body...).
+            buffer_size (int): Number of characters to buffer between two writes.
+            **kwargs: Keyword arguments accepted by json.dumps (indent, sort_keys, ensure_ascii, default...).
+
+        Example:
+            ```python
+            with open('ramen.json', 'w') as fp:
+                builder.dump_json(fp, indent=2)
+            ```
+        """
+        self._resolve_lazy(self._data)
+        recorder = profiling.Recorder(self, 'dump_json') if profiling._observers else None
+        if recorder is not None:
+            fp = recorder.writer(fp)
+        writer = self._json_writer(max_bytes=self._streamed_max_bytes(), **kwargs)
+        writer.dump(self._limit_streamed_data(writer, kwargs), fp, buffer_size=buffer_size)
+        if recorder is not None:
+            recorder.finish(self.data, output_bytes=fp.output_bytes)
+
+    def save_json(self, path: Union[str, 'os.PathLike'], **kwargs) -> None:
+        """
+        Write the data as JSON to a file, through a temporary file replacing it once written.
+
+        Builders created by `load_json` read their file while writing, so they can only write
+        back to it with this method: opening the file for writing would truncate it first.
+
+        Args:
+            path (str or PathLike): The path of the file.
+            **kwargs: Keyword arguments accepted by `dump_json` (buffer_size, indent, sort_keys...).
+
+        Example:
+            ```python
+            builder.save_json('ramen.json', indent=2)
+            ```
+        """
+        import shutil
+        import tempfile
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', dir=directory)
+        try:
+            with open(fd, 'w', encoding='utf-8') as fp:
+                self.dump_json(fp, **kwargs)
+            if os.path.exists(path):
+                shutil.copymode(path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def aiter_json(self, buffer_size: int = 1 << 16, **kwargs) -> AsyncIterator[str]:
+        """
+        Convert the data to JSON incrementally, in an async iterator.
+
+        Lists added with `stream_each` are rendered while they are written: the chunks buffered
+        so far are yielded before waiting for each of their items.
+
+        Args:
+            buffer_size (int): Number of characters to buffer between two chunks.
+            **kwargs: Keyword arguments accepted by json.dumps (indent, sort_keys, ensure_ascii, default...).
+
+        Yields:
+            str: Chunks of the JSON document.
+
+        Example:
+            ```python
+            async for chunk in builder.aiter_json():
+                await send(chunk)
+            ```
+        """
+        writer = self._json_writer(max_bytes=self._streamed_max_bytes(), **kwargs)
+
+        async def chunks() -> AsyncIterator[str]:
+            from . import deferred
+            if self._holds_lazy and deferred.has_pending():
+                await self.aresolve()
+            self._parse_slices(self._data)
+            async for chunk in writer.aiterencode(self._limit_streamed_data(writer, kwargs), buffer_size):
+                yield chunk
+        return chunks()
+
+    async def adump_json(self, fp: Any, buffer_size: int = 1 << 16, as_bytes: bool = None, **kwargs) -> None:
+        """
+        Write the data as JSON to an asyncio stream or an async response, chunk by chunk.
+
+        The `write` method of the stream may be a coroutine. When the stream has a `drain`
+        method, like `asyncio.StreamWriter`, it is awaited after each chunk.
+
+        Args:
+            fp (Any): Any object with a `write` method.
+            buffer_size (int): Number of characters to buffer between two writes.
+            as_bytes (bool): Write UTF-8 encoded bytes instead of strings. Defaults to True for streams
+                             with a `drain` method.
+            **kwargs: Keyword arguments accepted by json.dumps (indent, sort_keys, ensure_ascii, default...).
+
+        Example:
+            ```python
+            async def handle(reader, writer):
+                await builder.adump_json(writer)
+                writer.close()
+            ```
+        """
+        drain = getattr(fp, 'drain', None)
+        if as_bytes is None:
+            as_bytes = drain is not None
+        async for chunk in self.aiter_json(buffer_size, **kwargs):
+            result = fp.write(chunk.encode('utf-8') if as_bytes else chunk)
+            if hasattr(result, '__await__'):
+                await result
+            if drain is not None:
+                await drain()
+
+    def _render_record(self, record: Any, block: Callable[[SpytulaNode, Any], None]) -> Any:
+        """
+        Helper method to build the data of a single record with the given block.
+
+        Args:
+            record (Any): The record to render.
+            block (callable): Function that takes a node and a record, and fills the node.
+
+        Returns:
+            Any: The data of the record, under the root key if one is set.
+        """
+        record_node = self._new_node()
+        block(record_node, record)
+        if self._root:
+            return record_node._data[self._root]
+        return record_node._data
+
+    def iter_ndjson(self, records: Iterable[Any], block: Callable[[SpytulaNode, Any], None],
+                    backend: str = None, as_bytes: bool = False, **kwargs) -> Iterator[Union[str, bytes]]:
+        """
+        Render records one by one as JSON Lines (NDJSON).
+
+        Each record is rendered with the given block into a fresh node, formatted with the key
+        format of this builder and encoded on a single line, so memory stays bounded.
+
+        Args:
+            records (Iterable[Any]): The records to render.
+            block (callable): Function that takes a node and a record, and fills the node.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            as_bytes (bool): Yield UTF-8 encoded bytes instead of strings.
+            **kwargs: Additional keyword arguments to pass to json.dumps (except `indent`).
+
+        Yields:
+            str or bytes: One line of JSON per record, ending with a newline.
+
+        Raises:
+            ValueError: If `indent` is given.
+
+        Example:
+            ```python
+            def render_dish(dish_builder, dish):
+                dish_builder.attributes(dish, ['name', 'origin'])
+
+            for line in builder.iter_ndjson(dishes, render_dish):
+                print(line, end='')
+            ```
+        """
+        if kwargs.get('indent') is not None:
+            raise ValueError("JSON Lines can't be indented.")
+        newline = b'\n' if as_bytes else '\n'
+        for record in records:
+            yield self._encode_json(self._render_record(record, block), backend, as_bytes, **kwargs) + newline
+
+    def to_ndjson(self, records: Iterable[Any], block: Callable[[SpytulaNode, Any], None],
+                  backend: str = None, **kwargs) -> str:
+        """
+        Render records as a JSON Lines (NDJSON) string.
+
+        Args:
+            records (Iterable[Any]): The records to render.
+            block (callable): Function that takes a node and a record, and fills the node.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            **kwargs: Additional keyword arguments to pass to json.dumps (except `indent`).
+
+        Returns:
+            str: One line of JSON per record.
+
+        Example:
+            ```python
+            ndjson_output = builder.to_ndjson(dishes, render_dish)
+            ```
+        """
+        return ''.join(self.iter_ndjson(records, block, backend, **kwargs))
+
+    def dump_ndjson(self, fp: Any, records: Iterable[Any], block: Callable[[SpytulaNode, Any], None],
+                    batch_size: int = 1000, flush: bool = False, backend: str = None, **kwargs) -> int:
+        """
+        Write records as JSON Lines (NDJSON) to a file-like object, in batches.
+
+        Lines are encoded as bytes for binary files and as strings otherwise.
+
+        Args:
+            fp (Any): A text or binary file-like object (file, pipe, socket wrapper...).
+            records (Iterable[Any]): The records to render.
+            block (callable): Function that takes a node and a record, and fills the node.
+            batch_size (int): Number of lines to write at once.
+            flush (bool): Flush the file after each batch, so readers get lines as soon as possible.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            **kwargs: Additional keyword arguments to pass to json.dumps (except `indent`).
+
+        Returns:
+            int: The number of records written.
+
+        Example:
+            ```python
+            with open('dishes.ndjson', 'wb') as fp:
+                builder.dump_ndjson(fp, dishes, render_dish, batch_size=5000)
+            ```
+        """
+        mode = getattr(fp, 'mode', '')
+        as_bytes = isinstance(fp, (io.RawIOBase, io.BufferedIOBase)) or (isinstance(mode, str) and 'b' in mode)
+        separator = b'' if as_bytes else ''
+        batch = []
+        count = 0
+        for line in self.iter_ndjson(records, block, backend, as_bytes, **kwargs):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                fp.write(separator.join(batch))
+                count += len(batch)
+                batch.clear()
+                if flush:
+                    fp.flush()
+        if batch:
+            fp.write(separator.join(batch))
+            count += len(batch)
+            if flush:
+                fp.flush()
+        return count
+
+    def _parallel_config(self, backend: str = None, **kwargs) -> Dict[str, Any]:
+        """
+        Helper method to collect the configuration a worker needs to render records like this builder.
+
+        Args:
+            backend (str): The JSON backend to use in the workers.
+            **kwargs: Keyword arguments to pass to json.dumps in the workers.
+
+        Returns:
+            Dict[str, Any]: The configuration, which can be pickled.
+        """
+        # Workers don't share the global backend of this process, so the name of the backend is resolved here
+        from .serializers.backends import get_json_backend
+        json_backend = get_json_backend(backend or self._json_backend)
+        separators = kwargs.get('separators')
+        return {
+            'builder_class': type(self),
+            'root': self._root,
+            'key_format': self._key_format,
+            'key_format_in_place': self._key_format_in_place,
+            'json_backend': json_backend.name,
+            'json_options': kwargs,
+            'item_separator': separators[0] if separators else ', ',
+        }
+
+    @classmethod
+    def _from_parallel_config(cls, config: Dict[str, Any]) -> 'SpytulaBuilder':
+        """
+        Helper method to create a builder from the configuration collected by `_parallel_config`.
+
+        Args:
+            config (Dict[str, Any]): The configuration.
+
+        Returns:
+            SpytulaBuilder: New instance of SpytulaBuilder.
+        """
+        builder = cls()
+        builder.root(config['root'])
+        if config['key_format']:
+            builder.key_format(in_place=config['key_format_in_place'], **config['key_format'])
+        builder._json_backend = config['json_backend']
+        return builder
+
+    def render_parallel(self, records: Iterable[Any], block: Callable[[SpytulaNode, Any], None],
+                        workers: int = None, chunk_size: int = 1000, ndjson: bool = False,
+                        executor: 'Executor' = None, backend: str = None, **kwargs) -> str:
+        """
+        Render a large collection of records in a pool of processes.
+
+        Records are split in chunks, rendered and serialized by the workers with the root, key format
+        and JSON backend of this builder, and the chunks are concatenated in the original order.
+        The block and the records must be picklable: the block must be a module-level function.
+
+        Args:
+            records (Iterable[Any]): The records to render.
+            block (callable): Function that takes a node and a record, and fills the node.
+            workers (int): Number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int): Number of records rendered by a worker at once.
+            ndjson (bool): Render JSON Lines instead of a JSON array.
+            executor (Executor): An existing executor to use instead of a new process pool.
+            backend (str): The JSON backend to use. Defaults to the builder's backend, or the global one.
+            **kwargs: Additional keyword arguments to pass to json.dumps (except `indent`).
+
+        Returns:
+            str: A JSON array with one item per record, or one line of JSON per record.
+
+        Raises:
+            ValueError: If `indent` is given.
+
+        Example:
+            ```python
+            def render_dish(dish_builder, dish):
+                dish_builder.attributes(dish, ['name', 'origin'])
+
+            json_output = builder.render_parallel(dishes, render_dish, workers=4, chunk_size=5000)
+            ```
+        """
+        if kwargs.get('indent') is not None:
+            raise ValueError("Records rendered in parallel can't be indented.")
+        from .parallel import map_chunks
+        config = self._parallel_config(backend, **kwargs)
+        chunks = map_chunks(config, block, records, workers, chunk_size, ndjson, executor)
+        if ndjson:
+            return ''.join(chunks)
+        return '[' + config['item_separator'].join(chunks) + ']'
+
+    def to_msgpack(self, default: Callable[[Any], Any] = None) -> bytes:
+        """
+        Convert the data to MessagePack, a compact binary format.
+
+        The msgpack library is used when it is installed, and a pure-Python encoder otherwise,
+        which formats the keys while walking the data. Both produce the same output.
+
+        Args:
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            bytes: The MessagePack document.
+
+        Example:
+            ```python
+            response.body = builder.to_msgpack()
+            ```
+        """
+        self._resolve_lazy(self._data)
+        from .serializers import msgpack as msgpack_serializer
+        recorder = profiling.Recorder(self, 'to_msgpack') if profiling._observers else None
+        data = self._stored_data(self._limit_data(self.data))
+        output = msgpack_serializer.packb(data, self._format_data, self._key_formatter, default)
+        if recorder is not None:
+            recorder.finish(self.data, output)
+        return output
+
+    def dump_msgpack(self, fp: BinaryIO, buffer_size: int = 1 << 16, default: Callable[[Any], Any] = None) -> None:
+        """
+        Write the data as MessagePack to a binary file-like object, chunk by chunk.
+
+        The data is walked once, without building a formatted copy or the full document.
+
+        Args:
+            fp (BinaryIO): Any object with a `write` method accepting bytes.
+            buffer_size (int): Number of bytes to buffer between two writes.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Example:
+            ```python
+            with open('ramen.msgpack', 'wb') as fp:
+                builder.dump_msgpack(fp)
+            ```
+        """
+        from .serializers import msgpack as msgpack_serializer
+        self._dump_binary(msgpack_serializer.MsgPackWriter, 'dump_msgpack', fp, buffer_size, default)
+
+    def to_cbor(self, default: Callable[[Any], Any] = None) -> bytes:
+        """
+        Convert the data to CBOR, the Concise Binary Object Representation (RFC 8949).
+
+        The cbor2 library is used when it is installed, and a pure-Python encoder otherwise,
+        which formats the keys while walking the data. Both produce the same output.
+
+        Args:
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            bytes: The CBOR document.
+
+        Example:
+            ```python
+            response.body = builder.to_cbor()
+            ```
+        """
+        self._resolve_lazy(self._data)
+        from .serializers import cbor as cbor_serializer
+        recorder = profiling.Recorder(self, 'to_cbor') if profiling._observers else None
+        data = self._stored_data(self._limit_data(self.data))
+        output = cbor_serializer.dumps(data, self._format_data, self._key_formatter, default)
+        if recorder is not None:
+            recorder.finish(self.data, output)
+        return output
+
+    def dump_cbor(self, fp: BinaryIO, buffer_size: int = 1 << 16, default: Callable[[Any], Any] = None) -> None:
+        """
+        Write the data as CBOR to a binary file-like object, chunk by chunk.
+
+        The data is walked once, without building a formatted copy or the full document.
+
+        Args:
+            fp (BinaryIO): Any object with a `write` method accepting bytes.
+            buffer_size (int): Number of bytes to buffer between two writes.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Example:
+            ```python
+            with open('ramen.cbor', 'wb') as fp:
+                builder.dump_cbor(fp)
+            ```
+        """
+        from .serializers import cbor as cbor_serializer
+        self._dump_binary(cbor_serializer.CBORWriter, 'dump_cbor', fp, buffer_size, default)
+
+    def _dump_binary(self, writer_class: type, operation: str, fp: BinaryIO, buffer_size: int,
+                     default: Callable[[Any], Any] = None) -> None:
+        """
+        Helper method to write the data to a file-like object with a binary writer.
+
+        Args:
+            writer_class (type): The BinaryWriter subclass to use.
+            operation (str): The name of the method, for profiling.
+            fp (BinaryIO): Any object with a `write` method accepting bytes.
+            buffer_size (int): Number of bytes to buffer between two writes.
+            default (callable): Function called for objects that can't otherwise be serialized.
+        """
+        self._resolve_lazy(self._data)
+        recorder = profiling.Recorder(self, operation) if profiling._observers else None
+        if recorder is not None:
+            fp = recorder.writer(fp)
+        writer_class(self._key_formatter, default).dump(self._limit_data(self.data), fp, buffer_size)
+        if recorder is not None:
+            recorder.finish(self.data, output_bytes=fp.output_bytes)
 
     def to_yaml(self, *args, **kwargs) -> str:
         """
@@ -289,14 +1155,105 @@ class SpytulaBuilder(DataFormattingMixin):
             print(yaml_data)
             ```
         """
-        class OrderedLoader(yaml.SafeDumper):
-            pass
+        self._resolve_lazy(self._data)
+        from .serializers import yaml as yaml_serializer
+        recorder = profiling.Recorder(self, 'to_yaml') if profiling._observers else None
+        if recorder is None:
+            return yaml_serializer.dump(self._format_data(self._limit_data(self.data)), None, *args,
+                                        format_key=self._key_formatter, **kwargs)
+        yaml_output = yaml_serializer.dump(recorder.format_data(self, self._limit_data(self.data)), None,
+                                           *args, format_key=self._key_formatter, **kwargs)
+        recorder.finish(self.data, yaml_output)
+        return yaml_output
+
+    def dump_yaml(self, stream: Any, *args, **kwargs) -> None:
+        """
+        Write the data as YAML directly to a stream.
+
+        Args:
+            stream (Any): A text or binary stream to write to.
+            *args: Additional positional arguments to pass to yaml.dump.
+            **kwargs: Additional keyword arguments to pass to yaml.dump.
+
+        Example:
+            ```python
+            with open('ramen.yml', 'w') as stream:
+                builder.dump_yaml(stream)
+            ```
+        """
+        self._resolve_lazy(self._data)
+        from .serializers import yaml as yaml_serializer
+        recorder = profiling.Recorder(self, 'dump_yaml') if profiling._observers else None
+        if recorder is None:
+            yaml_serializer.dump(self._format_data(self._limit_data(self.data)), stream, *args,
+                                 format_key=self._key_formatter, **kwargs)
+            return
+        stream = recorder.writer(stream)
+        yaml_serializer.dump(recorder.format_data(self, self._limit_data(self.data)), stream, *args,
+                             format_key=self._key_formatter, **kwargs)
+        recorder.finish(self.data, output_bytes=stream.output_bytes)
+
+    @staticmethod
+    def dump_yaml_all(builders: Iterable['SpytulaBuilder'], stream: Any = None, *args, **kwargs) -> Union[str, None]:
+        """
+        Write many builders as a stream of YAML documents.
+
+        Builders are serialized one at a time, so a generator keeps memory bounded.
+
+        Args:
+            builders (Iterable[SpytulaBuilder]): The builders to serialize, one per document.
+            stream (Any): A stream to write to. When None, the documents are returned as a string.
+            *args: Additional positional arguments to pass to yaml.dump_all.
+            **kwargs: Additional keyword arguments to pass to yaml.dump_all.
+
+        Returns:
+            str: The YAML documents when no stream is given, otherwise None.
+
+        Example:
+            ```python
+            with open('menu.yml', 'w') as stream:
+                SpytulaBuilder.dump_yaml_all(dish_builders, stream)
+            ```
+        """
+        from .serializers import yaml as yaml_serializer
+
+        def documents() -> Iterator[Any]:
+            for builder in builders:
+                builder._resolve_lazy(builder._data)
+                data = builder._format_data(builder._limit_data(builder.data))
+                yield yaml_serializer.KeyFormattedDocument(data, builder._key_formatter)
+        return yaml_serializer.dump_all(documents(), stream, *args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def nested_node_class(builder_class: type, node_class: type = SpytulaNode) -> type:
+    """
+    Return the class of the nodes nested in builders of the given class, created once per class.
+
+    Nested nodes are instances of the builder class, with its whole API, initialized like the
+    given node class: only their data is set, and their other attributes are the defaults of the
+    builder class. Builder classes defining their own `__init__` still have it called for every node.
+
+    Args:
+        builder_class (type): The class of the builders, like SpytulaBuilder or one of its subclasses.
+        node_class (type): The node class whose initialization is used, like SpytulaNode or TrackingNode.
+
+    Returns:
+        type: The class of the nested nodes.
+    """
+    init = node_class.__init__
+    if builder_class.__init__ is not SpytulaBuilder.__init__:
+        node_init = init
+
+        def init(self) -> None:
+            builder_class.__init__(self)
+            node_init(self)
 
-        def _dict_representer(dumper, data):
-            resolver = yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG
-            return dumper.represent_mapping(resolver, data.items())
+    namespace = {'__init__': init, '_list_class': node_class._list_class, '_node_class': None,
+                 '__module__': builder_class.__module__, '__qualname__': builder_class.__qualname__}
+    nested_class = type(builder_class.__name__, (builder_class,), namespace)
+    nested_class._node_class = nested_class
+    return nested_class
 
-        OrderedLoader.add_representer(OrderedDict, _dict_representer)
 
-        formatted_data = self._format_data(self.data)
-        return yaml.dump(formatted_data, None, OrderedLoader, *args, **kwargs)
+SpytulaBuilder._node_class = nested_node_class(SpytulaBuilder)
@@ -0,0 +1,257 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Hashable, Iterable, Optional, Union
+
+
+Expiry = Union[None, int, float, timedelta]
+
+MISSING = object()
+
+
+def _expires_at(expires_in: Expiry, now: float) -> Optional[float]:
+    if expires_in is None:
+        return None
+    if isinstance(expires_in, timedelta):
+        expires_in = expires_in.total_seconds()
+    return now + expires_in
+
+
+class CacheStore(ABC):
+    """
+    Base class of the stores used to cache rendered fragments.
+
+    Stores implement `get`, `set` and `delete`, and may override `get_many` and `set_many` when the
+    backend supports bulk operations. Hits and misses are counted by `read` and `read_many`.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        # Builders of every thread share the store, so its statistics are updated under a lock
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the value stored for the given key, or MISSING.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Any: The cached value, or MISSING.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, expires_in: Expiry = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+            expires_in (int, float or timedelta): Time to live, in seconds. Never expires when None.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove a value from the store, if present.
+
+        Args:
+            key (Hashable): The cache key.
+        """
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Return the values stored for the given keys.
+
+        Args:
+            keys (Iterable[Hashable]): The cache keys.
+
+        Returns:
+            Dict[Hashable, Any]: The cached values, only for the keys found in the store.
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not MISSING:
+                found[key] = value
+        return found
+
+    def set_many(self, values: Dict[Hashable, Any], expires_in: Expiry = None) -> None:
+        """
+        Store many values.
+
+        Args:
+            values (Dict[Hashable, Any]): The values to store, by cache key.
+            expires_in (int, float or timedelta): Time to live, in seconds. Never expires when None.
+        """
+        for key, value in values.items():
+            self.set(key, value, expires_in)
+
+    def read(self, key: Hashable) -> Any:
+        """
+        Return the value stored for the given key, or MISSING, and count the hit or miss.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Any: The cached value, or MISSING.
+        """
+        value = self.get(key)
+        with self._stats_lock:
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def read_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Return the values stored for the given keys, and count the hits and misses.
+
+        Args:
+            keys (Iterable[Hashable]): The cache keys.
+
+        Returns:
+            Dict[Hashable, Any]: The cached values, only for the keys found in the store.
+        """
+        keys = list(keys)
+        found = self.get_many(keys)
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+
+class MemoryStore(CacheStore):
+    """
+    In-process store keeping the most recently used fragments.
+
+    Values are kept by reference, so cached fragments must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        Initialize a new MemoryStore instance.
+
+        Args:
+            maxsize (int): Maximum number of fragments to keep.
+        """
+        super().__init__()
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_in: Expiry = None) -> None:
+        with self._lock:
+            self._entries[key] = (_expires_at(expires_in, time.monotonic()), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove every fragment from the store.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class FileStore(CacheStore):
+    """
+    Store keeping each fragment in a pickle file of the given directory.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize a new FileStore instance.
+
+        Args:
+            directory (str): The directory where fragments are stored. It is created if needed.
+        """
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode('utf-8')).hexdigest())
+
+    def get(self, key: Hashable) -> Any:
+        try:
+            with open(self._path(key), 'rb') as fp:
+                expires_at, value = pickle.load(fp)
+        except FileNotFoundError:
+            return MISSING
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return MISSING
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_in: Expiry = None) -> None:
+        path = self._path(key)
+        temporary_path = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        with open(temporary_path, 'wb') as fp:
+            pickle.dump((_expires_at(expires_in, time.time()), value), fp)
+        os.replace(temporary_path, path)
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+_default_store: CacheStore = MemoryStore()
+
+
+def get_default_store() -> CacheStore:
+    """
+    Return the store used by `cache` and `cache_each` when none is given.
+
+    Returns:
+        CacheStore: The default store.
+    """
+    return _default_store
+
+
+def set_default_store(store: CacheStore) -> None:
+    """
+    Set the store used by `cache` and `cache_each` when none is given.
+
+    Args:
+        store (CacheStore): The new default store.
+    """
+    global _default_store
+    _default_store = store
@@ -0,0 +1,54 @@
+import sys
+
+from itertools import repeat
+from typing import Any, Dict, List, Sequence
+
+
+def column_values(values: Any) -> List[Any]:
+    """
+    Convert a column to a list of JSON-native values.
+
+    NumPy arrays (and any object with a `tolist` method, like pandas series) are converted in a
+    single call. The NumPy scalars of other columns are converted one by one, so the other values
+    are kept as they are. They can only be found once NumPy was imported.
+
+    Args:
+        values (Any): The values of the column.
+
+    Returns:
+        List[Any]: The values of the column as native Python objects.
+    """
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    values = list(values)
+    numpy = sys.modules.get('numpy')
+    if numpy is None:
+        return values
+    generic = numpy.generic
+    return [value.item() if isinstance(value, generic) else value for value in values]
+
+
+def columns_to_rows(columns: Any) -> List[Dict[str, Any]]:
+    """
+    Convert columnar data to a list of rows.
+
+    Args:
+        columns (Any): A mapping of column names to values, or a NumPy structured or record array.
+
+    Returns:
+        List[Dict[str, Any]]: One dictionary per row.
+
+    Raises:
+        ValueError: If the columns don't all have the same length.
+    """
+    names: Sequence[str]
+    dtype = getattr(columns, 'dtype', None)
+    if dtype is not None and dtype.names:
+        names = dtype.names
+        values = [column_values(columns[name]) for name in names]
+    else:
+        names = list(columns)
+        values = [column_values(columns[name]) for name in names]
+    if len({len(column) for column in values}) > 1:
+        raise ValueError("All columns must have the same length.")
+    return list(map(dict, map(zip, repeat(names), zip(*values))))
@@ -0,0 +1,364 @@
+import threading
+import weakref
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .node import SpytulaNode, _pending_lazy as _pending
+from .serializers.json import stored_items, stored_values
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ThreadPoolExecutor
+
+
+_UNRESOLVED = object()
+
+_SCALARS = (str, int, float)
+
+# `_pending` holds weak references to the lazy values created and not resolved yet. They are
+# removed when their value is resolved or garbage collected.
+_pending_lock = threading.Lock()
+
+
+class Lazy:
+    """
+    A value computed only when the builder holding it is serialized, created by `lazy` or `Batch.load`.
+
+    Every lazy value of a builder is resolved at once, concurrently, right before it is
+    serialized, and then replaced by its result in the builder's data. Values that never
+    end up in a serialized builder are never computed.
+    """
+
+    __slots__ = ('function', 'args', 'kwargs', 'batch', '_value', '_ref', '__weakref__')
+
+    def __init__(self, function: Optional[Callable[..., Any]], args: Tuple[Any, ...] = (),
+                 kwargs: Optional[Dict[str, Any]] = None, batch: Optional['Batch'] = None) -> None:
+        """
+        Initialize a new Lazy instance.
+
+        Args:
+            function (callable): Function computing the value. It may return an awaitable.
+            args (tuple): Positional arguments to pass to the function.
+            kwargs (dict): Keyword arguments to pass to the function.
+            batch (Batch): The batch loading the value, instead of the function. The key is the first argument.
+        """
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.batch = batch
+        self._value = _UNRESOLVED
+        self._ref = weakref.ref(self, _pending.discard)
+        with _pending_lock:
+            _pending.add(self._ref)
+
+    @property
+    def resolved(self) -> bool:
+        return self._value is not _UNRESOLVED
+
+    @property
+    def value(self) -> Any:
+        """
+        The result of the function, computed on first access when the value wasn't resolved with its builder.
+        """
+        if self._value is _UNRESOLVED:
+            _run(_calls([self]), None)
+        return self._value
+
+    def _set(self, value: Any) -> None:
+        if self._value is _UNRESOLVED:
+            with _pending_lock:
+                _pending.discard(self._ref)
+        self._value = value
+
+    def __repr__(self) -> str:
+        if self.resolved:
+            return f'Lazy(value={self._value!r})'
+        if self.batch is not None:
+            return f'Lazy(batch={self.batch!r}, key={self.args[0]!r})'
+        return f'Lazy({self.function!r})'
+
+
+class Batch:
+    """
+    A loader computing many lazy values with a single call, like a bulk query.
+
+    The keys of every value loaded by the batch in a builder are collected, deduplicated and
+    passed to `load_many` at once when the builder is serialized.
+    """
+
+    def __init__(self, load_many: Callable[[List[Hashable]], Union[Sequence[Any], Mapping]],
+                 max_size: Optional[int] = None) -> None:
+        """
+        Initialize a new Batch instance.
+
+        Args:
+            load_many (callable): Function that takes a list of keys, and returns their values as a list
+                                  in the same order, or as a mapping by key. It may return an awaitable.
+            max_size (int): Maximum number of keys passed to a single call, if any.
+        """
+        self.load_many = load_many
+        self.max_size = max_size
+
+    def load(self, key: Hashable) -> Lazy:
+        """
+        Create a lazy value loaded by this batch.
+
+        Args:
+            key (Hashable): The key of the value.
+
+        Returns:
+            Lazy: The lazy value.
+
+        Example:
+            ```python
+            authors = Batch(lambda ids: {author.id: author.name for author in Author.objects.filter(id__in=ids)})
+
+            for recipe_builder, recipe in builder.each('recipes', recipes):
+                recipe_builder.attribute('author', authors.load(recipe.author_id))
+            ```
+        """
+        return Lazy(None, (key,), batch=self)
+
+    def __repr__(self) -> str:
+        return f'Batch({self.load_many!r})'
+
+
+def has_pending() -> bool:
+    """
+    Return whether any lazy value, in any builder, is not resolved yet.
+
+    Returns:
+        bool: True if some lazy value is pending.
+    """
+    return bool(_pending)
+
+
+def lazy(function: Callable[..., Any], *args, **kwargs) -> Lazy:
+    """
+    Defer a computation until the builder holding its result is serialized.
+
+    Args:
+        function (callable): Function computing the value. It may be a coroutine function.
+        *args: Positional arguments to pass to the function.
+        **kwargs: Keyword arguments to pass to the function.
+
+    Returns:
+        Lazy: The lazy value, to add to a builder.
+
+    Example:
+        ```python
+        builder.attribute('stats', spytula.lazy(stats_service.fetch, dish.id))
+        ```
+    """
+    return Lazy(function, args, kwargs)
+
+
+class _Call:
+    """
+    A call of a lazy value's function.
+    """
+
+    __slots__ = ('function', 'args', 'kwargs', 'values')
+
+    def __init__(self, value: Lazy) -> None:
+        self.function = value.function
+        self.args = value.args
+        self.kwargs = value.kwargs
+        self.values = [value]
+
+    def __call__(self) -> Any:
+        return self.function(*self.args, **self.kwargs)
+
+    def finish(self, result: Any) -> None:
+        for value in self.values:
+            value._set(result)
+
+
+class _BatchCall:
+    """
+    A call of a batch's `load_many` function, with the keys of many lazy values.
+    """
+
+    __slots__ = ('function', 'keys', 'values')
+
+    def __init__(self, batch: Batch, keys: Dict[Hashable, List[Lazy]]) -> None:
+        self.function = batch.load_many
+        self.keys = list(keys)
+        self.values = keys
+
+    def __call__(self) -> Any:
+        return self.function(self.keys)
+
+    def finish(self, result: Any) -> None:
+        if isinstance(result, Mapping):
+            results = [result[key] for key in self.keys]
+        else:
+            results = list(result)
+            if len(results) != len(self.keys):
+                raise ValueError(f'The batch returned {len(results)} values for {len(self.keys)} keys.')
+        for key, result in zip(self.keys, results):
+            for value in self.values[key]:
+                value._set(result)
+
+
+def _calls(values: Iterable[Lazy]) -> List[Union[_Call, _BatchCall]]:
+    """
+    Group unresolved lazy values into calls: one per function, and one per batch of keys.
+    """
+    calls: List[Union[_Call, _BatchCall]] = []
+    batches: Dict[Batch, Dict[Hashable, List[Lazy]]] = {}
+    seen = set()
+    for value in values:
+        if value.resolved or id(value) in seen:
+            continue
+        seen.add(id(value))
+        if value.batch is None:
+            calls.append(_Call(value))
+        else:
+            batches.setdefault(value.batch, {}).setdefault(value.args[0], []).append(value)
+    for batch, keys in batches.items():
+        size = batch.max_size or len(keys) or 1
+        items = list(keys.items())
+        for start in range(0, len(items), size):
+            calls.append(_BatchCall(batch, dict(items[start:start + size])))
+    return calls
+
+
+@lru_cache(maxsize=None)
+def _default_executor() -> 'ThreadPoolExecutor':
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(thread_name_prefix='spytula-lazy')
+
+
+def _run(calls: List[Union[_Call, _BatchCall]], executor: Optional['Executor']) -> None:
+    """
+    Run the calls in the executor, or in the default thread pool, and store their results.
+
+    Awaitables returned by the calls are gathered in a new event loop.
+    """
+    if not calls:
+        return
+    if len(calls) == 1:
+        results = [calls[0]()]
+    else:
+        pool = executor or _default_executor()
+        futures = [pool.submit(call) for call in calls]
+        results = [future.result() for future in futures]
+    awaitables = [index for index, result in enumerate(results) if hasattr(result, '__await__')]
+    if awaitables:
+        import asyncio
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            for index in awaitables:
+                if hasattr(results[index], 'close'):
+                    results[index].close()
+            raise RuntimeError('Lazy values returning awaitables must be resolved with `await builder.aresolve()` '
+                               'inside a running event loop.')
+
+        async def gather() -> List[Any]:
+            return await asyncio.gather(*(results[index] for index in awaitables))
+
+        for index, result in zip(awaitables, asyncio.run(gather())):
+            results[index] = result
+    for call, result in zip(calls, results):
+        call.finish(result)
+
+
+async def _arun(calls: List[Union[_Call, _BatchCall]], executor: Optional['Executor']) -> None:
+    """
+    Run the calls concurrently in the running event loop, and store their results.
+
+    Coroutine functions are awaited in the loop, and other functions run in the executor.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+
+    async def run(call: Union[_Call, _BatchCall]) -> None:
+        if asyncio.iscoroutinefunction(call.function):
+            result = call()
+        else:
+            result = await loop.run_in_executor(executor, call)
+        if hasattr(result, '__await__'):
+            result = await result
+        call.finish(result)
+
+    await asyncio.gather(*(run(call) for call in calls))
+
+
+def _collect(values: List[Tuple[Any, Any, Any]]) -> List[Tuple[Any, Any, Lazy]]:
+    """
+    Find the lazy values in the given (container, key or index, value) triples and their children.
+
+    Lazy values found in tuples can't be replaced, so their container is None.
+    """
+    found = []
+    # Children are pushed in reverse order, so lazy values are found in the order of the document
+    stack = list(reversed(values))
+    while stack:
+        container, slot, value = stack.pop()
+        if isinstance(value, Lazy):
+            found.append((container, slot, value))
+            continue
+        if isinstance(value, SpytulaNode):
+            value = value._data
+        if isinstance(value, dict):
+            children = [(value, key, item) for key, item in stored_items(value) if not isinstance(item, _SCALARS)]
+        elif isinstance(value, list):
+            children = [(value, index, item) for index, item in enumerate(stored_values(value))
+                        if not isinstance(item, _SCALARS)]
+        elif isinstance(value, tuple):
+            children = [(None, None, item) for item in value if not isinstance(item, _SCALARS)]
+        else:
+            continue
+        stack.extend(reversed(children))
+    return found
+
+
+def _replace(found: List[Tuple[Any, Any, Lazy]]) -> List[Tuple[Any, Any, Any]]:
+    """
+    Replace the resolved lazy values by their results, returning the results to look into.
+    """
+    results = []
+    for container, slot, value in found:
+        if container is not None:
+            container[slot] = value._value
+        results.append((container, slot, value._value))
+    return results
+
+
+def resolve(data: Any, executor: Optional['Executor'] = None) -> None:
+    """
+    Resolve every lazy value in the data, and replace them by their results.
+
+    Functions run concurrently in the executor, or in a shared thread pool, and the keys of
+    each batch are loaded with a single call. Lazy values returned by functions are resolved too.
+
+    Args:
+        data (Any): The data, which may contain nodes.
+        executor (Executor): The executor running the functions.
+    """
+    found = _collect([(None, None, data)])
+    while found:
+        _run(_calls(value for _, _, value in found), executor)
+        found = _collect(_replace(found))
+
+
+async def aresolve(data: Any, executor: Optional['Executor'] = None) -> None:
+    """
+    Resolve every lazy value in the data in the running event loop, and replace them by their results.
+
+    Coroutine functions are gathered, and other functions run in the executor, or in the
+    default executor of the loop.
+
+    Args:
+        data (Any): The data, which may contain nodes.
+        executor (Executor): The executor running the functions that aren't coroutine functions.
+    """
+    found = _collect([(None, None, data)])
+    while found:
+        await _arun(_calls(value for _, _, value in found), executor)
+        found = _collect(_replace(found))
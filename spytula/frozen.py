@@ -0,0 +1,170 @@
+import json
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .serializers.json import JSONWriter, RawJSON
+
+
+_UNPARSED = object()
+
+# Options of JSONWriter (key format, indent, separators, ensure_ascii, sort_keys, depth) matching `FrozenNode.text`
+_DEFAULT_OPTIONS = (None, None, ', ', ': ', True, False, 0)
+
+
+def _format_keys(data: Any, format_key: Callable[[str], str]) -> Any:
+    """
+    Return a copy of parsed JSON with every key formatted.
+
+    Args:
+        data (Any): The parsed JSON.
+        format_key (callable): Function applied to every key.
+
+    Returns:
+        Any: The formatted copy.
+    """
+    holder = [data]
+    # Each entry is a (container, key or index, value to format) triple
+    stack: List[tuple] = [(holder, 0, data)]
+    while stack:
+        container, slot, value = stack.pop()
+        if isinstance(value, dict):
+            # When two keys format the same way, the last one wins
+            value = {format_key(key): item for key, item in value.items()}
+            stack.extend((value, key, item) for key, item in value.items() if isinstance(item, (dict, list)))
+        elif isinstance(value, list):
+            value = list(value)
+            stack.extend((value, index, item) for index, item in enumerate(value) if isinstance(item, (dict, list)))
+        container[slot] = value
+    return holder[0]
+
+
+class FrozenNode(RawJSON):
+    """
+    An immutable snapshot of a builder, created by `SpytulaBuilder.freeze`.
+
+    The snapshot is serialized once, when it is created, and can then be added to any number
+    of builders, by reference, with `attribute`, `partial` or `merge`. Its keys are kept as they
+    were added, and written with the key format of the builder holding the snapshot, like the
+    keys of nested nodes. Its JSON is spliced into their output, and the JSON written with
+    another key format or other options (like `indent` or `sort_keys`) is memoized too.
+    Snapshots are never modified, so they can be shared between threads.
+    """
+
+    __slots__ = ('_data', '_encoded', '_fields', '_format_key')
+
+    def __init__(self, text: str, data: Any = _UNPARSED, format_key: Optional[Callable[[str], str]] = None) -> None:
+        """
+        Initialize a new FrozenNode instance.
+
+        Args:
+            text (str): The JSON of the snapshot, as written by `json.dumps` with its default options,
+                        with unformatted keys.
+            data (Any): The parsed JSON, if already available. Must not be modified afterwards.
+            format_key (callable): The key format of the frozen builder, applied by `to_json` and
+                                   `to_json_bytes`, if any.
+        """
+        super().__init__(text)
+        self._data = data
+        self._encoded: Dict[Tuple[Any, ...], Any] = {}
+        self._fields: Optional[Dict[str, 'FrozenNode']] = None
+        self._format_key = format_key
+
+    @classmethod
+    def from_data(cls, data: Any, format_key: Optional[Callable[[str], str]] = None,
+                  default: Optional[Callable[[Any], Any]] = None) -> 'FrozenNode':
+        """
+        Create a snapshot of the given data.
+
+        Args:
+            data (Any): The data, which may contain nodes and raw JSON.
+            format_key (callable): The key format of the frozen builder, if any. The snapshot is
+                                   serialized with unformatted keys.
+            default (callable): Function called for objects that can't otherwise be serialized.
+
+        Returns:
+            FrozenNode: New instance of FrozenNode.
+        """
+        return cls(JSONWriter(default=default).encode(data), format_key=format_key)
+
+    def _plain_data(self) -> Any:
+        if self._data is _UNPARSED:
+            self._data = json.loads(self.text)
+        return self._data
+
+    def _formatted_data(self, format_key: Optional[Callable[[str], str]] = None) -> Any:
+        if format_key is None:
+            return self._plain_data()
+        key = ('data', format_key)
+        data = self._encoded.get(key)
+        if data is None:
+            data = self._encoded[key] = _format_keys(self._plain_data(), format_key)
+        return data
+
+    def _formatted_text(self, format_key: Optional[Callable[[str], str]] = None) -> str:
+        if format_key is None:
+            return self.text
+        text = self._encoded.get((format_key,) + _DEFAULT_OPTIONS[1:])
+        return text if text is not None else self._encode(JSONWriter(format_key=format_key), 0)
+
+    def _encode(self, writer: JSONWriter, depth: int) -> str:
+        indent = writer.indent
+        options = (writer.format_key, indent, writer.item_separator, writer.key_separator, writer.ensure_ascii,
+                   writer.sort_keys, depth if indent else 0)
+        if options == _DEFAULT_OPTIONS:
+            return self.text
+        text = self._encoded.get(options)
+        if text is None:
+            text = writer._encode_nested(self._formatted_data(writer.format_key), depth)
+            self._encoded[options] = text
+        return text
+
+    def fields(self) -> Dict[str, 'FrozenNode']:
+        """
+        Return a snapshot of each value of the snapshot, by unformatted key, to merge them into a builder.
+
+        Returns:
+            Dict[str, FrozenNode]: The snapshots of the values.
+
+        Raises:
+            TypeError: If the snapshot is not an object.
+        """
+        if self._fields is None:
+            data = self._plain_data()
+            if not isinstance(data, dict):
+                raise TypeError("Only the snapshot of an object can be merged.")
+            self._fields = {key: FrozenNode(json.dumps(value), value, self._format_key) for key, value in data.items()}
+        return self._fields
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Return the JSON of the snapshot, with the key format of the frozen builder.
+
+        Args:
+            **kwargs: Keyword arguments accepted by json.dumps that change the layout of the JSON
+                      (indent, separators, ensure_ascii and sort_keys).
+
+        Returns:
+            str: A JSON-formatted string.
+        """
+        return self._encode(JSONWriter(format_key=self._format_key, **kwargs), 0)
+
+    def to_json_bytes(self, **kwargs) -> bytes:
+        """
+        Return the UTF-8 encoded JSON of the snapshot, with the key format of the frozen builder.
+        The bytes are memoized.
+
+        Args:
+            **kwargs: Keyword arguments accepted by json.dumps that change the layout of the JSON
+                      (indent, separators, ensure_ascii and sort_keys).
+
+        Returns:
+            bytes: The UTF-8 encoded JSON document.
+        """
+        key = ('bytes', tuple(sorted(kwargs.items())))
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = self.to_json(**kwargs).encode('utf-8')
+        return encoded
+
+    def __repr__(self) -> str:
+        return f'FrozenNode({self.text!r})'
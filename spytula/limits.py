@@ -0,0 +1,589 @@
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .deferred import Lazy
+from .loading import RawSlice, YAMLEntry
+from .node import ListFull, SpytulaNode
+from .serializers.json import RawJSON, stored_items, stored_values, unwrap
+
+
+OVERFLOWS = ('raise', 'truncate', 'paginate')
+
+_DONE = object()
+
+_CONTAINERS = (dict, list, tuple, SpytulaNode, Lazy, YAMLEntry)
+
+FormatKey = Optional[Callable[[str], str]]
+
+
+class LimitExceeded(ValueError):
+    """
+    Raised when the data of a builder exceeds one of its limits.
+
+    Attributes:
+        limit (str): The exceeded limit: "max_bytes", "max_items" or "max_depth".
+        value (int): The value of the limit.
+        path (str): The JSON Pointer of the container where the limit was exceeded, before key formatting.
+    """
+
+    def __init__(self, limit: str, value: int, path: str = '') -> None:
+        super().__init__(f"{limit} of {value} exceeded at '{path}'")
+        self.limit = limit
+        self.value = value
+        self.path = path
+
+
+class Limits:
+    """
+    The limits of the output of a builder, set with `SpytulaBuilder.limits`.
+    """
+
+    __slots__ = ('max_bytes', 'max_items', 'max_depth', 'overflow', 'marker')
+
+    def __init__(self, max_bytes: Optional[int] = None, max_items: Optional[int] = None,
+                 max_depth: Optional[int] = None, overflow: str = 'raise', marker: Any = None) -> None:
+        """
+        Initialize a new Limits instance.
+
+        Args:
+            max_bytes (int): The maximum estimated size of the output.
+            max_items (int): The maximum number of items of each list.
+            max_depth (int): The maximum number of nested objects and lists.
+            overflow (str): What to do when a limit is exceeded: "raise", "truncate" or "paginate".
+            marker (Any): The value added at the end of truncated lists, and in place of the values
+                          nested too deeply, if any.
+
+        Raises:
+            ValueError: If the overflow strategy is unknown.
+        """
+        if overflow not in OVERFLOWS:
+            raise ValueError(f"Unknown overflow strategy: {overflow}. Expected one of {', '.join(OVERFLOWS)}.")
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.overflow = overflow
+        self.marker = marker
+
+
+class BoundedList(list):
+    """
+    A list of nodes holding at most `max_items` nodes, used by builders with a `max_items` limit.
+
+    When the list is full, adding a node raises LimitExceeded, or ListFull to stop `each`
+    when the list is truncated, after adding the marker.
+    """
+
+    limits: Limits
+
+    # Whether the marker was added. Instances get a __dict__, since slots would conflict with
+    # the slots of TrackedList.
+    _full = False
+
+    def append(self, value: Any) -> None:
+        limits = self.limits
+        if len(self) - self._full < limits.max_items:
+            super().append(value)
+            return
+        if limits.overflow == 'raise':
+            raise LimitExceeded('max_items', limits.max_items)
+        if not self._full and limits.marker is not None:
+            super().append(limits.marker)
+            self._full = True
+        raise ListFull()
+
+
+def bounded_node_class(node_class: type, limits: Limits) -> type:
+    """
+    Create a subclass of the given node class whose lists of nodes hold at most `limits.max_items` nodes.
+
+    Args:
+        node_class (type): The class of the nodes, like SpytulaNode or TrackingNode.
+        limits (Limits): The limits.
+
+    Returns:
+        type: The new node class.
+    """
+    list_class = type('BoundedList', (BoundedList, node_class._list_class), {'limits': limits})
+    namespace = {'__slots__': (), '_list_class': list_class, '_node_class': None}
+    bounded_class = type('Bounded' + node_class.__name__, (node_class,), namespace)
+    bounded_class._node_class = bounded_class
+    return bounded_class
+
+
+def _str_size(value: str, ensure_ascii: bool) -> int:
+    """
+    Return the size of the JSON of a string, in bytes. Non-ASCII characters are escaped as
+    `\\uXXXX` when `ensure_ascii` is True: 6 bytes for a character of the BMP, 12 for the
+    surrogate pair of a character outside of it.
+    """
+    if ensure_ascii:
+        return len(encode_basestring_ascii(value))
+    text = encode_basestring(value)
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def _scalar_size(value: Any, ensure_ascii: bool = True, format_key: FormatKey = None) -> int:
+    """
+    Return the estimated size of a value that isn't a list or a dictionary, in bytes. Snapshots are
+    written with the key format `format_key`.
+    """
+    if isinstance(value, str):
+        return _str_size(value, ensure_ascii)
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int):
+        return len(int.__repr__(value))
+    if isinstance(value, float):
+        return len(float.__repr__(value))
+    if isinstance(value, RawSlice):
+        return len(value)
+    if isinstance(value, RawJSON):
+        text = value._formatted_text(format_key)
+        return len(text) if text.isascii() else len(text.encode('utf-8'))
+    # Objects serialized by a `default` function
+    return 4
+
+
+def _key_size(key: Any, format_key: FormatKey, ensure_ascii: bool = True, separator_size: int = 2) -> int:
+    """
+    Return the size of a key of an object, followed by the key separator of `separator_size` bytes.
+    """
+    if isinstance(key, str):
+        if format_key is not None:
+            key = format_key(key)
+        return _str_size(key, ensure_ascii) + separator_size
+    # Keys that aren't strings are quoted
+    return _scalar_size(key, ensure_ascii) + 2 + separator_size
+
+
+def _pointer(path: Any) -> str:
+    """
+    Return the JSON Pointer of a linked (key, parent path) pair.
+    """
+    keys = []
+    while path is not None:
+        key, path = path
+        keys.append('/' + str(key).replace('~', '~0').replace('/', '~1'))
+    return ''.join(reversed(keys))
+
+
+class _Walk:
+    """
+    Walk data in document order, estimating the size of its JSON and checking the limits.
+
+    Separators default to the ones of json.dumps, like the indentation.
+    """
+
+    def __init__(self, limits: Limits, format_key: FormatKey = None, indent: Optional[int] = None,
+                 ensure_ascii: bool = True, separators: Optional[Tuple[str, str]] = None) -> None:
+        self.limits = limits
+        self.format_key = format_key
+        if separators is None:
+            separators = (',', ': ') if indent is not None else (', ', ': ')
+        self.item_separator_size = len(separators[0])
+        self.key_separator_size = len(separators[1])
+        self.indent = indent if isinstance(indent, int) else len(indent) if indent else 0
+        self.ensure_ascii = ensure_ascii
+        # Sizes of the keys, once formatted
+        self.key_sizes: Dict[Any, int] = {}
+
+    def _separator_size(self, depth: int) -> int:
+        """
+        Return the size of the separator preceding an item at the given depth, after the first one.
+        """
+        return self.item_separator_size + (1 + self.indent * depth if self.indent else 0)
+
+    def check(self, data: Any) -> None:
+        """
+        Raise LimitExceeded on the first list longer than `max_items` or container nested deeper
+        than `max_depth`, without estimating the size of the data.
+        """
+        limits = self.limits
+        max_items, max_depth, marker = limits.max_items, limits.max_depth, limits.marker
+        if max_items is None and max_depth is None:
+            return
+        stack: List[Tuple[Any, int, Any]] = [(data, 0, None)]
+        pop = stack.pop
+        while stack:
+            value, depth, path = pop()
+            value_type = type(value)
+            if value_type is not dict and value_type is not list:
+                value = unwrap(value)
+                value_type = type(value)
+            if value_type is dict or isinstance(value, dict):
+                items = stored_items(value)
+            elif value_type is list or isinstance(value, (list, tuple)):
+                items = enumerate(stored_values(value))
+                if max_items is not None and len(value) > max_items and not (
+                        len(value) == max_items + 1 and marker is not None and value[-1] is marker):
+                    # Lists truncated while building end with the marker
+                    raise LimitExceeded('max_items', max_items, _pointer(path))
+            else:
+                continue
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceeded('max_depth', max_depth, _pointer(path))
+            # Children are reversed, so limits are checked in the order of the document
+            stack.extend(reversed([(item, depth, (key, path)) for key, item in items
+                                   if type(item) is dict or type(item) is list or isinstance(item, _CONTAINERS)]))
+
+    def estimate(self, data: Any, check: bool = False, depth: int = 0) -> int:
+        """
+        Return the estimated size of the JSON of the data, raising LimitExceeded on the first
+        exceeded limit when `check` is True. `depth` is the number of containers holding the
+        data in the document, which sets the indentation of its lines.
+        """
+        limits = self.limits
+        max_bytes = limits.max_bytes if check else None
+        max_items = limits.max_items if check else None
+        max_depth = limits.max_depth if check else None
+        marker = limits.marker
+        key_sizes = self.key_sizes
+        indent = self.indent
+        item_separator_size = self.item_separator_size
+        key_separator_size = self.key_separator_size
+        ensure_ascii = self.ensure_ascii
+        size = 0
+        # Each entry is a (value, depth, path) triple. Paths are linked (key, parent path) pairs,
+        # only turned into pointers for errors.
+        stack: List[Tuple[Any, int, Any]] = [(data, depth, None)]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            value, depth, path = pop()
+            value_type = type(value)
+            if value_type is not dict and value_type is not list:
+                value = unwrap(value)
+                value_type = type(value)
+            if value_type is dict or isinstance(value, dict):
+                items = stored_items(value)
+                is_mapping = True
+            elif value_type is list or isinstance(value, (list, tuple)):
+                items = enumerate(stored_values(value))
+                is_mapping = False
+                if max_items is not None and len(value) > max_items and not (
+                        len(value) == max_items + 1 and marker is not None and value[-1] is marker):
+                    # Lists truncated while building end with the marker
+                    raise LimitExceeded('max_items', max_items, _pointer(path))
+            else:
+                size += _scalar_size(value, ensure_ascii, self.format_key)
+                continue
+            depth += 1
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceeded('max_depth', max_depth, _pointer(path))
+            length = len(value)
+            if indent:
+                # Items are separated by the item separator and a new line
+                size += (2 + item_separator_size * (length - 1) + length * (1 + indent * depth) + 1
+                         + indent * (depth - 1) if length else 2)
+            else:
+                size += 2 + item_separator_size * max(length - 1, 0)
+            first_child = len(stack)
+            for key, item in items:
+                if is_mapping:
+                    key_size = key_sizes.get(key)
+                    if key_size is None:
+                        key_size = key_sizes[key] = _key_size(key, self.format_key, ensure_ascii, key_separator_size)
+                    size += key_size
+                item_type = type(item)
+                if item_type is str:
+                    size += _str_size(item, ensure_ascii)
+                elif item_type is dict or item_type is list or isinstance(item, _CONTAINERS):
+                    push((item, depth, (key, path)))
+                else:
+                    size += _scalar_size(item, ensure_ascii, self.format_key)
+            if check:
+                # Children are reversed, so limits are checked in the order of the document
+                stack[first_child:] = stack[first_child:][::-1]
+                if max_bytes is not None and size > max_bytes:
+                    raise LimitExceeded('max_bytes', max_bytes, _pointer(path))
+        return size
+
+    def truncate(self, data: Any) -> Any:
+        """
+        Return a copy of the data fitting in the limits: lists are cut to `max_items` items,
+        containers nested deeper than `max_depth` are replaced by the marker, and the values
+        past `max_bytes` are left out.
+        """
+        limits = self.limits
+        marker = limits.marker
+        max_bytes = limits.max_bytes
+        max_items = limits.max_items
+        max_depth = limits.max_depth
+        format_key = self.format_key
+        ensure_ascii = self.ensure_ascii
+        indent = self.indent
+        # Sizes of the marker, by depth, since the lines of an indented marker are indented too
+        marker_sizes: Dict[int, int] = {}
+        holder: List[Any] = [None]
+
+        def add(output: Any, is_mapping: bool, key: Any, value: Any) -> None:
+            if is_mapping:
+                output[key] = value
+            elif output is holder:
+                holder[0] = value
+            else:
+                output.append(value)
+
+        def marker_size(depth: int) -> int:
+            size = marker_sizes.get(depth)
+            if size is None:
+                size = marker_sizes[depth] = self.estimate(marker, depth=depth)
+            return size
+
+        def marker_room(depth: int) -> int:
+            # Room kept to end a list whose items are at the given depth with the marker
+            if marker is None or max_bytes is None:
+                return 0
+            return marker_size(depth) + self._separator_size(depth)
+
+        size = 0
+        exhausted = False
+        # Each frame is [items iterator, output container, is mapping, depth, room kept for the
+        # marker, room kept by the parent frame]. Objects keep the room of the list holding them,
+        # so the size never exceeds `max_bytes - room` while a list can still be ended with the marker.
+        stack: List[list] = [[iter(((0, data),)), holder, False, 0, 0, 0]]
+        while stack:
+            frame = stack[-1]
+            items, output, is_mapping, depth, room, parent_room = frame
+            item = next(items, _DONE) if not exhausted else _DONE
+            if item is _DONE:
+                stack.pop()
+                continue
+            key, value = item
+            value = unwrap(value)
+            in_list = not is_mapping and output is not holder
+            if output is holder:
+                item_size = 0
+            else:
+                item_size = ((_key_size(key, format_key, ensure_ascii, self.key_separator_size) if is_mapping else 0)
+                             + self._separator_size(depth))
+            if in_list and max_items is not None and len(output) >= max_items:
+                # Leave the other items out
+                frame[0] = iter(())
+                if marker is not None:
+                    output.append(marker)
+                    size += item_size + marker_size(depth)
+                    # The marker used the room of this list: stop when the parent has no room left
+                    exhausted = max_bytes is not None and size + parent_room > max_bytes
+                continue
+            is_container = isinstance(value, (dict, list, tuple))
+            if is_container and (max_depth is None or depth + 1 <= max_depth):
+                child_is_mapping = isinstance(value, dict)
+                child_room = room if child_is_mapping else marker_room(depth + 1)
+                open_size = item_size + 2 + (1 + indent * depth if indent else 0)
+                # The items of lists are left out whole, rather than partially
+                needed_size = max(open_size, item_size + self.estimate(value, depth=depth)) if in_list else open_size
+                if max_bytes is not None and size + needed_size + max(room, child_room) > max_bytes:
+                    if output is holder:
+                        # Leaving out the root would write null, which doesn't fit either
+                        raise LimitExceeded('max_bytes', max_bytes)
+                    exhausted = True
+                    if marker is not None and in_list:
+                        output.append(marker)
+                        size += item_size + marker_size(depth)
+                    continue
+                child: Any = {} if child_is_mapping else []
+                size += open_size
+                add(output, is_mapping, key, child)
+                stack.append([iter(stored_items(value)) if child_is_mapping else enumerate(stored_values(value)),
+                              child, child_is_mapping, depth + 1, child_room, room])
+                continue
+            if is_container:
+                # Nested too deeply
+                if marker is None:
+                    continue
+                value = marker
+                value_size = item_size + marker_size(depth)
+            else:
+                value_size = item_size + _scalar_size(value, ensure_ascii, self.format_key)
+            if max_bytes is not None and size + value_size + room > max_bytes:
+                if output is holder:
+                    raise LimitExceeded('max_bytes', max_bytes)
+                exhausted = True
+                if marker is not None and in_list:
+                    output.append(marker)
+                    size += item_size + marker_size(depth)
+                continue
+            add(output, is_mapping, key, value)
+            size += value_size
+        return holder[0]
+
+    def pages(self, data: Any) -> Iterator[Any]:
+        """
+        Split the data into pages fitting in `max_items` and `max_bytes`, by splitting its first
+        list longer than `max_items` or, when the data is too large, its largest list.
+        """
+        limits = self.limits
+        max_items, max_bytes = limits.max_items, limits.max_bytes
+        path = self._list_to_paginate(data, max_bytes is not None and self.estimate(data) > max_bytes)
+        if path is None:
+            yield data
+            return
+        items = self._get(data, path)
+        pages: List[List[Any]] = []
+        page: List[Any] = []
+        if max_bytes is not None:
+            indent = self.indent
+            # The list holding the items is nested in as many containers as the length of its path
+            list_depth = len(path)
+            base_size = self.estimate(data) - self.estimate(items, depth=list_depth)
+            budget = max_bytes - base_size - 2 - (1 + indent * list_depth if indent else 0)
+            separator_size = self._separator_size(list_depth + 1)
+            page_size = 0
+            for item in items:
+                item_size = self.estimate(item, depth=list_depth + 1) + separator_size
+                if page and ((max_items is not None and len(page) >= max_items) or page_size + item_size > budget):
+                    pages.append(page)
+                    page, page_size = [], 0
+                page.append(item)
+                page_size += item_size
+            pages.append(page)
+        else:
+            pages = [items[start:start + max_items] for start in range(0, len(items), max_items)] or [[]]
+        for page in pages:
+            yield self._replace(data, path, page)
+
+    def _list_to_paginate(self, data: Any, largest: bool) -> Optional[Tuple[Any, ...]]:
+        """
+        Return the path of the first list longer than `max_items` or, if `largest` is True, of the largest list.
+        """
+        max_items = self.limits.max_items
+        best: Optional[Tuple[Any, ...]] = None
+        best_length = 0
+        stack: List[Tuple[Any, Tuple[Any, ...]]] = [(data, ())]
+        while stack:
+            value, path = stack.pop()
+            value = unwrap(value)
+            if isinstance(value, dict):
+                children = stored_items(value)
+            elif isinstance(value, (list, tuple)):
+                if not largest and max_items is not None and len(value) > max_items:
+                    return path
+                if largest and len(value) > best_length:
+                    best, best_length = path, len(value)
+                children = enumerate(stored_values(value))
+            else:
+                continue
+            stack.extend(reversed([(item, path + (key,)) for key, item in children
+                                   if isinstance(item, _CONTAINERS)]))
+        return best if best_length > 1 else None
+
+    @staticmethod
+    def _get(data: Any, path: Tuple[Any, ...]) -> Any:
+        value = unwrap(data)
+        for key in path:
+            value = unwrap(value[key])
+        return value
+
+    @staticmethod
+    def _replace(data: Any, path: Tuple[Any, ...], page: List[Any]) -> Any:
+        """
+        Return a copy of the data whose list at the given path is replaced by the page. Only the
+        containers holding the list are copied.
+        """
+        if not path:
+            return page
+        root = copy = _shallow_copy(unwrap(data))
+        for key in path[:-1]:
+            copy[key] = _shallow_copy(unwrap(copy[key]))
+            copy = copy[key]
+        copy[path[-1]] = page
+        return root
+
+
+def _shallow_copy(value: Any) -> Any:
+    return dict(stored_items(value)) if isinstance(value, dict) else list(stored_values(value))
+
+
+def estimated_size(data: Any, format_key: FormatKey = None, indent: Optional[int] = None,
+                   ensure_ascii: bool = True, separators: Optional[Tuple[str, str]] = None) -> int:
+    """
+    Estimate the size of the JSON of the data, in UTF-8 encoded bytes, without encoding it.
+
+    The estimate is exact for plain data. Objects serialized by a `default` function are assumed to be small.
+
+    Args:
+        data (Any): The data.
+        format_key (callable): Function applied to every string key, if any.
+        indent (int or str): The indentation of the JSON, if any.
+        ensure_ascii (bool): Whether non-ASCII characters are escaped, like json.dumps does by default.
+        separators (tuple): The (item_separator, key_separator) tuple of the JSON, if not the default one.
+
+    Returns:
+        int: The estimated size.
+    """
+    return _Walk(Limits(), format_key, indent, ensure_ascii, separators).estimate(data)
+
+
+def apply_limits(data: Any, limits: Limits, format_key: FormatKey = None, indent: Optional[int] = None,
+                 ensure_ascii: bool = True, separators: Optional[Tuple[str, str]] = None,
+                 check_bytes: bool = True) -> Any:
+    """
+    Check the data against the limits, before it is serialized.
+
+    The data is returned untouched when it fits. Otherwise, a truncated copy of the data is
+    returned when `limits.overflow` is "truncate", and LimitExceeded is raised otherwise: data
+    to paginate must be written with `iter_pages`.
+
+    Estimating the size of the data costs about as much as encoding it, so writers checking the
+    size of their output against `max_bytes` themselves skip it with `check_bytes=False`: only
+    the number of items and the depth of the data are then checked.
+
+    Args:
+        data (Any): The data.
+        limits (Limits): The limits.
+        format_key (callable): Function applied to every string key, if any.
+        indent (int or str): The indentation of the JSON, if any.
+        ensure_ascii (bool): Whether non-ASCII characters are escaped.
+        separators (tuple): The (item_separator, key_separator) tuple of the JSON, if not the default one.
+        check_bytes (bool): Whether the estimated size of the data is checked against `max_bytes`.
+
+    Returns:
+        Any: The data to serialize.
+
+    Raises:
+        LimitExceeded: If the data exceeds a limit and `limits.overflow` isn't "truncate".
+    """
+    walk = _Walk(limits, format_key, indent, ensure_ascii, separators)
+    try:
+        if check_bytes and limits.max_bytes is not None:
+            walk.estimate(data, check=True)
+        else:
+            walk.check(data)
+    except LimitExceeded:
+        if limits.overflow != 'truncate':
+            raise
+    else:
+        return data
+    return walk.truncate(data)
+
+
+def iter_pages(data: Any, limits: Limits, format_key: FormatKey = None, indent: Optional[int] = None,
+               ensure_ascii: bool = True, separators: Optional[Tuple[str, str]] = None) -> Iterator[Any]:
+    """
+    Split the data into pages fitting in the limits. Data that fits is a single page.
+
+    Args:
+        data (Any): The data.
+        limits (Limits): The limits.
+        format_key (callable): Function applied to every string key, if any.
+        indent (int or str): The indentation of the JSON, if any.
+        ensure_ascii (bool): Whether non-ASCII characters are escaped.
+        separators (tuple): The (item_separator, key_separator) tuple of the JSON, if not the default one.
+
+    Yields:
+        Any: The data of each page.
+    """
+    walk = _Walk(limits, format_key, indent, ensure_ascii, separators)
+    try:
+        walk.estimate(data, check=True)
+    except LimitExceeded:
+        for page in walk.pages(data):
+            # Other lists too long are truncated
+            yield apply_limits(page, Limits(limits.max_bytes, limits.max_items, limits.max_depth, 'truncate',
+                                            limits.marker), format_key, indent, ensure_ascii, separators)
+    else:
+        yield data
@@ -0,0 +1,583 @@
+import re
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, BinaryIO, ItemsView, Iterator, List, Optional, Tuple, Union, ValuesView
+
+from .serializers.json import RawJSON
+
+if TYPE_CHECKING:
+    import mmap
+
+    from .serializers.json import JSONWriter
+
+
+# Strings and structural characters of JSON. Numbers and literals are found between them.
+_TOKENS = rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},:]'
+
+# Numbers and literals of JSON
+_SCALAR = rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null'
+
+# Content of nested values, with their strings, up to the next bracket
+_RUN = rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*'
+
+# Keys of the top-level block mapping of a YAML document, at the beginning of a line
+_YAML_KEYS = rb'^(?![\s#\-?]|\.\.\.)([^\n]*?):(?:[ \t]|$)'
+
+# YAML constructs spanning several entries of a document, which can't be loaded entry by entry
+_YAML_SHARED = rb'(?:^|[\s\[{,])[&*!][^\s]|^---|^%'
+
+# Comments, quoted scalars and brackets of flow collections of YAML, whose quotes and brackets
+# are captured to find the ones left open
+_YAML_SPANS = (rb'(?:^|(?<=[ \t]))#[^\n]*'
+               rb'|(?:^|(?<=[ \t\[{,]))(?:"[^"\\]*(?:\\[\s\S][^"\\]*)*("?)|\'[^\']*(?:\'\'[^\']*)*(\'?)|([\[{]))'
+               rb'|([\]}])')
+
+_WHITESPACE = b' \t\r\n'
+
+_QUOTE, _COMMA, _COLON = ord('"'), ord(','), ord(':')
+
+_OPENING, _CLOSING = b'[{', b']}'
+
+Buffer = Union[bytes, 'mmap.mmap']
+
+_UNPARSED = object()
+
+
+class RawSlice(RawJSON):
+    """
+    A value of a loaded JSON document, kept as a slice of the document until it is touched.
+
+    The slice is spliced verbatim into the output, like raw JSON. Since the values nested in
+    it were only checked to have balanced brackets, it is parsed once, the first time it is
+    written, to check that it is valid.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', '_checked')
+
+    def __init__(self, buffer: Buffer, start: int, end: int) -> None:
+        """
+        Initialize a new RawSlice instance.
+
+        Args:
+            buffer (bytes or mmap): The UTF-8 encoded document.
+            start (int): The offset of the first byte of the value.
+            end (int): The offset following the last byte of the value.
+        """
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.reindent = False
+        self._checked = False
+
+    @property
+    def text(self) -> str:
+        _check_size(self.buffer, self.end)
+        return self.buffer[self.start:self.end].decode('utf-8')
+
+    def loads(self) -> Any:
+        """
+        Parse the slice.
+
+        Returns:
+            Any: The parsed value.
+
+        Raises:
+            json.JSONDecodeError: If the slice isn't valid JSON, with its position in the document.
+        """
+        return _parse(self.text, self.buffer, self.start)
+
+    def _encode(self, writer: 'JSONWriter', depth: int) -> str:
+        text = self.text
+        if not self._checked:
+            _parse(text, self.buffer, self.start)
+            self._checked = True
+        return text
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f'RawSlice(start={self.start}, end={self.end})'
+
+
+class YAMLEntry:
+    """
+    The value of an entry of a loaded YAML document, kept as a slice of the document until it is
+    read or written.
+
+    Writers unwrap it like a lazy value, parsing the entry once.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', '_value')
+
+    def __init__(self, buffer: Buffer, start: int, end: int) -> None:
+        """
+        Initialize a new YAMLEntry instance.
+
+        Args:
+            buffer (bytes or mmap): The UTF-8 encoded document.
+            start (int): The offset of the first byte of the entry, its key included.
+            end (int): The offset following the last byte of the entry.
+        """
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self._value = _UNPARSED
+
+    @property
+    def value(self) -> Any:
+        """
+        The parsed value of the entry.
+        """
+        if self._value is _UNPARSED:
+            from .serializers.yaml import load
+            _check_size(self.buffer, self.end)
+            self._value = next(iter(load(self.buffer[self.start:self.end]).values()))
+        return self._value
+
+    def __repr__(self) -> str:
+        return f'YAMLEntry(start={self.start}, end={self.end})'
+
+
+class LazyObject(dict):
+    """
+    A JSON object of a loaded document, whose values are parsed when they are read.
+
+    Reading a value with `[]` or `get`, opening it with `node`, or iterating over the values
+    with `values` or `items`, replaces its slice by the parsed value, which can then be modified.
+    Writers read the values as they are stored, so untouched values are written without being parsed.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (RawSlice, YAMLEntry)):
+            value = materialize(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __iter__(self) -> Iterator[Any]:
+        # Overridden so that `dict(...)` and `{**...}` read the values with `[]` instead of copying the slices
+        return dict.__iter__(self)
+
+    def _parse_values(self) -> None:
+        # Replacing values doesn't change the size of the dictionary, so it can be iterated meanwhile
+        for key, value in dict.items(self):
+            if isinstance(value, (RawSlice, YAMLEntry)):
+                dict.__setitem__(self, key, materialize(value))
+
+    def values(self) -> ValuesView[Any]:
+        self._parse_values()
+        return dict.values(self)
+
+    def items(self) -> ItemsView[Any, Any]:
+        self._parse_values()
+        return dict.items(self)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, dict) and self.keys() == other.keys() and all(self[key] == other[key] for key in self)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+
+class LazyArray(list):
+    """
+    A JSON array of a loaded document, whose items are parsed when they are read by index or iterated over.
+    """
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[Any]:
+        index = 0
+        # The length is read at each step, like the iterator of lists does
+        while index < len(self):
+            yield self[index]
+            index += 1
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        value = list.__getitem__(self, index)
+        if isinstance(value, RawSlice):
+            value = materialize(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        return (isinstance(other, list) and len(self) == len(other)
+                and all(self[index] == item for index, item in enumerate(other)))
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+
+@lru_cache(maxsize=None)
+def _nested_pattern() -> 're.Pattern':
+    """
+    Return the pattern matching the content of nested values up to their next bracket, compiled once.
+
+    Values nested up to 3 levels deeper are skipped in the same match, since matching is much
+    faster than iterating over brackets in Python. Matches are bounded to 256 values, which
+    keeps the memory used by the regular expression engine small.
+    """
+    group = rb'[\[{]' + _RUN + rb'[\]}]'
+    for _ in range(2):
+        group = rb'[\[{]' + _RUN + rb'(?:' + group + _RUN + rb')*[\]}]'
+    return re.compile(_RUN + rb'(?:' + group + _RUN + rb'){0,256}[\[\]{}]')
+
+
+@lru_cache(maxsize=None)
+def _scalar_pattern() -> 're.Pattern':
+    """
+    Return the pattern matching the numbers and literals of JSON, compiled once.
+    """
+    return re.compile(_SCALAR)
+
+
+def _strip(buffer: Buffer, start: int, end: int) -> Tuple[int, int]:
+    while start < end and buffer[start] in _WHITESPACE:
+        start += 1
+    while end > start and buffer[end - 1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def _check_size(buffer: Buffer, end: int) -> None:
+    """
+    Check that the mapped file still holds the document up to `end`, since reading the memory
+    mapping past the end of a truncated file kills the process.
+
+    Raises:
+        ValueError: If the file was truncated.
+    """
+    if not isinstance(buffer, bytes) and buffer.size() < end:
+        raise ValueError('The loaded file was truncated. Write to another file, or use save_json.')
+
+
+def _parse(text: Union[str, bytes], buffer: Buffer, start: int) -> Any:
+    """
+    Parse the JSON text found at offset `start` of the document.
+
+    Raises:
+        json.JSONDecodeError: If the text isn't valid JSON. The error is the one raised when
+                              parsing the whole document, with the position in the document.
+    """
+    import json
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as error:
+        document = buffer[:].decode('utf-8')
+        position = len(buffer[:start].decode('utf-8')) + error.pos
+        raise json.JSONDecodeError(error.msg, document, position) from None
+
+
+def _value(buffer: Buffer, start: int, end: int, token: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Strip the value spanning from `start` to `end`, checking that it is a single JSON value.
+
+    Args:
+        token (Tuple[int, int]): The span of the string, object or array starting the value, if any.
+
+    Raises:
+        ValueError: If the value is empty, or isn't a single value.
+    """
+    start, end = _strip(buffer, start, end)
+    if token is None:
+        if _scalar_pattern().fullmatch(buffer, start, end) is None:
+            raise ValueError(f'Invalid value at offset {start}.')
+    elif token != (start, end):
+        raise ValueError(f'Unexpected value at offset {start}.')
+    return start, end
+
+
+def _members(buffer: Buffer, start: int, end: int) -> Iterator[Tuple[Optional[Tuple[int, int]], int, int]]:
+    """
+    Find the members of the object or array spanning from `start` to `end`, without parsing them.
+
+    The members are checked to hold a key, a colon and a single value each, but values nested
+    in them are only checked to have balanced brackets, until they are parsed themselves.
+
+    Yields:
+        Tuple: The span of the key of each member (None for the items of arrays), and the span of its value.
+
+    Raises:
+        ValueError: If the container is malformed.
+    """
+    is_object = buffer[start] == _OPENING[1]
+    depth = 0
+    key = None
+    # Whether the value of the current member can start, and the span of its string or container
+    has_colon = not is_object
+    token = None
+    is_first = True
+    value_start = position = start + 1
+    end -= 1
+    tokens = re.compile(_TOKENS)
+    nested = _nested_pattern()
+    while True:
+        if depth:
+            # Nested values are skipped from one bracket to the next
+            match = nested.match(buffer, position, end)
+            if match is None:
+                raise ValueError(f'Unterminated value at offset {position}.')
+            position = match.end()
+            depth += 1 if buffer[position - 1] in _OPENING else -1
+            if not depth:
+                token = (token[0], position)
+            continue
+        match = tokens.search(buffer, position, end)
+        if match is None:
+            break
+        position = match.end()
+        char = buffer[match.start()]
+        if char == _COLON:
+            if key is None or has_colon:
+                raise ValueError(f'Unexpected colon at offset {match.start()}.')
+            has_colon = True
+            value_start = position
+        elif char == _COMMA:
+            if not has_colon:
+                raise ValueError(f'Expected a {"colon" if key else "key"} at offset {match.start()}.')
+            yield (key,) + _value(buffer, value_start, match.start(), token)
+            key = None
+            has_colon = not is_object
+            token = None
+            is_first = False
+            value_start = position
+        elif char in _CLOSING:
+            raise ValueError(f'Unexpected bracket at offset {match.start()}.')
+        elif is_object and key is None and char == _QUOTE:
+            key = (match.start(), position)
+        elif not has_colon or token is not None:
+            raise ValueError(f'Unexpected value at offset {match.start()}.')
+        else:
+            token = (match.start(), position)
+            if char != _QUOTE:
+                depth += 1
+    if depth:
+        raise ValueError(f'Unterminated value at offset {value_start}.')
+    if is_first and key is None and token is None and _strip(buffer, value_start, end)[0] == end:
+        # The container is empty
+        return
+    if not has_colon:
+        raise ValueError(f'Expected a {"colon" if key else "key"} at offset {value_start}.')
+    yield (key,) + _value(buffer, value_start, end, token)
+
+
+def _container(buffer: Buffer, start: int, end: int) -> Union[LazyObject, LazyArray]:
+    """
+    Create a lazy object or array holding slices of the members of the container spanning from `start` to `end`.
+    """
+    if buffer[start] == _OPENING[1]:
+        container = LazyObject()
+        for key, value_start, value_end in _members(buffer, start, end):
+            dict.__setitem__(container, _parse(buffer[key[0]:key[1]], buffer, key[0]),
+                             RawSlice(buffer, value_start, value_end))
+        return container
+    return LazyArray(RawSlice(buffer, value_start, value_end)
+                     for _, value_start, value_end in _members(buffer, start, end))
+
+
+def materialize(value: Union[RawSlice, YAMLEntry]) -> Any:
+    """
+    Parse a value of a loaded document. Objects and arrays are parsed one level at a time.
+
+    Args:
+        value (RawSlice or YAMLEntry): The slice of a JSON document, or the entry of a YAML document.
+
+    Returns:
+        Any: The parsed value.
+    """
+    if isinstance(value, YAMLEntry):
+        return value.value
+    buffer, start, end = value.buffer, value.start, value.end
+    _check_size(buffer, end)
+    if buffer[start] in _OPENING:
+        return _container(buffer, start, end)
+    return _parse(buffer[start:end], buffer, start)
+
+
+def parse_slices(data: Union[LazyObject, LazyArray]) -> None:
+    """
+    Replace the slices of a loaded document by their parsed values, for instance to format their keys.
+
+    Only the objects and arrays of the document are visited, since the values added to it don't
+    hold slices. Parsing a slice doesn't count as a change of tracked objects.
+
+    Args:
+        data (LazyObject or LazyArray): An object or array of the document.
+    """
+    stack: List[Any] = [data]
+    while stack:
+        container = stack.pop()
+        if isinstance(container, dict):
+            items: Any = dict.items(container)
+            set_item = dict.__setitem__
+        else:
+            items = enumerate(list.__iter__(container))
+            set_item = list.__setitem__
+        for key, value in list(items):
+            if isinstance(value, RawSlice):
+                set_item(container, key, value.loads())
+            elif isinstance(value, YAMLEntry):
+                set_item(container, key, value.value)
+            elif isinstance(value, (LazyObject, LazyArray)):
+                stack.append(value)
+
+
+def stored_copy(data: LazyObject) -> dict:
+    """
+    Copy the objects and arrays of a loaded document as dictionaries and lists holding their values
+    as they are stored, so untouched values stay slices.
+
+    Serialization libraries read dictionaries with `items`, which parses the values of loaded
+    objects. Only the objects and arrays of the document are copied, since the values added to it
+    don't hold slices, and each of them is copied once.
+
+    Args:
+        data (LazyObject): The loaded document.
+
+    Returns:
+        dict: The copy.
+    """
+    root = dict(dict.items(data))
+    copies = {id(data): root}
+    stack: List[Any] = [root]
+    while stack:
+        container = stack.pop()
+        # Replacing the values of the copies doesn't change their size, so they can be iterated meanwhile
+        for key, value in container.items() if isinstance(container, dict) else enumerate(container):
+            if isinstance(value, (LazyObject, LazyArray)):
+                copy = copies.get(id(value))
+                if copy is None:
+                    if isinstance(value, dict):
+                        copy = dict(dict.items(value))
+                    else:
+                        copy = list(list.__iter__(value))
+                    copies[id(value)] = copy
+                    stack.append(copy)
+                container[key] = copy
+    return root
+
+
+def _read(fp: Union[BinaryIO, Any]) -> Buffer:
+    """
+    Map the file into memory, or read the stream when it isn't a regular file.
+    """
+    import mmap
+    try:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        pass
+    data = fp.read()
+    return data.encode('utf-8') if isinstance(data, str) else data
+
+
+def load_json(fp: Union[BinaryIO, Any]) -> LazyObject:
+    """
+    Load the JSON object of a file or stream, without parsing its values.
+
+    Files are mapped into memory, and other streams are read. The values of the object are
+    kept as slices of the document until they are read. Each object or array is checked when
+    it is parsed, and untouched values are only checked to have balanced brackets until they
+    are first written, when writers parse them to check them.
+
+    Args:
+        fp (BinaryIO): A file or stream holding a UTF-8 encoded JSON object.
+
+    Returns:
+        LazyObject: The object.
+
+    Raises:
+        ValueError: If the document isn't a JSON object, or its members are malformed.
+    """
+    buffer = _read(fp)
+    start, end = _strip(buffer, 0, len(buffer))
+    if end - start < 2 or buffer[start] != _OPENING[1] or buffer[end - 1] != _CLOSING[1]:
+        raise ValueError('Expected a JSON object.')
+    return _container(buffer, start, end)
+
+
+@lru_cache(maxsize=None)
+def _yaml_spans_pattern() -> 're.Pattern':
+    """
+    Return the pattern matching the comments, quoted scalars and flow brackets of YAML, compiled once.
+    """
+    return re.compile(_YAML_SPANS, re.MULTILINE)
+
+
+def _is_yaml_closed(buffer: Buffer, start: int, end: int) -> bool:
+    """
+    Return whether the quoted scalars and flow collections of the YAML text spanning from `start`
+    to `end` are closed, so the text following it can't belong to them.
+
+    Quotes and brackets of plain or block scalars may be taken for open ones, which only makes
+    the document be parsed at once.
+    """
+    depth = 0
+    for match in _yaml_spans_pattern().finditer(buffer, start, end):
+        double_quote, single_quote, opening, closing = match.groups()
+        if double_quote == b'' or single_quote == b'':
+            return False
+        if opening:
+            depth += 1
+        elif closing and depth:
+            depth -= 1
+    return not depth
+
+
+def _load_yaml_at_once(buffer: Buffer) -> LazyObject:
+    from .serializers.yaml import load
+    data = load(buffer[:])
+    if not isinstance(data, dict):
+        raise ValueError('Expected a YAML mapping.')
+    mapping = LazyObject()
+    dict.update(mapping, data)
+    return mapping
+
+
+def load_yaml(fp: Union[BinaryIO, Any]) -> LazyObject:
+    """
+    Load the mapping of a YAML document from a file or stream, parsing each of its entries when it is read.
+
+    Entries are found by their key, at the beginning of a line. Documents with anchors, tags,
+    directives or several documents are parsed at once, as well as documents whose quoted
+    scalars or flow collections may span several entries.
+
+    Args:
+        fp (BinaryIO): A file or stream holding a UTF-8 encoded YAML mapping.
+
+    Returns:
+        LazyObject: The mapping, whose values are parsed when they are read or serialized.
+
+    Raises:
+        ValueError: If the document isn't a mapping.
+    """
+    import yaml
+    from .serializers.yaml import load
+    buffer = _read(fp)
+    if re.search(_YAML_SHARED, buffer, re.MULTILINE):
+        return _load_yaml_at_once(buffer)
+    matches: List[Any] = list(re.finditer(_YAML_KEYS, buffer, re.MULTILINE))
+    if not matches or _strip(buffer, 0, matches[0].start())[1] > 0:
+        return _load_yaml_at_once(buffer)
+    mapping = LazyObject()
+    ends = [match.start() for match in matches[1:]] + [len(buffer)]
+    for match, end in zip(matches, ends):
+        try:
+            key = load(match.group(1) + b': null')
+        except yaml.YAMLError:
+            key = None
+        if not isinstance(key, dict) or len(key) != 1:
+            # The colon belongs to a quoted key
+            return _load_yaml_at_once(buffer)
+        if not _is_yaml_closed(buffer, match.end(), end):
+            # The following keys may belong to a quoted scalar or flow collection of the entry
+            return _load_yaml_at_once(buffer)
+        dict.__setitem__(mapping, next(iter(key)), YAMLEntry(buffer, match.start(), end))
+    return mapping
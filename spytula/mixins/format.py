@@ -1,37 +1,187 @@
-import inflection
-import inspect
+import threading
 
 from collections import OrderedDict
 from collections.abc import Iterable
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..node import SpytulaNode
+
+
+KEY_FORMAT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=None)
+def _inflection_methods() -> Tuple[str, ...]:
+    import inflection
+    import inspect
+    return tuple(
+        name
+        for name, _ in inspect.getmembers(inflection, inspect.isfunction)
+        if isinstance(name, str) and name[0].isalpha()
+    )
+
+
+def _freeze_option(value: Any) -> Any:
+    """
+    Turn a key formatting option into a hashable value.
+    """
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((k, _freeze_option(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return (type(value).__name__, tuple(_freeze_option(v) for v in value))
+    return value
+
+
+class KeyFormatter:
+    """
+    A compiled key formatting pipeline backed by a bounded LRU cache.
+
+    Each `key_format` option is resolved to its inflection function once, so
+    formatting a key already seen is a single cache lookup. The inflection module
+    is only imported when a key format is first configured.
+    """
+
+    def __init__(self, options: Dict[str, Any], maxsize: int = KEY_FORMAT_CACHE_SIZE) -> None:
+        """
+        Initialize a new KeyFormatter instance.
+
+        Args:
+            options (Dict[str, Any]): Key formatting options, as given to `key_format`.
+            maxsize (int): Maximum number of formatted keys to keep in the cache.
+        """
+        self._steps = self._compile(options)
+        self._format = lru_cache(maxsize=maxsize)(self._apply)
+        # The formatter is shared by many builders, so misses are counted per thread, when requested
+        self._miss_counters = threading.local()
+
+    @staticmethod
+    def _compile(options: Dict[str, Any]) -> List[Tuple[Callable[..., str], tuple, dict]]:
+        import inflection
+        steps = []
+        for format_option, format_args in options.items():
+            key_formatter = getattr(inflection, format_option, None)
+            if key_formatter is not None:
+                if type(format_args) is dict:
+                    steps.append((key_formatter, (), format_args))
+                elif isinstance(format_args, Iterable):
+                    steps.append((key_formatter, tuple(format_args), {}))
+                elif format_args == True:
+                    steps.append((key_formatter, (), {}))
+        return steps
+
+    def _apply(self, key: str) -> str:
+        counter = getattr(self._miss_counters, 'counter', None)
+        if counter is not None:
+            counter[0] += 1
+        for key_formatter, args, kwargs in self._steps:
+            key = key_formatter(key, *args, **kwargs)
+        return key
+
+    def __call__(self, key: str) -> str:
+        """
+        Format the given key.
+
+        Args:
+            key (str): The key to format.
+
+        Returns:
+            str: Formatted key.
+        """
+        return self._format(key)
+
+    def cache_info(self):
+        """
+        Return the hits, misses, maximum size and current size of the cache.
+        """
+        return self._format.cache_info()
+
+    def count_misses(self, counter: Optional[List[int]]) -> Optional[List[int]]:
+        """
+        Count the keys formatted with inflection in the current thread, ignoring the other threads.
+
+        Args:
+            counter (List[int]): A one-item list incremented on every cache miss, or None to stop counting.
+
+        Returns:
+            List[int]: The counter used until now, or None.
+        """
+        previous = getattr(self._miss_counters, 'counter', None)
+        self._miss_counters.counter = counter
+        return previous
+
+    def cache_clear(self) -> None:
+        """
+        Empty the cache and reset its statistics.
+        """
+        self._format.cache_clear()
+
+
+_key_formatters: Dict[Any, KeyFormatter] = {}
+
+
+def get_key_formatter(options: Dict[str, Any]) -> KeyFormatter:
+    """
+    Return the KeyFormatter shared by every builder using the given options.
+
+    Args:
+        options (Dict[str, Any]): Key formatting options, as given to `key_format`.
+
+    Returns:
+        KeyFormatter: The formatter for this configuration.
+    """
+    config = tuple((name, _freeze_option(args)) for name, args in options.items())
+    formatter = _key_formatters.get(config)
+    if formatter is None:
+        formatter = _key_formatters.setdefault(config, KeyFormatter(options))
+    return formatter
 
 
 class KeyFormatMixin:
+    _key_format = None
+    _key_formatter: Optional[KeyFormatter] = None
+    _key_format_in_place = False
+
     def __init__(self) -> None:
         self._key_format = None
+        self._key_formatter: Optional[KeyFormatter] = None
+        self._key_format_in_place = False
 
     @property
     def _inflection_methods(self):
-        return [
-            name
-            for name, _ in inspect.getmembers(inflection, inspect.isfunction)
-            if isinstance(name, str) and name[0].isalpha()
-        ]
+        return list(_inflection_methods())
 
-    def key_format(self, **kwargs) -> None:
+    def key_format(self, in_place: bool = False, **kwargs) -> None:
         """
         Configure the key formatting options.
 
         Args:
+            in_place (bool): Rewrite the keys of the builder's own data when serializing instead of
+                             building a formatted copy. This saves memory on large documents, but the
+                             formats should be idempotent (like `camelize` or `underscore`) if the
+                             builder is serialized more than once.
             **kwargs: Key formatting options.
 
         Raises:
             ValueError: If an unsupported formatting option is provided.
         """
-        unsupported_options = set(kwargs.keys()) - set(self._inflection_methods)
+        unsupported_options = set(kwargs.keys()) - set(_inflection_methods())
         if unsupported_options:
             raise ValueError(f"Unsupported key formatting options: {', '.join(unsupported_options)}")
         self._key_format = kwargs
+        self._key_formatter = get_key_formatter(kwargs) if kwargs else None
+        self._key_format_in_place = in_place
+
+    def key_format_cache_info(self):
+        """
+        Return the statistics of the key formatting cache, if any format is configured.
+
+        Returns:
+            CacheInfo: Hits, misses, maximum size and current size of the cache, or None.
+        """
+        if self._key_formatter is None:
+            return None
+        return self._key_formatter.cache_info()
 
     def _format_key(self, key: str) -> str:
         """
@@ -43,41 +193,145 @@ class KeyFormatMixin:
         Returns:
             str: Formatted key.
         """
-        if self._key_format:
-            for format_option, format_args in self._key_format.items():
-                key_formatter = getattr(inflection, format_option, None)
-                if key_formatter is not None:
-                    if type(format_args) is dict:
-                        key = key_formatter(key, **format_args)
-                    elif isinstance(format_args, Iterable):
-                        key = key_formatter(key, *format_args)
-                    elif format_args == True:
-                        key = key_formatter(key)
+        if self._key_formatter is not None:
+            return self._key_formatter(key)
         return key
 
 
 class DataFormattingMixin(KeyFormatMixin):
-    def _format_data(self, data: Any) -> Dict[str, Any]:
+    def _format_data(self, data: Any) -> Any:
         """
-        Recursively format the keys in the data based on the configured key formatting options.
+        Format the keys in the data based on the configured key formatting options.
+
+        The data is returned untouched when no key format is configured, and formatted
+        in place when the key format was configured with `in_place=True`.
 
         Args:
-            data (Dict[str, Any]): The data to format.
+            data (Any): The data to format.
 
         Returns:
-            Dict[str, Any]: Formatted data.
-        """
-        if isinstance(data, dict):
-            formatted_data = OrderedDict()
-            for key, value in data.items():
-                formatted_key = self._format_key(key)
-                if isinstance(value, dict):
-                    formatted_value = self._format_data(value)
-                else:
-                    formatted_value = value
-                formatted_data[formatted_key] = formatted_value
-            return formatted_data
-        elif isinstance(data, list):
-            return [ self._format_data(value) for value in data ]
-        else:
-            return data
\ No newline at end of file
+            Any: Formatted data.
+        """
+        if self._key_formatter is None:
+            return data
+        if self._key_format_in_place:
+            return self._format_data_in_place(data)
+        return self._format_data_copy(data)
+
+    def _format_data_copy(self, data: Any) -> Any:
+        """
+        Format the keys in a copy of the data.
+
+        Dictionaries, lists, tuples and nested builders are visited uniformly using an
+        explicit work stack, so deep documents never hit the recursion limit. Tuples are
+        copied as lists.
+
+        Args:
+            data (Any): The data to format.
+
+        Returns:
+            Any: Formatted data.
+
+        Raises:
+            ValueError: If the data holds a circular reference.
+        """
+        format_key = self._key_formatter._format
+        nested_types = (dict, list, tuple, SpytulaNode)
+        holder = [data]
+        # Each entry is a (container, key or index, value to format) triple. Containers are
+        # followed by a (None, container id, None) entry, popped once their items are formatted.
+        stack = [(holder, 0, data)]
+        pop = stack.pop
+        push = stack.append
+        # Ids of the containers being formatted, from the root to the current value
+        ancestors = set()
+        while stack:
+            container, slot, value = pop()
+            if container is None:
+                ancestors.discard(slot)
+                continue
+            if isinstance(value, SpytulaNode):
+                value = value.data
+            if isinstance(value, (dict, list, tuple)):
+                value_id = id(value)
+                if value_id in ancestors:
+                    raise ValueError('Circular reference detected')
+                ancestors.add(value_id)
+                push((None, value_id, None))
+            if isinstance(value, dict):
+                formatted_value = OrderedDict()
+                children = []
+                for key, item in value.items():
+                    formatted_key = format_key(key)
+                    formatted_value[formatted_key] = item
+                    if isinstance(item, nested_types):
+                        children.append((formatted_value, formatted_key, item))
+                # Reversed so that, when two keys format the same way, the last one wins
+                stack.extend(reversed(children))
+            elif isinstance(value, (list, tuple)):
+                formatted_value = list(value)
+                stack.extend(
+                    (formatted_value, index, item)
+                    for index, item in enumerate(formatted_value)
+                    if isinstance(item, nested_types)
+                )
+            else:
+                formatted_value = value
+            container[slot] = formatted_value
+        return holder[0]
+
+    def _format_data_in_place(self, data: Any) -> Any:
+        """
+        Format the keys of the data in place.
+
+        A dictionary is only rewritten when at least one of its keys changes. Nested builders
+        are replaced by their data and tuples are visited but kept as they are.
+
+        Args:
+            data (Any): The data to format.
+
+        Returns:
+            Any: The same data, with formatted keys.
+
+        Raises:
+            ValueError: If the data holds a circular reference.
+        """
+        format_key = self._key_formatter._format
+        if isinstance(data, SpytulaNode):
+            data = data.data
+        # Containers are followed by their id, popped once their items are formatted
+        stack: List[Any] = [data]
+        # Ids of the containers being formatted, from the root to the current value
+        ancestors = set()
+        while stack:
+            value = stack.pop()
+            if value.__class__ is int:
+                ancestors.discard(value)
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                value_id = id(value)
+                if value_id in ancestors:
+                    raise ValueError('Circular reference detected')
+                ancestors.add(value_id)
+                stack.append(value_id)
+            if isinstance(value, dict):
+                keys = list(value)
+                formatted_keys = [format_key(key) for key in keys]
+                if formatted_keys != keys:
+                    values = list(value.values())
+                    value.clear()
+                    value.update(zip(formatted_keys, values))
+                for key, item in value.items():
+                    if isinstance(item, SpytulaNode):
+                        item = value[key] = item.data
+                    if isinstance(item, (dict, list, tuple)):
+                        stack.append(item)
+            elif isinstance(value, (list, tuple)):
+                for index, item in enumerate(value):
+                    if isinstance(item, SpytulaNode):
+                        item = item.data
+                        if isinstance(value, list):
+                            value[index] = item
+                    if isinstance(item, (dict, list, tuple)):
+                        stack.append(item)
+        return data
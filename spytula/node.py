@@ -0,0 +1,723 @@
+from functools import lru_cache, wraps
+from typing import (TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generator, Hashable,
+                    Iterable, Iterator, List, Optional, Set, Tuple, Union)
+
+from .accessors import apply_transforms, get_accessor, get_reader, output_fields, read_values
+from .serializers.json import AsyncArray, JSONWriter, RawJSON, stored_items, stored_values
+
+if TYPE_CHECKING:
+    from .cache import CacheStore, Expiry
+    from .frozen import FrozenNode
+
+
+class _NodeContextManager:
+    """
+    Context manager created by the methods decorated with `contextmanager`, which can be
+    used with both `with` and `async with`.
+    """
+
+    __slots__ = ('_generator',)
+
+    def __init__(self, generator: Generator[Any, None, None]) -> None:
+        self._generator = generator
+
+    def __enter__(self) -> Any:
+        return next(self._generator)
+
+    def __exit__(self, type, value, traceback) -> bool:
+        if type is not None:
+            # The block failed: the node is not added
+            self._generator.close()
+            return False
+        try:
+            next(self._generator)
+        except StopIteration:
+            return False
+        raise RuntimeError("generator didn't stop")
+
+    async def __aenter__(self) -> Any:
+        return self.__enter__()
+
+    async def __aexit__(self, type, value, traceback) -> bool:
+        return self.__exit__(type, value, traceback)
+
+
+def contextmanager(func: Callable[..., Generator[Any, None, None]]) -> Callable[..., _NodeContextManager]:
+    """
+    Like `contextlib.contextmanager`, for context managers which can also be used with `async with`.
+
+    Args:
+        func (callable): A generator function yielding once.
+
+    Returns:
+        callable: A function returning the context manager.
+    """
+    @wraps(func)
+    def helper(*args, **kwargs) -> _NodeContextManager:
+        return _NodeContextManager(func(*args, **kwargs))
+    return helper
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+# Weak references to the lazy values that are not resolved yet, maintained by `spytula.deferred`.
+# Nodes only look for lazy values in the values added to them while some are pending.
+_pending_lazy: Set[Any] = set()
+
+_SCALARS = (str, int, float, type(None))
+
+
+@lru_cache(maxsize=None)
+def _lazy_class() -> type:
+    from .deferred import Lazy
+    return Lazy
+
+
+def _find_lazy(value: Any) -> bool:
+    """
+    Return whether the value is a lazy value, or holds one. Builders nested in the value are
+    trusted to record whether they hold lazy values, and the data of other nodes is looked into.
+    """
+    lazy_class = _lazy_class()
+    stack = [value]
+    pop = stack.pop
+    while stack:
+        value = pop()
+        if value.__class__ is lazy_class:
+            return True
+        if isinstance(value, _SCALARS):
+            continue
+        if isinstance(value, SpytulaNode):
+            if hasattr(value, '__dict__'):
+                if value._holds_lazy:
+                    return True
+                continue
+            value = value._data
+        if isinstance(value, dict):
+            stack.extend(dict.values(value))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(stored_values(value))
+    return False
+
+
+class ListFull(Exception):
+    """
+    Raised by the lists of nodes which can't hold more nodes, to stop `each` early.
+    """
+
+
+class SpytulaNode:
+    """
+    A lightweight builder for the nodes nested in a SpytulaBuilder.
+
+    Nodes only hold their data, in a plain dictionary, which keeps the many short-lived
+    instances created by `node`, `add_node` and `each` small and cheap to allocate.
+    """
+
+    __slots__ = ('_data',)
+
+    # The class of the nodes created by `node`, `add_node` and `each`
+    _node_class: type
+
+    # The class of the lists created by `nodes` and `each`
+    _list_class: type = list
+
+    # Whether lazy values were added to the node or to its nested nodes, so builders only look for
+    # lazy values in their data when they hold some
+    _holds_lazy = False
+
+    def __init__(self) -> None:
+        """
+        Initialize a new SpytulaNode instance.
+        """
+        self._data: Dict[str, Any] = {}
+
+    @property
+    def data(self) -> Any:
+        return self._data
+
+    def __enter__(self) -> 'SpytulaNode':
+        """
+        Enter the context of the SpytulaNode instance.
+        """
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        """
+        Exit the context of the SpytulaNode instance.
+        """
+        pass
+
+    def _new_node(self) -> 'SpytulaNode':
+        """
+        Helper method to create a new node, using the `_node_class` of this builder.
+
+        Returns:
+            SpytulaNode: New instance of SpytulaNode.
+        """
+        return self._node_class()
+
+    def _note_lazy(self, value: Any) -> None:
+        """
+        Helper method to record that the node holds lazy values, if the given value added to it holds some.
+
+        Nodes without a `__dict__` can't record it: their lazy values are computed one by one
+        when they are written, instead of all at once.
+
+        Args:
+            value (Any): The value added to the node, or a nested node.
+        """
+        if not self._holds_lazy and _find_lazy(value):
+            try:
+                self._holds_lazy = True
+            except AttributeError:
+                pass
+
+    @contextmanager
+    def node(self, key: str) -> 'SpytulaNode':
+        """
+        Create a new node to be added to the JSON.
+
+        In builders created by `load_json` or `load_yaml`, the object already under the key is
+        edited instead of being replaced.
+
+        Args:
+            key (str): The key for the new node in the JSON.
+
+        Example:
+            ```python
+            with builder.node("ingredients") as ingredient_builder:
+                ingredient_builder.attribute("name", "Ramen Noodles")
+
+            async with builder.node("origin") as origin_builder:
+                origin_builder.attribute("country", await fetch_country())
+            ```
+        """
+        from .loading import LazyObject
+        new_node = self._new_node()
+        if isinstance(self._data, LazyObject) and key in self._data:
+            # Objects of a loaded document are edited instead of being replaced, with the class of
+            # their parent so they are tracked like it
+            existing = self._data[key]
+            if isinstance(existing, dict):
+                loaded_class = type(self._data)
+                new_node._data = existing if type(existing) is loaded_class else loaded_class(stored_items(existing))
+        yield new_node
+        self._data[key] = new_node._data
+        if new_node._holds_lazy:
+            self._note_lazy(new_node)
+
+    @contextmanager
+    def add_node(self, node_list: List[Dict[str, Any]]) -> 'SpytulaNode':
+        """
+        Add a new node to the given list.
+
+        Args:
+            node_list (List[Dict[str, Any]]): The list to which the node will be added.
+
+        Example:
+            ```python
+            with builder.add_node(ingredient_list) as ingredient_builder:
+                ingredient_builder.attribute("name", "Ramen Noodles")
+            ```
+        """
+        new_node = self._new_node()
+        yield new_node
+        try:
+            node_list.append(new_node._data)
+        except ListFull:
+            pass
+        if new_node._holds_lazy:
+            self._note_lazy(new_node)
+
+    @contextmanager
+    def nodes(self, key: str) -> Callable[['SpytulaNode'], None]:
+        """
+        Create a new list of nodes to be added to the JSON.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+
+        Example:
+            ```python
+            ingredients = [
+                {'name': 'Noodles', 'type': 'Main'},
+                {'name': 'Pork', 'type': 'Protein'},
+                {'name': 'Eggs', 'type': 'Topping'},
+                {'name': 'Miso', 'type': 'Flavoring'},
+            ]
+
+            with builder.nodes('ingredients') as add_ingredient:
+                for ingredient in ingredients:
+                    with add_ingredient() as ingredient_builder:
+                        ingredient_builder.attribute('name', ingredient['name'])
+                        ingredient_builder.attribute('type', ingredient['type'].upper())
+            ```
+        """
+        new_nodes: List[Dict[str, Any]] = self._list_class()
+        self._data[key] = new_nodes
+        yield lambda: self.add_node(new_nodes)
+
+    def each(self, key: str, items: Iterable[Any]) -> Iterator[Tuple['SpytulaNode', Any]]:
+        """
+        Iterate over items and create a nested context for each item.
+
+        Items are consumed lazily, so any iterable (including generators and database
+        cursors) can be used. Each item's node is appended to the list as soon as it is produced.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            items (Iterable[Any]): The items to iterate over.
+
+        Yields:
+            Tuple[SpytulaNode, Any]: A tuple containing the SpytulaNode instance and the current item.
+
+        Example:
+            ```python
+            ingredients = [
+                {'name': 'Noodles', 'type': 'Main'},
+                {'name': 'Pork', 'type': 'Protein'},
+                {'name': 'Eggs', 'type': 'Topping'},
+                {'name': 'Miso', 'type': 'Flavoring'},
+            ]
+
+            for ingredient_builder, ingredient in builder.each('ingredients', ingredients):
+                ingredient_builder.attribute('name', ingredient['name'])
+                ingredient_builder.attribute('type', ingredient['type'])
+            ```
+        """
+        new_nodes: List[Dict[str, Any]] = self._list_class()
+        self._data[key] = new_nodes
+        for item in items:
+            new_item_builder = self._new_node()
+            try:
+                new_nodes.append(new_item_builder._data)
+            except ListFull:
+                return
+            try:
+                yield new_item_builder, item
+            finally:
+                if new_item_builder._holds_lazy:
+                    self._note_lazy(new_item_builder)
+
+    async def aeach(self, key: str,
+                    items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Tuple['SpytulaNode', Any]]:
+        """
+        Iterate over the items of an async iterable, like `each`, and create a nested context for each item.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            items (AsyncIterable[Any]): The items to iterate over, such as an async database cursor.
+                                        Regular iterables are accepted too.
+
+        Yields:
+            Tuple[SpytulaNode, Any]: A tuple containing the SpytulaNode instance and the current item.
+
+        Example:
+            ```python
+            async for dish_builder, dish in builder.aeach('dishes', cursor):
+                dish_builder.attribute('name', dish['name'])
+            ```
+        """
+        new_nodes: List[Dict[str, Any]] = self._list_class()
+        self._data[key] = new_nodes
+        async for item in _aiter(items):
+            new_item_builder = self._new_node()
+            try:
+                new_nodes.append(new_item_builder._data)
+            except ListFull:
+                return
+            try:
+                yield new_item_builder, item
+            finally:
+                if new_item_builder._holds_lazy:
+                    self._note_lazy(new_item_builder)
+
+    def stream_each(self, key: str, items: Union[Iterable[Any], AsyncIterable[Any]],
+                    block: Callable[['SpytulaNode', Any], Optional[Awaitable[None]]]) -> None:
+        """
+        Add a list of nodes rendered while the JSON is written by `aiter_json` or `adump_json`.
+
+        Items are fetched and rendered with the given block one by one, as the list is written,
+        so the beginning of the document is sent before the items are available. The list can
+        only be written once, and can't be converted with `to_json`.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            items (AsyncIterable[Any]): The items to iterate over. Regular iterables are accepted too.
+            block (callable): Function, or coroutine function, that takes a node and an item, and fills the node.
+
+        Example:
+            ```python
+            async def render_dish(dish_builder, dish):
+                dish_builder.attribute('name', dish['name'])
+                dish_builder.attribute('rating', await fetch_rating(dish['id']))
+
+            builder.attribute('title', 'Menu')
+            builder.stream_each('dishes', cursor, render_dish)
+            await builder.adump_json(writer)
+            ```
+        """
+        async def render() -> AsyncIterator[Dict[str, Any]]:
+            async for item in _aiter(items):
+                new_item_builder = self._new_node()
+                result = block(new_item_builder, item)
+                if hasattr(result, '__await__'):
+                    await result
+                yield new_item_builder._data
+        self._data[key] = AsyncArray(render())
+
+    @contextmanager
+    def cache(self, key: Hashable, expires_in: 'Expiry' = None, version: Any = None,
+              store: Optional['CacheStore'] = None) -> Iterator['CachedFragment']:
+        """
+        Cache the attributes and nodes added to a fragment, and reuse them while the cache is valid.
+
+        The fragment is empty when it is not cached yet (`fragment.miss` is True): the block must then
+        fill it. Otherwise it holds the cached data and the block can skip rendering it. In both
+        cases, the fragment is merged into the current node when the block exits.
+
+        Args:
+            key (Hashable): The cache key of the fragment.
+            expires_in (int, float or timedelta): Time to live of the fragment, in seconds. Never expires when None.
+            version (Any): Version of the rendered object, such as an update timestamp. Changing it invalidates the fragment.
+            store (CacheStore): The store to use. Defaults to the store set with `set_default_store`.
+
+        Example:
+            ```python
+            with builder.cache(('dish', dish.id), version=dish.updated_at) as fragment:
+                if fragment.miss:
+                    with fragment.node('dish') as dish_builder:
+                        dish_builder.attributes(dish, ['name', 'origin'])
+            ```
+        """
+        from .cache import MISSING, get_default_store
+        if store is None:
+            store = get_default_store()
+        cache_key = (key, version)
+        cached_data = store.read(cache_key)
+        fragment = CachedFragment(cached_data is not MISSING)
+        if fragment.hit:
+            fragment._data = cached_data
+        yield fragment
+        if fragment.miss:
+            store.set(cache_key, fragment._data, expires_in)
+        self._data.update(fragment._data)
+        if _pending_lazy:
+            self._note_lazy(fragment._data)
+
+    def cache_each(self, key: str, items: Iterable[Any], cache_key: Callable[[Any], Hashable],
+                   version: Optional[Callable[[Any], Any]] = None, expires_in: 'Expiry' = None,
+                   store: Optional['CacheStore'] = None) -> Iterator[Tuple['SpytulaNode', Any]]:
+        """
+        Iterate over items like `each`, reusing the cached node of every item found in the cache.
+
+        All cache keys are fetched at once, and only the items missing from the cache are yielded.
+        Their nodes are stored in the cache once the iteration is complete.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            items (Iterable[Any]): The items to iterate over.
+            cache_key (callable): Function that takes an item and returns its cache key.
+            version (callable): Function that takes an item and returns its version, if any.
+            expires_in (int, float or timedelta): Time to live of the nodes, in seconds. Never expires when None.
+            store (CacheStore): The store to use. Defaults to the store set with `set_default_store`.
+
+        Yields:
+            Tuple[SpytulaNode, Any]: A tuple containing the node and the item, for every item missing from the cache.
+
+        Example:
+            ```python
+            dishes = builder.cache_each('dishes', dishes, lambda dish: ('dish', dish.id),
+                                        version=lambda dish: dish.updated_at)
+            for dish_builder, dish in dishes:
+                dish_builder.attributes(dish, ['name', 'origin'])
+            ```
+        """
+        from .cache import MISSING, get_default_store
+        if store is None:
+            store = get_default_store()
+        items = list(items)
+        cache_keys = [(cache_key(item), version(item) if version else None) for item in items]
+        cached_nodes = store.read_many(cache_keys)
+        new_nodes: List[Dict[str, Any]] = self._list_class()
+        self._data[key] = new_nodes
+        missing_nodes: Dict[Hashable, Dict[str, Any]] = {}
+        for item, item_cache_key in zip(items, cache_keys):
+            cached_node = cached_nodes.get(item_cache_key, MISSING)
+            try:
+                if cached_node is not MISSING:
+                    new_nodes.append(cached_node)
+                    continue
+                new_item_builder = self._new_node()
+                new_nodes.append(new_item_builder._data)
+            except ListFull:
+                break
+            missing_nodes[item_cache_key] = new_item_builder._data
+            try:
+                yield new_item_builder, item
+            finally:
+                if new_item_builder._holds_lazy:
+                    self._note_lazy(new_item_builder)
+        if missing_nodes:
+            store.set_many(missing_nodes, expires_in)
+
+    def columns(self, key: str, columns: Any) -> None:
+        """
+        Create a new list of nodes from columnar data, without creating a builder for each row.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            columns (Any): A mapping of column names to values (lists, tuples, NumPy arrays...),
+                           or a NumPy structured or record array.
+
+        Raises:
+            ValueError: If the columns don't all have the same length.
+
+        Example:
+            ```python
+            builder.columns('ingredients', {
+                'name': ['Noodles', 'Pork', 'Eggs'],
+                'price': numpy.array([1.5, 4.0, 0.8]),
+            })
+            ```
+        """
+        from .columns import columns_to_rows
+        self._data[key] = columns_to_rows(columns)
+        if _pending_lazy:
+            self._note_lazy(self._data[key])
+
+    def attribute(self, key: str, value: Any) -> None:
+        """
+        Add a new attribute to the JSON.
+
+        Args:
+            key (str): The key for the new attribute in the JSON.
+            value (Any): The value of the new attribute.
+
+        Example:
+            ```python
+            builder.attribute("name", "Ramen Noodles")
+            ```
+        """
+        self._data[key] = value
+        if _pending_lazy and not isinstance(value, _SCALARS):
+            self._note_lazy(value)
+
+    def attributes(self, obj: Any, keys: List[str], rename: Optional[Dict[str, str]] = None,
+                   transform: Optional[Dict[str, Callable[[Any], Any]]] = None) -> None:
+        """
+        Add multiple new attributes to the JSON.
+
+        The kind of object is detected once per type: values are read by key from mappings, and by
+        attribute from other objects (dataclasses, named tuples, objects with `__slots__`, ORM rows...).
+        Objects exposing some keys as attributes and the others by key are supported too.
+
+        Args:
+            obj (Any): The object from which the attributes' values will be retrieved.
+            keys (List[str]): A list of the keys for the new attributes in the JSON.
+            rename (Dict[str, str]): The key in the JSON of some attributes, by key in the object.
+            transform (Dict[str, callable]): Functions applied to the value of some attributes, by key in the object.
+
+        Example:
+            ```python
+            ramen = {'name': 'Tonkotsu Ramen', 'type': 'Pork-based'}
+            builder.attributes(ramen, ['name', 'type'])
+            builder.attributes(ramen, ['name', 'type'], rename={'type': 'broth'}, transform={'name': str.upper})
+            ```
+        """
+        data = self._data
+        if not rename and not transform:
+            # A single record is cheaper to read key by key than with a compiled accessor
+            reader = get_reader(type(obj))
+            try:
+                for key in keys:
+                    data[key] = reader(obj, key)
+            except (AttributeError, LookupError, TypeError):
+                pass
+            else:
+                if _pending_lazy:
+                    self._note_lazy([data[key] for key in keys])
+                return
+        keys = tuple(keys)
+        values = read_values(obj, keys)
+        if rename or transform:
+            keys, transforms = output_fields(keys, rename, transform)
+            if transforms:
+                values = apply_transforms(values, transforms)
+        for key, value in zip(keys, values):
+            data[key] = value
+        if _pending_lazy:
+            self._note_lazy(values)
+
+    def attributes_many(self, key: str, items: Iterable[Any], keys: List[str],
+                        rename: Optional[Dict[str, str]] = None,
+                        transform: Optional[Dict[str, Callable[[Any], Any]]] = None) -> None:
+        """
+        Create a new list of nodes holding the same attributes of each item, without creating a builder for each item.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            items (Iterable[Any]): The objects from which the attributes' values will be retrieved.
+            keys (List[str]): A list of the keys for the attributes in the JSON.
+            rename (Dict[str, str]): The key in the JSON of some attributes, by key in the objects.
+            transform (Dict[str, callable]): Functions applied to the value of some attributes, by key in the objects.
+
+        Example:
+            ```python
+            builder.attributes_many('ingredients', ingredients, ['name', 'type'], transform={'type': str.upper})
+            ```
+        """
+        keys = tuple(keys)
+        output_keys, transforms = output_fields(keys, rename, transform)
+        nodes: List[Dict[str, Any]] = []
+        append = nodes.append
+        item_type = accessor = None
+        for item in items:
+            if type(item) is not item_type:
+                item_type = type(item)
+                accessor = get_accessor(item_type, keys)
+            try:
+                values = accessor(item)
+            except (AttributeError, LookupError, TypeError):
+                values = read_values(item, keys)
+            if transforms:
+                values = apply_transforms(values, transforms)
+            append(dict(zip(output_keys, values)))
+        self._data[key] = nodes
+        if _pending_lazy:
+            self._note_lazy(nodes)
+
+    def merge(self, data: Union[Dict[str, Any], 'FrozenNode']) -> None:
+        """
+        Merge given dictionary into the JSON data.
+
+        Args:
+            data (Dict[str, Any] or FrozenNode): Dictionary to merge, or the snapshot of a builder,
+                                                 whose values are added by reference.
+
+        Example:
+            ```python
+            extra_info = {'rating': 4.5, 'spiciness': 'Medium'}
+            builder.merge(extra_info)
+            ```
+        """
+        from .frozen import FrozenNode
+        if isinstance(data, dict):
+            self._data.update(data)
+            if _pending_lazy:
+                self._note_lazy(data)
+        elif isinstance(data, FrozenNode):
+            self._data.update(data.fields())
+        else:
+            raise TypeError("Expected a dictionary to merge.")
+
+    def when(self, key: str, value: Any, condition: Union[bool, Callable[[Any], bool]]) -> None:
+        """
+        Add a new attribute to the JSON when the condition is met.
+
+        Args:
+            key (str): The key for the new attribute in the JSON.
+            value: The value of the new attribute.
+            condition (bool or callable): Condition to be met. Can be a boolean or a lambda function that takes a value
+                                          and returns a boolean.
+
+        Example:
+            ```python
+            builder.when('has_noodles', True, True)
+            ```
+        """
+        if isinstance(condition, bool):
+            if condition:
+                self.attribute(key, value)
+        elif callable(condition):
+            if condition(value):
+                self.attribute(key, value)
+        else:
+            raise TypeError("Condition must be a boolean or a callable.")
+
+    def raw(self, key: str, value: Union[str, bytes], reindent: bool = False) -> None:
+        """
+        Add an attribute holding already serialized JSON, spliced verbatim into the JSON output.
+
+        Args:
+            key (str): The key for the new attribute in the JSON.
+            value (str or bytes): The serialized JSON. Bytes must be UTF-8 encoded.
+            reindent (bool): Re-indent the JSON to match the indentation of the output.
+
+        Example:
+            ```python
+            builder.raw('nutrition', b'{"calories": 550, "protein": 24}')
+            ```
+        """
+        self._data[key] = RawJSON(value, reindent)
+
+    def partial(self, other_builder: Union['SpytulaNode', 'FrozenNode'], serialized: bool = False,
+                reindent: bool = False) -> None:
+        """
+        Merge given SpytulaNode instance into the current instance.
+
+        The values of the other builder are shared, not copied: use `freeze` on a builder merged
+        into many others, so its values are never modified and are serialized only once.
+
+        Args:
+            other_builder (SpytulaNode or FrozenNode): SpytulaNode instance to merge, or the snapshot of a builder.
+            serialized (bool): Serialize the values of the other builder to JSON once, and splice
+                               them verbatim into the JSON output. Keys are formatted with the
+                               key format of the other builder, if any.
+            reindent (bool): With `serialized`, re-indent the JSON to match the indentation of the output.
+
+        Example:
+            ```python
+            other_builder = SpytulaBuilder()
+            other_builder.attribute('type', 'Ramen')
+            builder.partial(other_builder)
+            ```
+        """
+        from .frozen import FrozenNode
+        if isinstance(other_builder, FrozenNode):
+            self._data.update(other_builder.fields())
+        elif serialized:
+            writer = JSONWriter(format_key=getattr(other_builder, '_key_formatter', None))
+            format_key = writer.format_key or str
+            for key, value in stored_items(other_builder._data):
+                self._data[format_key(key)] = RawJSON(writer.encode(value), reindent)
+        else:
+            self._data.update(stored_items(other_builder._data))
+            if _pending_lazy:
+                self._note_lazy(other_builder)
+
+
+SpytulaNode._node_class = SpytulaNode
+
+
+class CachedFragment(SpytulaNode):
+    """
+    A node holding a fragment of data that is cached by `SpytulaNode.cache`.
+    """
+
+    __slots__ = ('hit',)
+
+    def __init__(self, hit: bool) -> None:
+        """
+        Initialize a new CachedFragment instance.
+
+        Args:
+            hit (bool): Whether the fragment was found in the cache.
+        """
+        super().__init__()
+        self.hit = hit
+
+    @property
+    def miss(self) -> bool:
+        """
+        Whether the fragment was missing from the cache and must be rendered.
+        """
+        return not self.hit
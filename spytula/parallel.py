@@ -0,0 +1,75 @@
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+def _chunks(records: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_chunk(config: Dict[str, Any], block: Callable[[Any, Any], None], chunk: List[Any], ndjson: bool) -> str:
+    """
+    Render a chunk of records in a worker, with the configuration of the original builder.
+
+    Args:
+        config (Dict[str, Any]): The configuration of the builder, from `SpytulaBuilder._parallel_config`.
+        block (callable): Function that takes a node and a record, and fills the node.
+        chunk (List[Any]): The records to render.
+        ndjson (bool): Render JSON Lines instead of the comma-separated items of a JSON array.
+
+    Returns:
+        str: The serialized records.
+    """
+    builder = config['builder_class']._from_parallel_config(config)
+    options = config['json_options']
+    if ndjson:
+        return builder.to_ndjson(chunk, block, **options)
+    return config['item_separator'].join(
+        builder._encode_json(builder._render_record(record, block), None, False, **options)
+        for record in chunk
+    )
+
+
+def map_chunks(config: Dict[str, Any], block: Callable[[Any, Any], None], records: Iterable[Any],
+               workers: Optional[int], chunk_size: int, ndjson: bool,
+               executor: Optional[Executor] = None) -> Iterator[str]:
+    """
+    Render records by chunks in a pool of processes, yielding the serialized chunks in order.
+
+    Only a few chunks per worker are submitted ahead, so the records are consumed lazily.
+
+    Args:
+        config (Dict[str, Any]): The configuration of the builder.
+        block (callable): Function that takes a node and a record, and fills the node.
+        records (Iterable[Any]): The records to render.
+        workers (int): Number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int): Number of records rendered by a worker at once.
+        ndjson (bool): Render JSON Lines instead of the items of a JSON array.
+        executor (Executor): An existing executor to use instead of a new process pool.
+
+    Yields:
+        str: The serialized chunks.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    pending: deque = deque()
+    try:
+        ahead = 2 * (workers or getattr(executor, '_max_workers', 1))
+        for chunk in _chunks(records, chunk_size):
+            pending.append(executor.submit(render_chunk, config, block, chunk, ndjson))
+            if len(pending) >= ahead:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,415 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .serializers.json import RawJSON, default_value, stored_items, stored_values, unwrap
+from .tracking import TrackedDict, TrackedList, current_version
+
+
+_SCALARS = (str, int, float, type(None))
+
+_MISSING = object()
+
+FormatKey = Optional[Callable[[str], str]]
+
+
+def _json_key(key: Any, format_key: FormatKey) -> str:
+    """
+    Return the key of a dictionary as written in JSON.
+    """
+    if isinstance(key, str):
+        return format_key(key) if format_key is not None else key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, float):
+        return float.__repr__(key)
+    return int.__repr__(key)
+
+
+def _escape(key: str) -> str:
+    """
+    Escape a key to be used in a JSON Pointer (RFC 6901).
+    """
+    if '~' in key or '/' in key:
+        return key.replace('~', '~0').replace('/', '~1')
+    return key
+
+
+def _equal(old: Any, new: Any) -> bool:
+    return type(old) is type(new) and old == new
+
+
+def to_plain(value: Any, format_key: FormatKey = None, default: Callable[[Any], Any] = None,
+             sources: Dict[int, Tuple[Any, Any]] = None, parents: Dict[int, List[int]] = None) -> Any:
+    """
+    Convert data to plain JSON data (dictionaries, lists and scalars), with formatted keys.
+
+    Nodes are replaced by their data, lazy values by their results, and snapshots and raw JSON
+    by their parsed JSON. The data is walked with an explicit stack.
+
+    Args:
+        value (Any): The data to convert.
+        format_key (callable): Function applied to every string key, if any.
+        default (callable): Function called for objects that can't otherwise be converted.
+        sources (Dict[int, tuple]): When given, the tracked containers, snapshots and raw JSON of the data
+                                    are recorded in it, as (object, plain data) pairs by object id.
+        parents (Dict[int, List[int]]): When given, the ids of the nearest tracked containers holding
+                                        each tracked container are recorded in it.
+
+    Returns:
+        Any: The plain data.
+    """
+    holder = [None]
+    # Each entry is a (container, key or index, value, key format, nearest tracked container id) tuple
+    stack: List[tuple] = [(holder, 0, value, format_key, None)]
+    pop = stack.pop
+    while stack:
+        container, slot, value, format_key, parent = pop()
+        value = unwrap(value)
+        if isinstance(value, _SCALARS):
+            container[slot] = value
+            continue
+        value_id = id(value)
+        if sources is not None:
+            source = sources.get(value_id)
+            if source is not None and source[0] is value:
+                # A container shared by several parents is converted once
+                container[slot] = source[1]
+                if parent is not None and value_id in parents:
+                    parents[value_id].append(parent)
+                continue
+        if isinstance(value, dict):
+            plain: Any = {}
+            children = []
+            for key, item in stored_items(value):
+                plain_key = _json_key(key, format_key)
+                plain[plain_key] = item
+                if not isinstance(item, _SCALARS):
+                    children.append(plain_key)
+        elif isinstance(value, (list, tuple)):
+            plain = list(stored_values(value))
+            children = [index for index, item in enumerate(plain) if not isinstance(item, _SCALARS)]
+        elif isinstance(value, RawJSON):
+            plain = value._formatted_data(format_key)
+            children = None
+        else:
+            stack.append((container, slot, default_value(value, default), format_key, parent))
+            continue
+        container[slot] = plain
+        if sources is not None and (children is None or isinstance(value, (TrackedDict, TrackedList))):
+            sources[value_id] = (value, plain)
+            if children is not None:
+                parents[value_id] = [parent] if parent is not None else []
+                parent = value_id
+        if children:
+            stack.extend((plain, slot, plain[slot], format_key, parent) for slot in reversed(children))
+    return holder[0]
+
+
+class Snapshot:
+    """
+    The plain JSON data of a builder at some point, created by `SpytulaBuilder.snapshot`, to compute
+    the changes of a builder with `SpytulaBuilder.diff` or `SpytulaBuilder.merge_patch`.
+
+    The snapshot keeps a reference to the tracked containers, frozen builders and raw JSON of the
+    builder, so the ones that weren't changed since the snapshot was taken are skipped without
+    comparing them.
+    """
+
+    __slots__ = ('data', 'version', '_sources', '_parents')
+
+    def __init__(self, data: Any, format_key: FormatKey = None, default: Callable[[Any], Any] = None) -> None:
+        """
+        Initialize a new Snapshot instance.
+
+        Args:
+            data (Any): The data of the builder.
+            format_key (callable): Function applied to every string key, if any.
+            default (callable): Function called for objects that can't otherwise be converted.
+        """
+        self.version = current_version()
+        self._sources: Dict[int, Tuple[Any, Any]] = {}
+        self._parents: Dict[int, List[int]] = {}
+        self.data = to_plain(data, format_key, default, self._sources, self._parents)
+
+    def _changed(self) -> set:
+        """
+        Return the ids of the tracked containers changed since the snapshot, and of the tracked
+        containers holding them.
+        """
+        changed: set = set()
+        version = self.version
+        parents = self._parents
+        for value_id, (value, _) in self._sources.items():
+            if getattr(value, '_version', 0) > version and value_id not in changed:
+                pending = [value_id]
+                while pending:
+                    container_id = pending.pop()
+                    if container_id not in changed:
+                        changed.add(container_id)
+                        pending.extend(parents.get(container_id, ()))
+        return changed
+
+    def _unchanged(self) -> Callable[[Any, Any], bool]:
+        """
+        Return a function telling whether a value of the builder is the unchanged source of a
+        value of the snapshot.
+        """
+        sources = self._sources
+        changed = self._changed()
+
+        def unchanged(old: Any, new: Any) -> bool:
+            source = sources.get(id(new))
+            return source is not None and source[0] is new and source[1] is old and id(new) not in changed
+        return unchanged
+
+
+def _item_ids(items: List[Any], key: str) -> Optional[List[Any]]:
+    """
+    Return the value of the given key in each item, or None if an item doesn't have one, or
+    if they aren't unique.
+    """
+    ids = []
+    for item in items:
+        item = unwrap(item)
+        item_id = item.get(key, _MISSING) if isinstance(item, dict) else _MISSING
+        if item_id is _MISSING:
+            return None
+        ids.append(item_id)
+    try:
+        if len(set(ids)) != len(ids):
+            return None
+    except TypeError:
+        return None
+    return ids
+
+
+def diff(snapshot: Snapshot, data: Any, format_key: FormatKey = None, list_keys: Dict[str, str] = None,
+         default: Callable[[Any], Any] = None) -> List[Dict[str, Any]]:
+    """
+    Compute the JSON Patch (RFC 6902) turning the data of a snapshot into the given data.
+
+    Objects are compared key by key. Lists are compared item by item, after skipping the
+    unchanged items at their beginning and end, so adding or removing a few items yields a
+    few operations. The items of the lists listed in `list_keys` are matched by an id instead
+    of by position, and moved when they are reordered.
+
+    Args:
+        snapshot (Snapshot): The snapshot of the previous data.
+        data (Any): The new data.
+        format_key (callable): Function applied to every string key, if any.
+        list_keys (Dict[str, str]): The key identifying the items of some lists, by key of the list.
+        default (callable): Function called for objects that can't otherwise be converted.
+
+    Returns:
+        List[Dict[str, Any]]: The operations of the patch.
+    """
+    unchanged = snapshot._unchanged()
+    list_keys = list_keys or {}
+    operations: List[Dict[str, Any]] = []
+    append = operations.append
+
+    def plain(value: Any, format_key: FormatKey) -> Any:
+        return to_plain(value, format_key, default)
+
+    # Each entry is an (old value, new value, path, key format, key of the new value) tuple
+    stack: List[tuple] = [(snapshot.data, data, '', format_key, None)]
+    while stack:
+        old, new, path, format_key, key = stack.pop()
+        new = unwrap(new)
+        if unchanged(old, new):
+            continue
+        if isinstance(new, RawJSON) and isinstance(old, (dict, list)):
+            # The keys of serialized JSON are already formatted
+            new = new._formatted_data(format_key)
+            format_key = None
+        if isinstance(new, dict) and type(old) is dict:
+            children = []
+            new_keys = {}
+            for new_key, value in stored_items(new):
+                new_keys[_json_key(new_key, format_key)] = new_key
+            for old_key in old:
+                if old_key not in new_keys:
+                    append({'op': 'remove', 'path': f'{path}/{_escape(old_key)}'})
+            for json_key, new_key in new_keys.items():
+                child_path = f'{path}/{_escape(json_key)}'
+                if json_key in old:
+                    children.append((old[json_key], new[new_key], child_path, format_key, new_key))
+                else:
+                    append({'op': 'add', 'path': child_path, 'value': plain(new[new_key], format_key)})
+            stack.extend(reversed(children))
+        elif isinstance(new, (list, tuple)) and type(old) is list:
+            id_key = list_keys.get(key) if isinstance(key, str) else None
+            if id_key is not None:
+                old_ids = _item_ids(old, _json_key(id_key, format_key))
+                new_ids = _item_ids(new, id_key) if old_ids is not None else None
+                if new_ids is not None:
+                    stack.extend(reversed(_diff_keyed_list(old, new, old_ids, new_ids, path, format_key,
+                                                           append, plain)))
+                    continue
+            stack.extend(reversed(_diff_list(old, new, path, format_key, unchanged, append, plain)))
+        else:
+            value = plain(new, format_key)
+            if not _equal(old, value):
+                append({'op': 'replace', 'path': path, 'value': value})
+    return operations
+
+
+def _diff_list(old: List[Any], new: Any, path: str, format_key: FormatKey, unchanged: Callable[[Any, Any], bool],
+               append: Callable[[Dict[str, Any]], None], plain: Callable[[Any, FormatKey], Any]) -> List[tuple]:
+    """
+    Helper function to diff two lists by position, returning the pairs of items to compare.
+    """
+    def same(old_item: Any, new_item: Any) -> bool:
+        new_item = unwrap(new_item)
+        if isinstance(new_item, _SCALARS):
+            return _equal(old_item, new_item)
+        return unchanged(old_item, new_item)
+
+    old_length, new_length = len(old), len(new)
+    length = min(old_length, new_length)
+    start = 0
+    while start < length and same(old[start], new[start]):
+        start += 1
+    end = 0
+    while end < length - start and same(old[old_length - 1 - end], new[new_length - 1 - end]):
+        end += 1
+    old_stop, new_stop = old_length - end, new_length - end
+    paired = min(old_stop, new_stop)
+    # Removals are applied from the end, so the indices of the other items don't change
+    for index in range(old_stop - 1, paired - 1, -1):
+        append({'op': 'remove', 'path': f'{path}/{index}'})
+    for index in range(paired, new_stop):
+        append({'op': 'add', 'path': f'{path}/{index}', 'value': plain(new[index], format_key)})
+    # The items at the beginning and end are unchanged, so only the items in between are compared
+    return [(old[index], new[index], f'{path}/{index}', format_key, None) for index in range(start, paired)]
+
+
+def _stable_indices(positions: List[int]) -> set:
+    """
+    Return the indices of a longest increasing subsequence of the given positions.
+    """
+    tails: List[int] = []
+    previous = [-1] * len(positions)
+    for index, position in enumerate(positions):
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if positions[tails[middle]] < position:
+                low = middle + 1
+            else:
+                high = middle
+        if low:
+            previous[index] = tails[low - 1]
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+    stable = set()
+    index = tails[-1] if tails else -1
+    while index != -1:
+        stable.add(index)
+        index = previous[index]
+    return stable
+
+
+def _diff_keyed_list(old: List[Any], new: Any, old_ids: List[Any], new_ids: List[Any], path: str,
+                     format_key: FormatKey, append: Callable[[Dict[str, Any]], None],
+                     plain: Callable[[Any, FormatKey], Any]) -> List[tuple]:
+    """
+    Helper function to diff two lists whose items are matched by id, returning the pairs of items to compare.
+
+    The items keeping their relative order are left in place, and the others are moved right
+    after the item preceding them in the new list, so reordering yields as few moves as possible.
+    """
+    new_id_set = set(new_ids)
+    old_by_id = dict(zip(old_ids, old))
+    for index in range(len(old) - 1, -1, -1):
+        if old_ids[index] not in new_id_set:
+            append({'op': 'remove', 'path': f'{path}/{index}'})
+    current = [item_id for item_id in old_ids if item_id in new_id_set]
+    old_positions = {item_id: index for index, item_id in enumerate(current)}
+    kept = [index for index, item_id in enumerate(new_ids) if item_id in old_positions]
+    stable = {kept[index] for index in _stable_indices([old_positions[new_ids[index]] for index in kept])}
+    children = []
+    for index, item_id in enumerate(new_ids):
+        if index not in stable:
+            to_index = current.index(new_ids[index - 1]) + 1 if index else 0
+            if item_id in old_positions:
+                from_index = current.index(item_id)
+                del current[from_index]
+                if from_index < to_index:
+                    to_index -= 1
+                if from_index != to_index:
+                    append({'op': 'move', 'from': f'{path}/{from_index}', 'path': f'{path}/{to_index}'})
+                current.insert(to_index, item_id)
+            else:
+                append({'op': 'add', 'path': f'{path}/{to_index}', 'value': plain(new[index], format_key)})
+                current.insert(to_index, item_id)
+                continue
+        # Once every item is in place, the list is in the new order
+        children.append((old_by_id[item_id], new[index], f'{path}/{index}', format_key, None))
+    return children
+
+
+def merge_patch(snapshot: Snapshot, data: Any, format_key: FormatKey = None,
+                default: Callable[[Any], Any] = None) -> Any:
+    """
+    Compute the JSON Merge Patch (RFC 7386) turning the data of a snapshot into the given data.
+
+    Merge patches replace lists as a whole, and can't set a value to null, which removes the key.
+
+    Args:
+        snapshot (Snapshot): The snapshot of the previous data.
+        data (Any): The new data.
+        format_key (callable): Function applied to every string key, if any.
+        default (callable): Function called for objects that can't otherwise be converted.
+
+    Returns:
+        Any: The merge patch, an empty object when nothing changed.
+    """
+    unchanged = snapshot._unchanged()
+    old, new = snapshot.data, unwrap(data)
+    if unchanged(old, new):
+        return {}
+    if isinstance(new, RawJSON):
+        new = new._formatted_data(format_key)
+        format_key = None
+    if not isinstance(new, dict) or type(old) is not dict:
+        return to_plain(new, format_key, default)
+    patch: Dict[str, Any] = {}
+    # Nested patches, in the order they were created, to remove the empty ones afterwards
+    nested: List[Tuple[Dict[str, Any], str, Dict[str, Any]]] = []
+    stack = [(old, new, patch, format_key)]
+    while stack:
+        old, new, patch_object, format_key = stack.pop()
+        new_keys = {_json_key(key, format_key): key for key in new}
+        for old_key in old:
+            if old_key not in new_keys:
+                patch_object[old_key] = None
+        for json_key, key in new_keys.items():
+            old_value, new_value = old.get(json_key, _MISSING), unwrap(new[key])
+            if old_value is _MISSING:
+                patch_object[json_key] = to_plain(new_value, format_key, default)
+                continue
+            if unchanged(old_value, new_value):
+                continue
+            value_format_key = format_key
+            if isinstance(new_value, RawJSON) and type(old_value) is dict:
+                new_value = new_value._formatted_data(format_key)
+                value_format_key = None
+            if isinstance(new_value, dict) and type(old_value) is dict:
+                nested_patch: Dict[str, Any] = {}
+                patch_object[json_key] = nested_patch
+                nested.append((patch_object, json_key, nested_patch))
+                stack.append((old_value, new_value, nested_patch, value_format_key))
+            else:
+                value = to_plain(new_value, value_format_key, default)
+                if not _equal(old_value, value):
+                    patch_object[json_key] = value
+    for patch_object, json_key, nested_patch in reversed(nested):
+        if not nested_patch:
+            del patch_object[json_key]
+    return patch
@@ -0,0 +1,280 @@
+import time
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class ProfileRecord:
+    """
+    Measurements of a single serialization of a builder.
+
+    Attributes:
+        operation (str): The serialization method, like "to_json" or "dump_yaml".
+        build_seconds (float): Time elapsed between the creation of the builder and the serialization,
+                               or None when the builder was created while profiling was disabled.
+        format_seconds (float): Time spent formatting the keys in `_format_data`. Keys are formatted
+                                while encoding by `iter_json` and `dump_json`, so this is 0 for them.
+        encode_seconds (float): Time spent encoding the data.
+        nodes (int): Number of objects in the data.
+        attributes (int): Number of keys in the data.
+        keys_formatted (int): Number of keys passed to the key formatter.
+        key_cache_hits (int): Number of formatted keys found in the key format cache.
+        key_cache_misses (int): Number of keys formatted with inflection.
+        output_bytes (int): Size of the output, in UTF-8 encoded bytes.
+    """
+
+    __slots__ = ('operation', 'build_seconds', 'format_seconds', 'encode_seconds', 'nodes', 'attributes',
+                 'keys_formatted', 'key_cache_hits', 'key_cache_misses', 'output_bytes')
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.build_seconds: Optional[float] = None
+        self.format_seconds = 0.0
+        self.encode_seconds = 0.0
+        self.nodes = 0
+        self.attributes = 0
+        self.keys_formatted = 0
+        self.key_cache_hits = 0
+        self.key_cache_misses = 0
+        self.output_bytes = 0
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'ProfileRecord({fields})'
+
+
+# Functions called with every ProfileRecord. Builders are only instrumented when this list isn't empty.
+_observers: List[Callable[[ProfileRecord], None]] = []
+
+
+def add_observer(observer: Callable[[ProfileRecord], None]) -> None:
+    """
+    Register a function called with the measurements of every serialization, in every thread.
+
+    Args:
+        observer (callable): Function that takes a ProfileRecord.
+
+    Example:
+        ```python
+        add_observer(lambda record: statsd.timing(record.operation, record.encode_seconds))
+        ```
+    """
+    _observers.append(observer)
+
+
+def remove_observer(observer: Callable[[ProfileRecord], None]) -> None:
+    """
+    Unregister a function registered with `add_observer`.
+
+    Args:
+        observer (callable): The registered function.
+    """
+    _observers.remove(observer)
+
+
+def _output_bytes(output: Any) -> int:
+    if isinstance(output, str):
+        return len(output) if output.isascii() else len(output.encode('utf-8'))
+    return len(output)
+
+
+def _count(data: Any) -> tuple:
+    from .node import SpytulaNode
+    from .serializers.json import stored_values
+    nodes = attributes = 0
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, SpytulaNode):
+            value = value.data
+        if isinstance(value, dict):
+            nodes += 1
+            attributes += len(value)
+            stack.extend(dict.values(value))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(stored_values(value))
+    return nodes, attributes
+
+
+class Recorder:
+    """
+    Collect the measurements of a serialization, and send them to the observers.
+    """
+
+    __slots__ = ('record', '_formatter', '_misses', '_previous_misses', '_started')
+
+    def __init__(self, builder: Any, operation: str) -> None:
+        """
+        Initialize a new Recorder instance.
+
+        Args:
+            builder (SpytulaBuilder): The serialized builder.
+            operation (str): The serialization method.
+        """
+        self._started = time.perf_counter()
+        self.record = ProfileRecord(operation)
+        created_at = getattr(builder, '_created_at', None)
+        if created_at is not None:
+            self.record.build_seconds = self._started - created_at
+        self._formatter = builder._key_formatter
+        # The cache statistics are shared with every builder using the same key format: only
+        # the misses of this thread are counted, and every key of the data is formatted once
+        self._misses = [0]
+        self._previous_misses = self._formatter.count_misses(self._misses) if self._formatter is not None else None
+
+    def format_data(self, builder: Any, data: Any) -> Any:
+        """
+        Format the data with the builder, timing the formatting.
+        """
+        formatted_data = builder._format_data(data)
+        now = time.perf_counter()
+        self.record.format_seconds += now - self._started
+        self._started = now
+        return formatted_data
+
+    def iterate(self, data: Any, chunks: Iterator[Any]) -> Iterator[Any]:
+        """
+        Wrap an iterator of output chunks, timing the encoding of every chunk.
+        """
+        record = self.record
+        perf_counter = time.perf_counter
+        output_bytes = 0
+        self.record.encode_seconds += perf_counter() - self._started
+        while True:
+            started = perf_counter()
+            chunk = next(chunks, None)
+            record.encode_seconds += perf_counter() - started
+            if chunk is None:
+                break
+            output_bytes += _output_bytes(chunk)
+            yield chunk
+        self._started = perf_counter()
+        self.finish(data, output_bytes=output_bytes)
+
+    def writer(self, fp: Any) -> '_CountingWriter':
+        """
+        Wrap a file-like object to count the size of the output written to it.
+        """
+        return _CountingWriter(fp)
+
+    def finish(self, data: Any, output: Any = None, output_bytes: int = None) -> None:
+        """
+        Complete the measurements and send them to the observers.
+
+        Args:
+            data (Any): The serialized data.
+            output (str or bytes): The output, if any.
+            output_bytes (int): The size of the output, when it isn't given.
+        """
+        record = self.record
+        record.encode_seconds += time.perf_counter() - self._started
+        record.nodes, record.attributes = _count(data)
+        if self._formatter is not None:
+            self._formatter.count_misses(self._previous_misses)
+            record.keys_formatted = record.attributes
+            record.key_cache_misses = min(self._misses[0], record.keys_formatted)
+            record.key_cache_hits = record.keys_formatted - record.key_cache_misses
+        record.output_bytes = _output_bytes(output) if output is not None else output_bytes or 0
+        for observer in list(_observers):
+            observer(record)
+
+
+class _CountingWriter:
+    """
+    File-like object counting the size of the chunks written to another one.
+    """
+
+    def __init__(self, fp: Any) -> None:
+        self._fp = fp
+        self.output_bytes = 0
+
+    def write(self, chunk: Any) -> Any:
+        self.output_bytes += _output_bytes(chunk)
+        return self._fp.write(chunk)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._fp, name)
+
+
+class ProfileStats:
+    """
+    The measurements collected by `profile`, with their totals.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[ProfileRecord] = []
+
+    def __call__(self, record: ProfileRecord) -> None:
+        self.records.append(record)
+
+    def _total(self, name: str) -> Any:
+        return sum(getattr(record, name) for record in self.records)
+
+    @property
+    def build_seconds(self) -> float:
+        return sum(record.build_seconds for record in self.records if record.build_seconds is not None)
+
+    @property
+    def format_seconds(self) -> float:
+        return self._total('format_seconds')
+
+    @property
+    def encode_seconds(self) -> float:
+        return self._total('encode_seconds')
+
+    @property
+    def nodes(self) -> int:
+        return self._total('nodes')
+
+    @property
+    def attributes(self) -> int:
+        return self._total('attributes')
+
+    @property
+    def keys_formatted(self) -> int:
+        return self._total('keys_formatted')
+
+    @property
+    def key_cache_hit_rate(self) -> Optional[float]:
+        """
+        The share of formatted keys found in the key format cache, or None if no key was formatted.
+        """
+        keys_formatted = self.keys_formatted
+        return self._total('key_cache_hits') / keys_formatted if keys_formatted else None
+
+    @property
+    def output_bytes(self) -> int:
+        return self._total('output_bytes')
+
+    def __repr__(self) -> str:
+        return (f'ProfileStats(serializations={len(self.records)}, build_seconds={self.build_seconds:.6f}, '
+                f'format_seconds={self.format_seconds:.6f}, encode_seconds={self.encode_seconds:.6f}, '
+                f'nodes={self.nodes}, attributes={self.attributes}, keys_formatted={self.keys_formatted}, '
+                f'key_cache_hit_rate={self.key_cache_hit_rate}, output_bytes={self.output_bytes})')
+
+
+@contextmanager
+def profile() -> Iterator[ProfileStats]:
+    """
+    Collect the measurements of every builder serialized in the block.
+
+    Profiling is process-wide: serializations of other threads are collected too.
+
+    Yields:
+        ProfileStats: The collected measurements.
+
+    Example:
+        ```python
+        with spytula.profile() as stats:
+            builder = SpytulaBuilder()
+            builder.attribute('name', 'Ramen')
+            builder.to_json()
+        print(stats.encode_seconds, stats.output_bytes)
+        ```
+    """
+    stats = ProfileStats()
+    add_observer(stats)
+    try:
+        yield stats
+    finally:
+        remove_observer(stats)
@@ -0,0 +1,212 @@
+import json
+import re
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class JSONBackend:
+    """
+    Base class of the JSON backends used by `to_json` and `to_json_bytes`.
+
+    Backends accept the options of `json.dumps` that the builder relies on (`indent`,
+    `sort_keys`, `ensure_ascii` and `default`) and map them to their own API.
+    """
+
+    name = 'json'
+
+    def dumps(self, data: Any, *args, **kwargs) -> str:
+        """
+        Serialize data to a JSON string.
+
+        Args:
+            data (Any): The data to serialize.
+            *args: Additional positional arguments for the backend.
+            **kwargs: Additional keyword arguments for the backend.
+
+        Returns:
+            str: The JSON document.
+        """
+        return json.dumps(data, *args, **kwargs)
+
+    def dumps_bytes(self, data: Any, *args, **kwargs) -> bytes:
+        """
+        Serialize data to UTF-8 encoded JSON bytes.
+
+        Args:
+            data (Any): The data to serialize.
+            *args: Additional positional arguments for the backend.
+            **kwargs: Additional keyword arguments for the backend.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        return self.dumps(data, *args, **kwargs).encode('utf-8')
+
+    def separators(self, indent: Any = None, separators: Optional[Tuple[str, str]] = None) -> Tuple[str, str]:
+        """
+        Return the separators written with the given options, to estimate the size of the output.
+
+        Args:
+            indent (int or str): The indentation of the JSON, if any.
+            separators (tuple): The (item_separator, key_separator) tuple passed to the backend, if any.
+
+        Returns:
+            Tuple[str, str]: The (item_separator, key_separator) tuple.
+        """
+        if separators is not None:
+            return separators
+        return (',', ': ') if indent is not None else (', ', ': ')
+
+
+# Characters escaped by json.dumps when `ensure_ascii` is True
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _escape_non_ascii(match: 're.Match') -> str:
+    code = ord(match.group())
+    if code < 0x10000:
+        return '\\u%04x' % code
+    # Characters outside of the BMP are escaped as a surrogate pair, like json.dumps does
+    code -= 0x10000
+    return '\\u%04x\\u%04x' % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Backend using orjson, which natively produces bytes.
+
+    Only `indent=2` is supported by orjson. Since orjson never escapes non-ASCII characters,
+    they are escaped afterwards when `ensure_ascii` is True, like json.dumps does by default:
+    pass `ensure_ascii=False` to skip this step.
+    """
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+
+    def _option(self, indent: Any = None, sort_keys: bool = False) -> int:
+        option = self._orjson.OPT_NON_STR_KEYS
+        if indent is not None:
+            if indent not in (2, '  '):
+                raise ValueError("The orjson backend only supports indent=2.")
+            option |= self._orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps_bytes(self, data: Any, indent: Any = None, sort_keys: bool = False,
+                    ensure_ascii: bool = True, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        json_output = self._orjson.dumps(data, default=default, option=self._option(indent, sort_keys))
+        if not ensure_ascii or json_output.isascii():
+            return json_output
+        # Non-ASCII characters can only be found in strings, which are escaped like any other character
+        return _NON_ASCII.sub(_escape_non_ascii, json_output.decode('utf-8')).encode('ascii')
+
+    def dumps(self, data: Any, *args, **kwargs) -> str:
+        return self.dumps_bytes(data, *args, **kwargs).decode('utf-8')
+
+    def separators(self, indent: Any = None, separators: Optional[Tuple[str, str]] = None) -> Tuple[str, str]:
+        # The output is compact, unless it is indented
+        return (',', ': ') if indent is not None else (',', ':')
+
+
+class UjsonBackend(JSONBackend):
+    """
+    Backend using ujson.
+    """
+
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, data: Any, indent: Any = None, sort_keys: bool = False,
+              ensure_ascii: bool = True, default: Optional[Callable[[Any], Any]] = None) -> str:
+        return self._ujson.dumps(
+            data,
+            indent=indent or 0,
+            sort_keys=sort_keys,
+            ensure_ascii=ensure_ascii,
+            escape_forward_slashes=False,
+            default=default,
+        )
+
+    def separators(self, indent: Any = None, separators: Optional[Tuple[str, str]] = None) -> Tuple[str, str]:
+        # The output is compact, unless it is indented
+        return (',', ': ') if indent else (',', ':')
+
+
+# Backends tried, in this order, by the "auto" backend
+AUTO_BACKENDS = ['orjson', 'ujson', 'json']
+
+_backend_factories: Dict[str, Callable[[], JSONBackend]] = {
+    'json': JSONBackend,
+    'orjson': OrjsonBackend,
+    'ujson': UjsonBackend,
+}
+
+_backends: Dict[str, JSONBackend] = {}
+
+_default_backend = 'json'
+
+
+def register_json_backend(name: str, factory: Callable[[], JSONBackend]) -> None:
+    """
+    Register a JSON backend.
+
+    Args:
+        name (str): The name of the backend.
+        factory (callable): A JSONBackend subclass, or any function returning a JSONBackend.
+                            It may raise ImportError when the backend is not installed.
+    """
+    _backend_factories[name] = factory
+    _backends.pop(name, None)
+
+
+def get_json_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Return a JSON backend by name.
+
+    Args:
+        name (str): The name of a registered backend, or "auto" to use the fastest one installed.
+                    Defaults to the backend set with `set_json_backend`.
+
+    Returns:
+        JSONBackend: The backend.
+
+    Raises:
+        ValueError: If no backend is registered with this name.
+        ImportError: If the backend is not installed.
+    """
+    name = name or _default_backend
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    if name == 'auto':
+        for candidate in AUTO_BACKENDS:
+            try:
+                backend = get_json_backend(candidate)
+                break
+            except ImportError:
+                continue
+    elif name in _backend_factories:
+        backend = _backend_factories[name]()
+    else:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    _backends[name] = backend
+    return backend
+
+
+def set_json_backend(name: str) -> None:
+    """
+    Set the JSON backend used by every builder that does not set its own.
+
+    Args:
+        name (str): The name of a registered backend, or "auto" to use the fastest one installed.
+    """
+    global _default_backend
+    get_json_backend(name)
+    _default_backend = name
@@ -0,0 +1,194 @@
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from .json import RawJSON, default_value, stored_items, stored_values
+
+
+class BinaryWriter(ABC):
+    """
+    Base class of the pure-Python writers of binary formats, like MessagePack and CBOR.
+
+    The data is walked once, with an explicit stack, and keys are formatted on the fly.
+    Subclasses encode scalars and the headers of containers.
+    """
+
+    def __init__(self, format_key: Optional[Callable[[str], str]] = None,
+                 default: Optional[Callable[[Any], Any]] = None) -> None:
+        """
+        Initialize a new BinaryWriter instance.
+
+        Args:
+            format_key (callable): Function applied to every string key, if any.
+            default (callable): Function called for objects that can't otherwise be serialized.
+        """
+        self.format_key = format_key
+        self.default = default
+
+    @abstractmethod
+    def _encode_none(self) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _encode_bool(self, value: bool) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _encode_int(self, value: int) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _encode_float(self, value: float) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _encode_str(self, value: str) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _encode_bytes(self, value: bytes) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _array_header(self, length: int) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _map_header(self, length: int) -> bytes:
+        raise NotImplementedError
+
+    def _plain(self, o: Any) -> Any:
+        """
+        Return the data to encode in place of an object that isn't natively supported.
+        """
+        return default_value(o, self.default, format_key=self.format_key)
+
+    def _default(self, o: Any) -> Any:
+        value = default_value(o, self.default, splice_raw=True)
+        if isinstance(value, RawJSON):
+            # The keys of serialized JSON are already formatted, and snapshots are formatted by `_formatted_data`
+            return _Encoded(type(self)(default=self.default).encode(value._formatted_data(self.format_key)))
+        return value
+
+    def _map_items(self, data: Dict[Any, Any]) -> Iterator[Any]:
+        format_key = self.format_key
+        for key, value in stored_items(data):
+            if format_key is not None and isinstance(key, str):
+                key = format_key(key)
+            yield key
+            yield value
+
+    def iterencode(self, o: Any, chunk_size: int = 1024) -> Iterator[bytes]:
+        """
+        Encode the given data as a sequence of byte chunks.
+
+        Args:
+            o (Any): The data to encode.
+            chunk_size (int): Number of encoded values in a chunk.
+
+        Yields:
+            bytes: Chunks of the encoded document.
+        """
+        out: List[bytes] = []
+        append = out.append
+        encode_str = self._encode_str
+        encode_int = self._encode_int
+        encode_float = self._encode_float
+        none, true, false = self._encode_none(), self._encode_bool(True), self._encode_bool(False)
+        markers: Dict[int, Any] = {}
+        # Each frame is (values iterator, container id)
+        stack: List[tuple] = [(iter((o,)), None)]
+        while stack:
+            values, container_id = stack[-1]
+            for value in values:
+                if len(out) >= chunk_size:
+                    yield b''.join(out)
+                    out.clear()
+                while True:
+                    if isinstance(value, str):
+                        append(encode_str(value))
+                    elif value is None:
+                        append(none)
+                    elif value is True:
+                        append(true)
+                    elif value is False:
+                        append(false)
+                    elif isinstance(value, int):
+                        append(encode_int(value))
+                    elif isinstance(value, float):
+                        append(encode_float(value))
+                    elif isinstance(value, (dict, list, tuple)):
+                        value_id = id(value)
+                        if value_id in markers:
+                            raise ValueError('Circular reference detected')
+                        if isinstance(value, dict):
+                            append(self._map_header(len(value)))
+                            children = self._map_items(value)
+                        else:
+                            append(self._array_header(len(value)))
+                            children = stored_values(value)
+                        markers[value_id] = value
+                        stack.append((children, value_id))
+                    elif isinstance(value, (bytes, bytearray, memoryview)):
+                        append(self._encode_bytes(bytes(value)))
+                    elif isinstance(value, _Encoded):
+                        append(value.data)
+                    else:
+                        # The result of `default` is encoded in place of the original object
+                        value = self._default(value)
+                        continue
+                    break
+                if stack[-1][0] is not values:
+                    # Walk the new container first
+                    break
+            else:
+                stack.pop()
+                if container_id is not None:
+                    del markers[container_id]
+        if out:
+            yield b''.join(out)
+
+    def encode(self, o: Any) -> bytes:
+        """
+        Encode the given data.
+
+        Args:
+            o (Any): The data to encode.
+
+        Returns:
+            bytes: The encoded document.
+        """
+        return b''.join(self.iterencode(o))
+
+    def dump(self, o: Any, fp: BinaryIO, buffer_size: int = 1 << 16) -> None:
+        """
+        Write the given data to a binary file-like object.
+
+        Chunks are buffered and written once they reach `buffer_size` bytes.
+
+        Args:
+            o (Any): The data to encode.
+            fp (BinaryIO): Any object with a `write` method accepting bytes.
+            buffer_size (int): Number of bytes to buffer between writes.
+        """
+        buffer: List[bytes] = []
+        buffered = 0
+        for chunk in self.iterencode(o):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                fp.write(b''.join(buffer))
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            fp.write(b''.join(buffer))
+
+
+class _Encoded:
+    """
+    A value already encoded in the format of the writer.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
@@ -0,0 +1,95 @@
+from struct import Struct
+from typing import Any, Callable, Optional
+
+from .binary import BinaryWriter
+
+
+_UINT16 = Struct('>BH')
+_UINT32 = Struct('>BI')
+_UINT64 = Struct('>BQ')
+_FLOAT64 = Struct('>Bd')
+
+_NAN = b'\xf9\x7e\x00'
+_INFINITY = b'\xf9\x7c\x00'
+_NEGATIVE_INFINITY = b'\xf9\xfc\x00'
+
+
+def _head(major: int, value: int) -> bytes:
+    major <<= 5
+    if value < 24:
+        return (major | value).to_bytes(1, 'big')
+    if value <= 0xff:
+        return bytes((major | 24, value))
+    if value <= 0xffff:
+        return _UINT16.pack(major | 25, value)
+    if value <= 0xffffffff:
+        return _UINT32.pack(major | 26, value)
+    return _UINT64.pack(major | 27, value)
+
+
+class CBORWriter(BinaryWriter):
+    """
+    Pure-Python CBOR (RFC 8949) encoder, producing the same output as `cbor2.dumps`.
+    """
+
+    def _encode_none(self) -> bytes:
+        return b'\xf6'
+
+    def _encode_bool(self, value: bool) -> bytes:
+        return b'\xf5' if value else b'\xf4'
+
+    def _encode_int(self, value: int) -> bytes:
+        if value >= 0:
+            if value <= 0xffffffffffffffff:
+                return _head(0, value)
+            # Positive bignum
+            return b'\xc2' + self._encode_bytes(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+        value = -1 - value
+        if value <= 0xffffffffffffffff:
+            return _head(1, value)
+        # Negative bignum
+        return b'\xc3' + self._encode_bytes(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+
+    def _encode_float(self, value: float) -> bytes:
+        if value != value:
+            return _NAN
+        if value == float('inf'):
+            return _INFINITY
+        if value == float('-inf'):
+            return _NEGATIVE_INFINITY
+        return _FLOAT64.pack(0xfb, value)
+
+    def _encode_str(self, value: str) -> bytes:
+        data = value.encode('utf-8')
+        return _head(3, len(data)) + data
+
+    def _encode_bytes(self, value: bytes) -> bytes:
+        return _head(2, len(value)) + value
+
+    def _array_header(self, length: int) -> bytes:
+        return _head(4, length)
+
+    def _map_header(self, length: int) -> bytes:
+        return _head(5, length)
+
+
+def dumps(data: Any, format_data: Callable[[Any], Any], format_key: Optional[Callable[[str], str]] = None,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode data with the cbor2 library when it is installed, and with CBORWriter otherwise.
+
+    Args:
+        data (Any): The data to encode.
+        format_data (callable): Function formatting the keys of the data, for the cbor2 library.
+        format_key (callable): Function applied to every string key by CBORWriter, if any.
+        default (callable): Function called for objects that can't otherwise be serialized.
+
+    Returns:
+        bytes: The CBOR document.
+    """
+    writer = CBORWriter(format_key, default)
+    try:
+        import cbor2
+    except ImportError:
+        return writer.encode(data)
+    return cbor2.dumps(format_data(data), default=lambda encoder, value: encoder.encode(writer._plain(value)))
@@ -0,0 +1,614 @@
+import json
+import os
+import re
+
+from functools import lru_cache
+from json.encoder import encode_basestring, encode_basestring_ascii
+from operator import itemgetter
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, TextIO,
+                    Tuple, Union)
+
+
+INFINITY = float('inf')
+
+# Returned by AsyncArray when its next item must be fetched first
+PENDING = object()
+
+_DONE = object()
+
+# Prefix of the strings standing for raw JSON in the output of JSON backends, which can't splice it
+RAW_PLACEHOLDER = f'@@spytula-raw-{os.urandom(8).hex()}-'
+
+_RAW_PLACEHOLDERS = re.compile(f'"{RAW_PLACEHOLDER}(\\d+)@@"')
+
+_ASYNC_ARRAY_ERROR = 'Lists added with stream_each can only be written by aiter_json or adump_json'
+
+
+class RawJSON:
+    """
+    A value holding already serialized JSON, spliced verbatim into the output.
+    """
+
+    __slots__ = ('text', 'reindent')
+
+    def __init__(self, text: Union[str, bytes], reindent: bool = False) -> None:
+        """
+        Initialize a new RawJSON instance.
+
+        Args:
+            text (str or bytes): The serialized JSON. Bytes must be UTF-8 encoded.
+            reindent (bool): Re-indent the JSON to match the indentation of the output,
+                             instead of splicing it verbatim.
+        """
+        self.text = text.decode('utf-8') if isinstance(text, (bytes, bytearray, memoryview)) else text
+        self.reindent = reindent
+
+    def loads(self) -> Any:
+        """
+        Parse the serialized JSON.
+
+        Returns:
+            Any: The parsed data.
+        """
+        return json.loads(self.text)
+
+    def _plain_data(self) -> Any:
+        """
+        Return the parsed JSON, for writers that can't splice it.
+        """
+        return self.loads()
+
+    def _formatted_data(self, format_key: Optional[Callable[[str], str]] = None) -> Any:
+        """
+        Return the parsed JSON with the keys written in an output using the given key format.
+
+        The keys of raw JSON are spliced verbatim, so they are never formatted.
+        """
+        return self._plain_data()
+
+    def _formatted_text(self, format_key: Optional[Callable[[str], str]] = None) -> str:
+        """
+        Return the JSON text spliced into an output using the given key format and the default options.
+        """
+        return self.text
+
+    def _encode(self, writer: 'JSONWriter', depth: int) -> str:
+        """
+        Return the JSON text to splice into the output of the given writer, at the given depth.
+        """
+        if not self.reindent:
+            return self.text
+        return writer._encode_nested(self.loads(), depth)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, RawJSON) and other.text == self.text
+
+    def __repr__(self) -> str:
+        return f'RawJSON({self.text!r})'
+
+
+class AsyncArray:
+    """
+    A JSON array whose items are produced by an async iterable while the output is written.
+
+    It can only be serialized once, by `JSONWriter.aiterencode`.
+    """
+
+    __slots__ = ('items', '_iterator', '_next')
+
+    def __init__(self, items: AsyncIterable[Any]) -> None:
+        """
+        Initialize a new AsyncArray instance.
+
+        Args:
+            items (AsyncIterable[Any]): The items of the array.
+        """
+        self.items = items
+        self._iterator: Optional[AsyncIterator[Any]] = None
+        self._next: Any = PENDING
+
+    def __next__(self) -> Any:
+        item = self._next
+        if item is _DONE:
+            raise StopIteration
+        self._next = PENDING
+        return item
+
+    async def fetch(self) -> None:
+        """
+        Wait for the next item of the array.
+        """
+        if self._iterator is None:
+            self._iterator = self.items.__aiter__()
+        try:
+            self._next = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._next = _DONE
+
+    def __repr__(self) -> str:
+        return f'AsyncArray({self.items!r})'
+
+
+class JSONWriter:
+    """
+    Incremental JSON encoder that walks the builder data once.
+
+    Keys are formatted on the fly, so no formatted copy of the data is ever created,
+    and the output is produced as a sequence of string chunks. The options mirror the
+    ones accepted by `json.dumps`.
+    """
+
+    def __init__(
+        self,
+        format_key: Optional[Callable[[str], str]] = None,
+        skipkeys: bool = False,
+        ensure_ascii: bool = True,
+        check_circular: bool = True,
+        allow_nan: bool = True,
+        sort_keys: bool = False,
+        indent: Any = None,
+        separators: Optional[Tuple[str, str]] = None,
+        default: Optional[Callable[[Any], Any]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize a new JSONWriter instance.
+
+        Args:
+            format_key (callable): Function applied to every string key, if any.
+            skipkeys (bool): Skip keys that are not str, int, float, bool or None.
+            ensure_ascii (bool): Escape all non-ASCII characters.
+            check_circular (bool): Detect circular references.
+            allow_nan (bool): Allow NaN and infinite floats.
+            sort_keys (bool): Sort the output of dictionaries by key.
+            indent (int or str): Indentation used to pretty-print the output.
+            separators (tuple): An (item_separator, key_separator) tuple.
+            default (callable): Function called for objects that can't otherwise be serialized.
+            max_bytes (int): The maximum size of the output, in UTF-8 encoded bytes. LimitExceeded is
+                             raised as soon as the output exceeds it, before the chunk exceeding it is
+                             yielded or written.
+        """
+        self.format_key = format_key
+        self.skipkeys = skipkeys
+        self.check_circular = check_circular
+        self.allow_nan = allow_nan
+        self.sort_keys = sort_keys
+        if indent is not None and not isinstance(indent, str):
+            indent = ' ' * indent
+        self.indent = indent
+        if separators is not None:
+            self.item_separator, self.key_separator = separators
+        elif indent is not None:
+            self.item_separator, self.key_separator = ',', ': '
+        else:
+            self.item_separator, self.key_separator = ', ', ': '
+        self.ensure_ascii = ensure_ascii
+        self.encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+        self.default = default
+        self.max_bytes = max_bytes
+
+    def _count_bytes(self, size: int, text: str) -> int:
+        """
+        Helper method to add the size of a chunk to the size of the output so far, raising
+        LimitExceeded when it exceeds `max_bytes`.
+        """
+        size += len(text) if text.isascii() else len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            from ..limits import LimitExceeded
+            raise LimitExceeded('max_bytes', self.max_bytes)
+        return size
+
+    def _counted(self, chunks: Iterator[str]) -> Iterator[str]:
+        """
+        Helper method to yield chunks while counting their bytes against `max_bytes`.
+        """
+        size = 0
+        for chunk in chunks:
+            size = self._count_bytes(size, chunk)
+            yield chunk
+
+    def _encode_nested(self, data: Any, depth: int) -> str:
+        """
+        Helper method to encode plain data with the options of the writer, indented to be
+        spliced into its output at the given depth.
+        """
+        text = json.dumps(data, indent=self.indent, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys,
+                          separators=(self.item_separator, self.key_separator))
+        if self.indent and depth:
+            # Strings can't hold literal newlines, so every newline is an indentation
+            text = text.replace('\n', '\n' + self.indent * depth)
+        return text
+
+    def _encode_float(self, o: float) -> str:
+        if o != o:
+            text = 'NaN'
+        elif o == INFINITY:
+            text = 'Infinity'
+        elif o == -INFINITY:
+            text = '-Infinity'
+        else:
+            return float.__repr__(o)
+        if not self.allow_nan:
+            raise ValueError(f'Out of range float values are not JSON compliant: {o!r}')
+        return text
+
+    def _encode_key(self, key: Any) -> Optional[str]:
+        if isinstance(key, str):
+            pass
+        elif isinstance(key, float):
+            key = self._encode_float(key)
+        elif key is True:
+            key = 'true'
+        elif key is False:
+            key = 'false'
+        elif key is None:
+            key = 'null'
+        elif isinstance(key, int):
+            key = int.__repr__(key)
+        elif self.skipkeys:
+            return None
+        else:
+            raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
+        return self.encode_string(key)
+
+    def _items(self, data: Dict[Any, Any]) -> Iterator[Tuple[str, Any]]:
+        format_key = self.format_key
+        items = stored_items(data)
+        if format_key is not None:
+            items = ((format_key(key) if isinstance(key, str) else key, value) for key, value in items)
+        if self.sort_keys:
+            # Keys formatted alike are equal, so only the keys are compared
+            items = sorted(items, key=itemgetter(0))
+        for key, value in items:
+            encoded_key = self._encode_key(key)
+            if encoded_key is not None:
+                yield encoded_key, value
+
+    def iterencode(self, o: Any) -> Iterator[str]:
+        """
+        Encode the given data as a sequence of JSON string chunks.
+
+        Containers are tracked on an explicit stack, so the Python stack depth does
+        not grow with the nesting of the data.
+
+        Args:
+            o (Any): The data to encode.
+
+        Yields:
+            str: Chunks of the JSON document.
+
+        Raises:
+            LimitExceeded: If the output exceeds `max_bytes`.
+        """
+        chunks = self._iterencode(o, False)
+        return chunks if self.max_bytes is None else self._counted(chunks)
+
+    def _iterencode(self, o: Any, asynchronous: bool) -> Iterator[Any]:
+        """
+        Helper method to encode data, yielding the AsyncArray instances waiting for their
+        next item, in asynchronous mode, between the string chunks.
+        """
+        indent = self.indent
+        item_separator = self.item_separator
+        key_separator = self.key_separator
+        encode_string = self.encode_string
+        markers: Optional[Dict[int, Any]] = {} if self.check_circular else None
+        # Each frame is [items iterator, is mapping, container id, first item]
+        stack: List[list] = []
+        depth = 0
+        value = o
+        has_value = True
+        while True:
+            if has_value:
+                has_value = False
+                if isinstance(value, str):
+                    yield encode_string(value)
+                elif value is None:
+                    yield 'null'
+                elif value is True:
+                    yield 'true'
+                elif value is False:
+                    yield 'false'
+                elif isinstance(value, int):
+                    yield int.__repr__(value)
+                elif isinstance(value, float):
+                    yield self._encode_float(value)
+                elif isinstance(value, (dict, list, tuple)):
+                    is_mapping = isinstance(value, dict)
+                    if not value:
+                        yield '{}' if is_mapping else '[]'
+                    else:
+                        container_id = id(value)
+                        if markers is not None:
+                            if container_id in markers:
+                                raise ValueError('Circular reference detected')
+                            markers[container_id] = value
+                        children = self._items(value) if is_mapping else stored_values(value)
+                        stack.append([children, is_mapping, container_id, True])
+                        depth += 1
+                        yield '{' if is_mapping else '['
+                elif isinstance(value, RawJSON):
+                    yield value._encode(self, depth)
+                elif isinstance(value, AsyncArray):
+                    if not asynchronous:
+                        raise TypeError(_ASYNC_ARRAY_ERROR)
+                    container_id = id(value)
+                    if markers is not None:
+                        markers[container_id] = value
+                    stack.append([value, False, container_id, True])
+                    depth += 1
+                    yield '['
+                else:
+                    marker_id = id(value)
+                    if markers is not None:
+                        if marker_id in markers:
+                            raise ValueError('Circular reference detected')
+                        markers[marker_id] = value
+                    # The result of `default` is encoded in place of the original object
+                    value = default_value(value, self.default, splice_raw=True)
+                    stack.append([None, None, marker_id, True])
+                    has_value = True
+                    continue
+            if not stack:
+                return
+            frame = stack[-1]
+            items, is_mapping, container_id, first = frame
+            if is_mapping is None:
+                # Leaving a value returned by `default`
+                stack.pop()
+                if markers is not None:
+                    del markers[container_id]
+                continue
+            try:
+                item = next(items)
+            except StopIteration:
+                stack.pop()
+                depth -= 1
+                if markers is not None:
+                    del markers[container_id]
+                if indent is not None and not first:
+                    yield '\n' + indent * depth
+                yield '}' if is_mapping else ']'
+                continue
+            if item is PENDING:
+                # Wait for the async array to fetch its next item, then try again
+                yield items
+                continue
+            chunk = ''
+            if first:
+                frame[3] = False
+            else:
+                chunk = item_separator
+            if indent is not None:
+                chunk += '\n' + indent * depth
+            if is_mapping:
+                encoded_key, value = item
+                chunk += encoded_key + key_separator
+            else:
+                value = item
+            yield chunk
+            has_value = True
+
+    def encode(self, o: Any) -> str:
+        """
+        Encode the given data as a JSON string.
+
+        Args:
+            o (Any): The data to encode.
+
+        Returns:
+            str: The JSON document.
+        """
+        return ''.join(self.iterencode(o))
+
+    async def aiterencode(self, o: Any, buffer_size: int = 1 << 16) -> AsyncIterator[str]:
+        """
+        Encode the given data as a sequence of JSON string chunks, waiting for the items of
+        AsyncArray values as they are produced.
+
+        Chunks are buffered up to `buffer_size` characters, and the buffer is always yielded
+        before waiting for an item, so the beginning of the document is sent right away.
+
+        Args:
+            o (Any): The data to encode.
+            buffer_size (int): Number of characters to buffer between two chunks.
+
+        Yields:
+            str: Chunks of the JSON document.
+
+        Raises:
+            LimitExceeded: If the output exceeds `max_bytes`.
+        """
+        max_bytes = self.max_bytes
+        size = 0
+        buffer: List[str] = []
+        buffered = 0
+        for chunk in self._iterencode(o, True):
+            if chunk.__class__ is AsyncArray:
+                if buffer:
+                    text = ''.join(buffer)
+                    if max_bytes is not None:
+                        size = self._count_bytes(size, text)
+                    yield text
+                    buffer.clear()
+                    buffered = 0
+                await chunk.fetch()
+                continue
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                text = ''.join(buffer)
+                if max_bytes is not None:
+                    size = self._count_bytes(size, text)
+                yield text
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            text = ''.join(buffer)
+            if max_bytes is not None:
+                self._count_bytes(size, text)
+            yield text
+
+    def dump(self, o: Any, fp: TextIO, buffer_size: int = 1 << 16) -> None:
+        """
+        Write the given data as JSON to a file-like object.
+
+        Chunks are buffered and written once they reach `buffer_size` characters.
+
+        Args:
+            o (Any): The data to encode.
+            fp (TextIO): Any object with a `write` method accepting strings.
+            buffer_size (int): Number of characters to buffer between writes.
+
+        Raises:
+            LimitExceeded: If the output exceeds `max_bytes`. The chunks written before fit in it.
+        """
+        max_bytes = self.max_bytes
+        size = 0
+        buffer: List[str] = []
+        buffered = 0
+        for chunk in self._iterencode(o, False):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                text = ''.join(buffer)
+                if max_bytes is not None:
+                    size = self._count_bytes(size, text)
+                fp.write(text)
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            text = ''.join(buffer)
+            if max_bytes is not None:
+                self._count_bytes(size, text)
+            fp.write(text)
+
+
+@lru_cache(maxsize=None)
+def _wrapper_classes() -> Tuple[type, Tuple[type, type]]:
+    from ..deferred import Lazy
+    from ..loading import YAMLEntry
+    from ..node import SpytulaNode
+    return SpytulaNode, (Lazy, YAMLEntry)
+
+
+def unwrap(value: Any) -> Any:
+    """
+    Return the value written in place of a node or a lazy value.
+
+    Nodes are replaced by their data, and lazy values and the entries of loaded YAML documents
+    by their values, until the value is none of them. Other values are returned as is.
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        Any: The value to write.
+    """
+    node_class, lazy_classes = _wrapper_classes()
+    while True:
+        if isinstance(value, node_class):
+            value = value.data
+        elif isinstance(value, lazy_classes):
+            value = value.value
+        else:
+            return value
+
+
+@lru_cache(maxsize=None)
+def _lazy_object_class() -> type:
+    from ..loading import LazyObject
+    return LazyObject
+
+
+def stored_items(data: Dict[Any, Any]) -> Iterable[Tuple[Any, Any]]:
+    """
+    Return the items of a dictionary as they are stored.
+
+    The objects of loaded documents parse their values when their items are read. Writers and
+    walks over the data read the stored values instead, so untouched values stay slices.
+
+    Args:
+        data (dict): The dictionary.
+
+    Returns:
+        Iterable[Tuple[Any, Any]]: The (key, value) pairs.
+    """
+    if isinstance(data, _lazy_object_class()):
+        return dict.items(data)
+    return data.items()
+
+
+def stored_values(data: Union[list, tuple]) -> Iterator[Any]:
+    """
+    Return an iterator over the items of a list or tuple as they are stored, like `stored_items`.
+    """
+    return list.__iter__(data) if isinstance(data, list) else iter(data)
+
+
+def default_value(o: Any, default: Optional[Callable[[Any], Any]] = None, splice_raw: bool = False,
+                  format_key: Optional[Callable[[str], str]] = None) -> Any:
+    """
+    Return the value to write in place of an object that a writer doesn't natively support.
+
+    Every writer calls it for such objects. Nodes and lazy values are unwrapped by `unwrap`.
+    Raw JSON, snapshots included, is returned as is to the writers splicing it, and parsed
+    for the others. Other objects are passed to `default`.
+
+    Args:
+        o (Any): The object.
+        default (callable): Function called for objects that can't otherwise be serialized, if any.
+        splice_raw (bool): Whether the writer splices raw JSON into its output.
+        format_key (callable): The key format of the writer, applied to the keys of parsed snapshots, if any.
+
+    Returns:
+        Any: The value to write in place of the object.
+
+    Raises:
+        TypeError: If the object can't be serialized, or is a list added with `stream_each`,
+                   which only the asynchronous writers can write.
+    """
+    value = unwrap(o)
+    if isinstance(value, RawJSON):
+        return value if splice_raw else value._formatted_data(format_key)
+    if isinstance(value, AsyncArray):
+        raise TypeError(_ASYNC_ARRAY_ERROR)
+    if value is not o:
+        return value
+    if default is None:
+        raise TypeError(f'Object of type {o.__class__.__name__} is not serializable')
+    return default(o)
+
+
+def raw_placeholder(index: int) -> str:
+    """
+    Return the string standing for the raw JSON value at the given index, to be replaced by `splice_raw_json`.
+    """
+    return f'{RAW_PLACEHOLDER}{index}@@'
+
+
+def splice_raw_json(json_output: str, raw_values: List[RawJSON], writer: 'JSONWriter') -> str:
+    """
+    Replace the placeholders of raw JSON written by a JSON backend with the raw JSON itself.
+
+    Placeholders are the strings returned by `raw_placeholder`. Raw JSON is written like
+    `JSONWriter` does, at the depth of the line holding its placeholder.
+
+    Args:
+        json_output (str): The JSON document written by the backend.
+        raw_values (List[RawJSON]): The raw JSON values, by placeholder index.
+        writer (JSONWriter): A writer with the options of the document.
+
+    Returns:
+        str: The JSON document holding the raw JSON.
+    """
+    indent = writer.indent
+
+    def replace(match: 're.Match') -> str:
+        depth = 0
+        if indent:
+            line_start = json_output.rfind('\n', 0, match.start()) + 1
+            line = json_output[line_start:match.start()]
+            depth = (len(line) - len(line.lstrip())) // len(indent)
+        return raw_values[int(match.group(1))]._encode(writer, depth)
+    return _RAW_PLACEHOLDERS.sub(replace, json_output)
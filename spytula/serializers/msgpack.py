@@ -0,0 +1,106 @@
+from struct import Struct
+from typing import Any, Callable, Optional
+
+from .binary import BinaryWriter
+
+
+_UINT16 = Struct('>BH')
+_UINT32 = Struct('>BI')
+_UINT64 = Struct('>BQ')
+_INT16 = Struct('>Bh')
+_INT32 = Struct('>Bi')
+_INT64 = Struct('>Bq')
+_FLOAT64 = Struct('>Bd')
+
+
+class MsgPackWriter(BinaryWriter):
+    """
+    Pure-Python MessagePack encoder, producing the same output as `msgpack.packb`.
+    """
+
+    def _encode_none(self) -> bytes:
+        return b'\xc0'
+
+    def _encode_bool(self, value: bool) -> bytes:
+        return b'\xc3' if value else b'\xc2'
+
+    def _encode_int(self, value: int) -> bytes:
+        if 0 <= value < 0x80 or -0x20 <= value < 0:
+            return (value & 0xff).to_bytes(1, 'big')
+        if value > 0:
+            if value <= 0xff:
+                return bytes((0xcc, value))
+            if value <= 0xffff:
+                return _UINT16.pack(0xcd, value)
+            if value <= 0xffffffff:
+                return _UINT32.pack(0xce, value)
+            if value <= 0xffffffffffffffff:
+                return _UINT64.pack(0xcf, value)
+        else:
+            if value >= -0x80:
+                return bytes((0xd0, value & 0xff))
+            if value >= -0x8000:
+                return _INT16.pack(0xd1, value)
+            if value >= -0x80000000:
+                return _INT32.pack(0xd2, value)
+            if value >= -0x8000000000000000:
+                return _INT64.pack(0xd3, value)
+        raise OverflowError('Integer value out of range')
+
+    def _encode_float(self, value: float) -> bytes:
+        return _FLOAT64.pack(0xcb, value)
+
+    def _encode_str(self, value: str) -> bytes:
+        data = value.encode('utf-8')
+        length = len(data)
+        if length < 0x20:
+            return (0xa0 | length).to_bytes(1, 'big') + data
+        if length <= 0xff:
+            return bytes((0xd9, length)) + data
+        if length <= 0xffff:
+            return _UINT16.pack(0xda, length) + data
+        return _UINT32.pack(0xdb, length) + data
+
+    def _encode_bytes(self, value: bytes) -> bytes:
+        length = len(value)
+        if length <= 0xff:
+            return bytes((0xc4, length)) + value
+        if length <= 0xffff:
+            return _UINT16.pack(0xc5, length) + value
+        return _UINT32.pack(0xc6, length) + value
+
+    def _array_header(self, length: int) -> bytes:
+        if length < 0x10:
+            return (0x90 | length).to_bytes(1, 'big')
+        if length <= 0xffff:
+            return _UINT16.pack(0xdc, length)
+        return _UINT32.pack(0xdd, length)
+
+    def _map_header(self, length: int) -> bytes:
+        if length < 0x10:
+            return (0x80 | length).to_bytes(1, 'big')
+        if length <= 0xffff:
+            return _UINT16.pack(0xde, length)
+        return _UINT32.pack(0xdf, length)
+
+
+def packb(data: Any, format_data: Callable[[Any], Any], format_key: Optional[Callable[[str], str]] = None,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode data with the msgpack library when it is installed, and with MsgPackWriter otherwise.
+
+    Args:
+        data (Any): The data to encode.
+        format_data (callable): Function formatting the keys of the data, for the msgpack library.
+        format_key (callable): Function applied to every string key by MsgPackWriter, if any.
+        default (callable): Function called for objects that can't otherwise be serialized.
+
+    Returns:
+        bytes: The MessagePack document.
+    """
+    writer = MsgPackWriter(format_key, default)
+    try:
+        import msgpack
+    except ImportError:
+        return writer.encode(data)
+    return msgpack.packb(format_data(data), default=writer._plain, use_bin_type=True)
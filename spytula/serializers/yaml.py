@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Type
+
+from ..deferred import Lazy
+from ..loading import LazyObject, YAMLEntry
+from ..node import SpytulaNode
+from ..tracking import TrackedDict, TrackedLazyObject, TrackedList
+from .json import RawJSON, default_value, stored_items, stored_values
+
+if TYPE_CHECKING:
+    import yaml
+
+
+def _represent_ordered_mapping(dumper: 'yaml.BaseDumper', data: dict) -> 'yaml.MappingNode':
+    return dumper.represent_mapping('tag:yaml.org,2002:map', stored_items(data))
+
+
+def _represent_list(dumper: 'yaml.BaseDumper', data: list) -> 'yaml.SequenceNode':
+    return dumper.represent_list(stored_values(data))
+
+
+def _represent_value(dumper: 'yaml.BaseDumper', value: Any) -> 'yaml.Node':
+    return dumper.represent_data(default_value(value, format_key=dumper.format_key))
+
+
+class KeyFormattedDocument:
+    """
+    The data of a YAML document whose snapshots are written with the key format of its builder.
+    """
+
+    __slots__ = ('data', 'format_key')
+
+    def __init__(self, data: Any, format_key: Optional[Callable[[str], str]]) -> None:
+        """
+        Initialize a new KeyFormattedDocument instance.
+
+        Args:
+            data (Any): The data of the document, with formatted keys.
+            format_key (callable): The key format of the builder, applied to the keys of its snapshots.
+        """
+        self.data = data
+        self.format_key = format_key
+
+
+def _represent_document(dumper: 'yaml.BaseDumper', document: KeyFormattedDocument) -> 'yaml.Node':
+    dumper.format_key = document.format_key
+    return dumper.represent_data(document.data)
+
+
+@lru_cache(maxsize=None)
+def get_dumper() -> Type['yaml.SafeDumper']:
+    """
+    Return the dumper class used to serialize builders, creating it once per process.
+
+    The dumper is based on libyaml's `CSafeDumper` when PyYAML was built with it, and falls
+    back to the pure-Python `SafeDumper` otherwise. Dictionaries keep their insertion order.
+    PyYAML is only imported on the first call.
+
+    Returns:
+        Type[yaml.SafeDumper]: The dumper class.
+    """
+    import yaml
+    base = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+    class SpytulaDumper(base):
+        # Key format of the document being written, applied to the keys of snapshots
+        format_key = None
+
+    SpytulaDumper.add_representer(dict, _represent_ordered_mapping)
+    SpytulaDumper.add_representer(OrderedDict, _represent_ordered_mapping)
+    SpytulaDumper.add_representer(TrackedDict, _represent_ordered_mapping)
+    SpytulaDumper.add_representer(LazyObject, _represent_ordered_mapping)
+    SpytulaDumper.add_representer(TrackedLazyObject, _represent_ordered_mapping)
+    SpytulaDumper.add_representer(TrackedList, _represent_list)
+    # Lists of nodes of builders with limits
+    SpytulaDumper.add_multi_representer(list, _represent_list)
+    SpytulaDumper.add_multi_representer(SpytulaNode, _represent_value)
+    SpytulaDumper.add_multi_representer(RawJSON, _represent_value)
+    SpytulaDumper.add_representer(Lazy, _represent_value)
+    SpytulaDumper.add_representer(YAMLEntry, _represent_value)
+    SpytulaDumper.add_representer(KeyFormattedDocument, _represent_document)
+    return SpytulaDumper
+
+
+def dump(data: Any, stream: Any = None, *args, format_key: Optional[Callable[[str], str]] = None, **kwargs) -> Any:
+    """
+    Serialize data as a YAML document.
+
+    Args:
+        data (Any): The data to serialize.
+        stream (Any): A stream to write to. When None, the document is returned as a string.
+        *args: Additional positional arguments to pass to yaml.dump.
+        format_key (callable): The key format of the builder, applied to the keys of its snapshots, if any.
+        **kwargs: Additional keyword arguments to pass to yaml.dump.
+
+    Returns:
+        str: The YAML document when no stream is given, otherwise None.
+    """
+    import yaml
+    if format_key is not None:
+        data = KeyFormattedDocument(data, format_key)
+    return yaml.dump(data, stream, get_dumper(), *args, **kwargs)
+
+
+def dump_all(documents: Any, stream: Any = None, *args, **kwargs) -> Any:
+    """
+    Serialize an iterable of data as a stream of YAML documents.
+
+    Documents are consumed one at a time, so a generator can be used to keep memory bounded.
+
+    Args:
+        documents (Iterable[Any]): The data of each document, or a KeyFormattedDocument holding it.
+        stream (Any): A stream to write to. When None, the documents are returned as a string.
+        *args: Additional positional arguments to pass to yaml.dump_all.
+        **kwargs: Additional keyword arguments to pass to yaml.dump_all.
+
+    Returns:
+        str: The YAML documents when no stream is given, otherwise None.
+    """
+    import yaml
+    return yaml.dump_all(documents, stream, get_dumper(), *args, **kwargs)
+
+
+def load(stream: Any) -> Any:
+    """
+    Parse a YAML document, with libyaml's `CSafeLoader` when PyYAML was built with it.
+
+    Args:
+        stream (Any): The document, as a string, bytes or a stream.
+
+    Returns:
+        Any: The parsed data.
+    """
+    import yaml
+    return yaml.load(stream, getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
@@ -0,0 +1,312 @@
+import keyword
+
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .mixins.format import KeyFormatMixin
+
+
+Source = Union[None, str, Callable[[Any], Any]]
+
+
+class Template(KeyFormatMixin):
+    """
+    A builder recipe, recorded once and rendered over many records.
+
+    The recipe is compiled into a specialized Python function for each kind of record
+    (mappings or objects), so rendering a record costs no method dispatch, no context
+    manager and no key formatting.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize a new Template instance.
+        """
+        super().__init__()
+        self._operations: List[Tuple[Any, ...]] = []
+        self._compiled: Optional['CompiledTemplate'] = None
+
+    def _record(self, *operation: Any) -> None:
+        self._operations.append(operation)
+        self._compiled = None
+
+    def key_format(self, **kwargs) -> None:
+        """
+        Configure the key formatting options. Keys are formatted once, when the template is compiled.
+
+        Args:
+            **kwargs: Key formatting options.
+
+        Raises:
+            ValueError: If an unsupported formatting option is provided.
+        """
+        super().key_format(**kwargs)
+        self._compiled = None
+
+    def attribute(self, key: str, source: Source = None) -> None:
+        """
+        Add an attribute to every rendered record.
+
+        Args:
+            key (str): The key for the attribute in the JSON.
+            source (str or callable): The key or attribute name to read from the record, or a function
+                                      that takes the record and returns the value. Defaults to `key`.
+
+        Example:
+            ```python
+            template.attribute('name')
+            template.attribute('type', lambda ingredient: ingredient['type'].upper())
+            ```
+        """
+        self._record('attribute', key, key if source is None else source)
+
+    def attributes(self, keys: List[str]) -> None:
+        """
+        Add several attributes, read from the keys or attributes of the same name on the record.
+
+        Args:
+            keys (List[str]): A list of the keys for the new attributes in the JSON.
+
+        Example:
+            ```python
+            template.attributes(['name', 'type'])
+            ```
+        """
+        for key in keys:
+            self.attribute(key)
+
+    def when(self, key: str, source: Source, condition: Union[bool, Callable[[Any], bool]]) -> None:
+        """
+        Add an attribute to the rendered records for which the condition is met.
+
+        Args:
+            key (str): The key for the attribute in the JSON.
+            source (str or callable): The key or attribute name to read from the record, or a function
+                                      that takes the record and returns the value.
+            condition (bool or callable): Condition to be met. Can be a boolean or a function that takes
+                                          the value and returns a boolean.
+
+        Example:
+            ```python
+            template.when('rating', 'rating', lambda rating: rating is not None)
+            ```
+        """
+        if isinstance(condition, bool):
+            if condition:
+                self.attribute(key, source)
+        elif callable(condition):
+            self._record('when', key, key if source is None else source, condition)
+        else:
+            raise TypeError("Condition must be a boolean or a callable.")
+
+    @contextmanager
+    def node(self, key: str) -> Iterator['Template']:
+        """
+        Add a nested node, rendered from the same record.
+
+        Args:
+            key (str): The key for the new node in the JSON.
+
+        Example:
+            ```python
+            with template.node('origin') as origin:
+                origin.attribute('country')
+            ```
+        """
+        template = Template()
+        yield template
+        self._record('node', key, template)
+
+    @contextmanager
+    def nodes(self, key: str, source: Source = None) -> Iterator['Template']:
+        """
+        Add a list of nested nodes, one for each item of a collection read from the record.
+
+        Args:
+            key (str): The key for the new list in the JSON.
+            source (str or callable): The key or attribute name holding the collection on the record, or a
+                                      function that takes the record and returns it. Defaults to `key`.
+
+        Example:
+            ```python
+            with template.nodes('ingredients') as ingredient:
+                ingredient.attribute('name')
+            ```
+        """
+        template = Template()
+        yield template
+        self._record('nodes', key, key if source is None else source, template)
+
+    def compile(self) -> 'CompiledTemplate':
+        """
+        Compile the template, using its key format.
+
+        Returns:
+            CompiledTemplate: The compiled template.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledTemplate(list(self._operations), self._format_key)
+        return self._compiled
+
+    def render(self, item: Any) -> Dict[str, Any]:
+        """
+        Render a single record.
+
+        Args:
+            item (Any): The record to render.
+
+        Returns:
+            Dict[str, Any]: The rendered data.
+        """
+        return self.compile().render(item)
+
+    def render_many(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Render many records.
+
+        Args:
+            items (Iterable[Any]): The records to render.
+
+        Returns:
+            List[Dict[str, Any]]: The rendered data of each record.
+
+        Example:
+            ```python
+            builder.attribute('ingredients', template.render_many(ingredients))
+            ```
+        """
+        return self.compile().render_many(items)
+
+
+class CompiledTemplate:
+    """
+    The compiled form of a Template.
+
+    A render function is generated the first time a record of a given type is rendered, reading
+    values by key from mappings and by attribute from any other object.
+    """
+
+    def __init__(self, operations: List[Tuple[Any, ...]], format_key: Callable[[str], str]) -> None:
+        """
+        Initialize a new CompiledTemplate instance.
+
+        Args:
+            operations (List[Tuple]): The operations recorded by the template.
+            format_key (callable): Function used to format the keys, once, at compile time.
+        """
+        self._operations = operations
+        self._format_key = format_key
+        self._renderers: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+        self._nested: Dict[int, 'CompiledTemplate'] = {}
+
+    def _nested_template(self, template: Template) -> 'CompiledTemplate':
+        nested = self._nested.get(id(template))
+        if nested is None:
+            nested = self._nested[id(template)] = CompiledTemplate(template._operations, self._format_key)
+        return nested
+
+    def _generate(self, is_mapping: bool) -> Callable[[Any], Dict[str, Any]]:
+        namespace: Dict[str, Any] = {}
+
+        def bind(value: Any) -> str:
+            name = f'_{len(namespace)}'
+            namespace[name] = value
+            return name
+
+        def read(source: Source) -> str:
+            if callable(source):
+                return f'{bind(source)}(item)'
+            if is_mapping:
+                return f'item[{source!r}]'
+            if source.isidentifier() and not keyword.iskeyword(source):
+                return f'item.{source}'
+            return f'getattr(item, {source!r})'
+
+        def literal(operations: List[Tuple[Any, ...]]) -> Optional[str]:
+            # Nodes without conditions are inlined as dict literals reading the same record
+            entries = []
+            for operation in operations:
+                kind, key = operation[0], repr(self._format_key(operation[1]))
+                if kind == 'attribute':
+                    entries.append(f'{key}: {read(operation[2])}')
+                elif kind == 'node':
+                    expression = literal(operation[2]._operations)
+                    if expression is None:
+                        return None
+                    entries.append(f'{key}: {expression}')
+                elif kind == 'nodes':
+                    nested = bind(self._nested_template(operation[3]).render_many)
+                    entries.append(f'{key}: {nested}({read(operation[2])})')
+                else:
+                    return None
+            return '{' + ', '.join(entries) + '}'
+
+        lines = ['def render(item):', '    data = {']
+        in_literal = True
+        for operation in self._operations:
+            kind, key = operation[0], repr(self._format_key(operation[1]))
+            if kind == 'when':
+                value = f'{bind(operation[3])}'
+                if in_literal:
+                    lines.append('    }')
+                    in_literal = False
+                lines.append(f'    value = {read(operation[2])}')
+                lines.append(f'    if {value}(value):')
+                lines.append(f'        data[{key}] = value')
+                continue
+            if kind == 'attribute':
+                expression = read(operation[2])
+            elif kind == 'node':
+                expression = literal(operation[2]._operations)
+                if expression is None:
+                    expression = f'{bind(self._nested_template(operation[2]).render)}(item)'
+            else:
+                expression = f'{bind(self._nested_template(operation[3]).render_many)}({read(operation[2])})'
+            if in_literal:
+                lines.append(f'        {key}: {expression},')
+            else:
+                lines.append(f'    data[{key}] = {expression}')
+        if in_literal:
+            lines.append('    }')
+        lines.append('    return data')
+        exec('\n'.join(lines), namespace)
+        return namespace['render']
+
+    def _renderer(self, item_type: type) -> Callable[[Any], Dict[str, Any]]:
+        renderer = self._renderers.get(item_type)
+        if renderer is None:
+            renderer = self._renderers[item_type] = self._generate(issubclass(item_type, Mapping))
+        return renderer
+
+    def render(self, item: Any) -> Dict[str, Any]:
+        """
+        Render a single record.
+
+        Args:
+            item (Any): The record to render.
+
+        Returns:
+            Dict[str, Any]: The rendered data.
+        """
+        return self._renderer(type(item))(item)
+
+    def render_many(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Render many records.
+
+        Args:
+            items (Iterable[Any]): The records to render.
+
+        Returns:
+            List[Dict[str, Any]]: The rendered data of each record.
+        """
+        renderers = self._renderers
+        rendered = []
+        append = rendered.append
+        for item in items:
+            renderer = renderers.get(type(item))
+            if renderer is None:
+                renderer = self._renderer(type(item))
+            append(renderer(item))
+        return rendered
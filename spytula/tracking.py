@@ -0,0 +1,163 @@
+from itertools import count
+from typing import Any, Dict
+
+from .loading import LazyObject
+from .node import SpytulaNode
+
+
+# Every change of a tracked container is stamped with the next number
+_versions = count(1)
+
+
+def current_version() -> int:
+    """
+    Return a version number greater than the version of every change made so far.
+    """
+    return next(_versions)
+
+
+class TrackedDict(dict):
+    """
+    A dictionary recording the version of its last change, used as the data of tracked nodes.
+    """
+
+    __slots__ = ('_version',)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._version = next(_versions)
+
+    def _changed(self) -> None:
+        self._version = next(_versions)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._version = next(_versions)
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._version = next(_versions)
+
+    def __ior__(self, other: Any) -> 'TrackedDict':
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._version = next(_versions)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._changed()
+        return super().setdefault(key, default)
+
+    def pop(self, *args) -> Any:
+        self._changed()
+        return super().pop(*args)
+
+    def popitem(self) -> Any:
+        self._changed()
+        return super().popitem()
+
+    def clear(self) -> None:
+        super().clear()
+        self._version = next(_versions)
+
+
+class TrackedLazyObject(LazyObject, TrackedDict):
+    """
+    A JSON object of a loaded document recording the version of its last change, used as the data
+    of tracked nodes editing a loaded document.
+
+    Reading a value parses it without changing the version, since the data stays the same.
+    """
+
+    __slots__ = ()
+
+
+class TrackedList(list):
+    """
+    A list recording the version of its last change, used for the lists of tracked nodes.
+    """
+
+    __slots__ = ('_version',)
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self._version = next(_versions)
+
+    def _changed(self) -> None:
+        self._version = next(_versions)
+
+    def append(self, value: Any) -> None:
+        super().append(value)
+        self._version = next(_versions)
+
+    def extend(self, values: Any) -> None:
+        super().extend(values)
+        self._version = next(_versions)
+
+    def insert(self, index: int, value: Any) -> None:
+        super().insert(index, value)
+        self._version = next(_versions)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._version = next(_versions)
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._version = next(_versions)
+
+    def __iadd__(self, values: Any) -> 'TrackedList':
+        self.extend(values)
+        return self
+
+    def pop(self, *args) -> Any:
+        self._changed()
+        return super().pop(*args)
+
+    def remove(self, value: Any) -> None:
+        super().remove(value)
+        self._version = next(_versions)
+
+    def clear(self) -> None:
+        super().clear()
+        self._version = next(_versions)
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._version = next(_versions)
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._version = next(_versions)
+
+
+class TrackingNode(SpytulaNode):
+    """
+    A node whose data and lists record their changes, created by builders tracking their changes.
+
+    Snapshots of a builder skip the subtrees that didn't change since they were taken, without
+    comparing them.
+    """
+
+    __slots__ = ()
+
+    _list_class = TrackedList
+
+    def __init__(self) -> None:
+        """
+        Initialize a new TrackingNode instance.
+        """
+        self._data: Dict[str, Any] = TrackedDict()
+
+
+TrackingNode._node_class = TrackingNode
+
+
+def is_tracked(value: Any) -> bool:
+    """
+    Return whether the given value is a tracked dictionary or list.
+    """
+    return isinstance(value, (TrackedDict, TrackedList))
+
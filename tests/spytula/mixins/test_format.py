@@ -50,3 +50,135 @@ def test_key_format_no_options(builder):
     data = json.loads(json_output)
     # Then
     assert 'pizza_name' in data
+
+def test_key_format_cache_hits(builder):
+    # Given
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    for _ in range(3):
+        with builder.node('pizza_topping') as topping:
+            topping.attribute('topping_name', 'Basil')
+        builder.to_json()
+    info = builder.key_format_cache_info()
+    # Then
+    assert info.hits >= 4
+    assert info.currsize >= 2
+
+def test_key_format_cache_shared_by_configuration():
+    # Given
+    first = SpytulaBuilder()
+    second = SpytulaBuilder()
+    # When
+    first.key_format(camelize={'uppercase_first_letter': False})
+    second.key_format(camelize={'uppercase_first_letter': False})
+    # Then
+    assert first._key_formatter is second._key_formatter
+
+def test_key_format_cache_invalidated_on_new_format(builder):
+    # Given
+    builder.attribute('pizza_name', 'Margherita')
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.to_json()
+    # When
+    builder.key_format(dasherize=True)
+    data = json.loads(builder.to_json())
+    # Then
+    assert 'pizza-name' in data
+
+def test_key_format_no_options_has_no_cache(builder):
+    # When
+    builder.key_format()
+    # Then
+    assert builder.key_format_cache_info() is None
+
+def test_format_data_without_key_format_is_not_copied(builder):
+    # Given
+    builder.attribute('pizza_name', 'Margherita')
+    # When
+    formatted_data = builder._format_data(builder.data)
+    # Then
+    assert formatted_data is builder.data
+
+def test_key_format_in_place(builder):
+    # Given
+    with builder.node('pizza_crust') as crust:
+        crust.attribute('crust_type', 'Thin')
+    crust_data = builder.data['pizza_crust']
+    builder.key_format(in_place=True, camelize={'uppercase_first_letter': False})
+    # When
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'pizzaCrust': {'crustType': 'Thin'}}
+    assert builder.data['pizzaCrust'] is crust_data
+    assert json.loads(builder.to_json()) == data
+
+def test_key_format_lists_of_nodes(builder):
+    # Given
+    with builder.node('pizza_menu') as menu:
+        for pizza_builder, pizza in menu.each('pizza_list', ['Margherita', 'Marinara']):
+            pizza_builder.attribute('pizza_name', pizza)
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'pizzaMenu': {'pizzaList': [{'pizzaName': 'Margherita'}, {'pizzaName': 'Marinara'}]}}
+
+def test_key_format_tuples_and_nested_builders(builder):
+    # Given
+    topping = SpytulaBuilder()
+    topping.attribute('topping_name', 'Basil')
+    builder.attribute('pizza_toppings', ({'topping_name': 'Mozzarella'}, topping))
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'pizzaToppings': [{'toppingName': 'Mozzarella'}, {'toppingName': 'Basil'}]}
+
+def test_key_format_deep_nesting(builder):
+    # Given
+    data = current = builder.data
+    for _ in range(5000):
+        current['child_node'] = current = [{}]
+        current = current[0]
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    formatted_data = builder._format_data(data)
+    # Then
+    for _ in range(5000):
+        formatted_data = formatted_data['childNode'][0]
+    assert formatted_data == {}
+
+def test_key_format_in_place_deep_nesting(builder):
+    # Given
+    data = current = builder.data
+    for _ in range(5000):
+        current['child_node'] = current = {}
+    builder.key_format(in_place=True, camelize={'uppercase_first_letter': False})
+    # When
+    builder._format_data(data)
+    # Then
+    for _ in range(5000):
+        data = data['childNode']
+    assert data == {}
+
+@pytest.mark.parametrize('in_place', [False, True])
+def test_key_format_circular_reference(builder, in_place):
+    # Given
+    crust = {'crust_type': 'Thin'}
+    crust['pizza_crust'] = [crust]
+    builder.attribute('pizza_crust', crust)
+    builder.key_format(in_place=in_place, camelize={'uppercase_first_letter': False})
+    # Then
+    with pytest.raises(ValueError, match='Circular reference detected'):
+        builder.to_json()
+
+@pytest.mark.parametrize('in_place', [False, True])
+def test_key_format_shared_references(builder, in_place):
+    # Given
+    crust = {'crust_type': 'Thin'}
+    builder.attribute('pizza_crusts', [crust, (crust, crust)])
+    builder.key_format(in_place=in_place, camelize={'uppercase_first_letter': False})
+    # When
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'pizzaCrusts': [{'crustType': 'Thin'}, [{'crustType': 'Thin'}] * 2]}
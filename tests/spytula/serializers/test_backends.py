@@ -0,0 +1,105 @@
+import pytest
+import json
+
+from spytula.builder import SpytulaBuilder
+from spytula.serializers import backends
+from spytula.serializers.backends import JSONBackend, get_json_backend, register_json_backend, set_json_backend
+
+@pytest.fixture
+def builder():
+    builder = SpytulaBuilder()
+    builder.attribute('dish_name', 'Rāmen')
+    builder.attribute('ingredients', [{'name': 'Noodles'}, {'name': 'Pork'}])
+    return builder
+
+@pytest.fixture
+def default_backend():
+    default_backend = backends._default_backend
+    yield
+    set_json_backend(default_backend)
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+def test_backend_options(builder, name):
+    # Given
+    pytest.importorskip(name)
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    json_output = builder.to_json(backend=name, indent=2, sort_keys=True)
+    # Then
+    assert json.loads(json_output) == {'dishName': 'Rāmen', 'ingredients': [{'name': 'Noodles'}, {'name': 'Pork'}]}
+    assert json_output.startswith('{\n  "dishName"')
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+def test_backend_bytes(builder, name):
+    # Given
+    pytest.importorskip(name)
+    # When
+    json_output = builder.to_json_bytes(backend=name)
+    # Then
+    assert isinstance(json_output, bytes)
+    assert json.loads(json_output) == json.loads(builder.to_json())
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+def test_backend_default(builder, name):
+    # Given
+    pytest.importorskip(name)
+    builder.attribute('tags', {'spicy'})
+    # When
+    json_output = builder.to_json(backend=name, default=list)
+    # Then
+    assert json.loads(json_output)['tags'] == ['spicy']
+
+def test_orjson_backend_unsupported_indent(builder):
+    # Given
+    pytest.importorskip('orjson')
+    # Then
+    with pytest.raises(ValueError):
+        builder.to_json(backend='orjson', indent=4)
+
+def test_auto_backend():
+    assert get_json_backend('auto').name in backends.AUTO_BACKENDS
+
+def test_unknown_backend(builder):
+    with pytest.raises(ValueError):
+        builder.json_backend('simdjson')
+
+def test_builder_backend(builder):
+    # Given
+    calls = []
+    class RecordingBackend(JSONBackend):
+        def dumps(self, data, *args, **kwargs):
+            calls.append(data)
+            return super().dumps(data, *args, **kwargs)
+    register_json_backend('recording', RecordingBackend)
+    # When
+    builder.json_backend('recording')
+    builder.to_json()
+    # Then
+    assert len(calls) == 1
+
+def test_set_json_backend(builder, default_backend):
+    # Given
+    calls = []
+    class RecordingBackend(JSONBackend):
+        def dumps(self, data, *args, **kwargs):
+            calls.append(data)
+            return super().dumps(data, *args, **kwargs)
+    register_json_backend('recording', RecordingBackend)
+    # When
+    set_json_backend('recording')
+    builder.to_json()
+    # Then
+    assert len(calls) == 1
+
+@pytest.mark.parametrize('name', ['json', 'orjson', 'ujson'])
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_backend_ensure_ascii(builder, name, ensure_ascii):
+    # Given
+    pytest.importorskip(name)
+    builder.attribute('garnish', 'Nori 🍙')
+    # When
+    json_output = builder.to_json(backend=name, ensure_ascii=ensure_ascii)
+    # Then
+    assert json.loads(json_output) == builder.data
+    assert json.dumps('Nori 🍙', ensure_ascii=ensure_ascii) in json_output
+    assert json_output.isascii() is ensure_ascii
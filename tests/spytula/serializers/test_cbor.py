@@ -0,0 +1,33 @@
+import pytest
+import io
+import math
+from spytula.builder import SpytulaBuilder
+from spytula.serializers.cbor import CBORWriter
+
+# Examples from the appendix A of RFC 8949
+@pytest.mark.parametrize('value, expected', [
+    (0, '00'), (23, '17'), (24, '1818'), (100, '1864'), (1000, '1903e8'), (1000000, '1a000f4240'),
+    (10 ** 12, '1b000000e8d4a51000'), (2 ** 64 - 1, '1bffffffffffffffff'), (2 ** 64, 'c249010000000000000000'),
+    (-2 ** 64, '3bffffffffffffffff'), (-2 ** 64 - 1, 'c349010000000000000000'), (-1, '20'), (-10, '29'),
+    (-100, '3863'), (-1000, '3903e7'), (1.1, 'fb3ff199999999999a'), (math.nan, 'f97e00'),
+    (math.inf, 'f97c00'), (-math.inf, 'f9fc00'), (False, 'f4'), (True, 'f5'), (None, 'f6'),
+    (b'', '40'), (b'\x01\x02\x03\x04', '4401020304'), ('', '60'), ('a', '6161'), ('IETF', '6449455446'),
+    ('ü', '62c3bc'), ([], '80'), ([1, 2, 3], '83010203'), ({}, 'a0'), ({'a': 1, 'b': [2, 3]}, 'a26161016162820203'),
+    (list(range(1, 26)), '98190102030405060708090a0b0c0d0e0f101112131415161718181819'),
+])
+def test_cbor_writer(value, expected):
+    assert CBORWriter().encode(value).hex() == expected
+
+def test_to_cbor_formats_keys():
+    # Given
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    with builder.node('dish_origin') as origin:
+        origin.attribute('country_name', 'Japan')
+    fp = io.BytesIO()
+    # When
+    output = builder.to_cbor()
+    builder.dump_cbor(fp)
+    # Then
+    assert output == CBORWriter().encode({'dishOrigin': {'countryName': 'Japan'}})
+    assert fp.getvalue() == output
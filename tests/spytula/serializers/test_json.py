@@ -0,0 +1,129 @@
+import pytest
+import json
+import asyncio
+
+from spytula.serializers.json import AsyncArray, JSONWriter, RawJSON
+
+@pytest.fixture
+def dish():
+    return {
+        'name': 'Ramen',
+        'origin': 'Japan',
+        'rating': 4.5,
+        'vegan': False,
+        'garnish': None,
+        'ingredients': [{'name': 'Noodles'}, {'name': 'Pork'}, ('Eggs', 2)],
+        'notes': {},
+        'steps': [],
+    }
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'indent': 2},
+    {'indent': '\t', 'sort_keys': True},
+    {'separators': (',', ':')},
+    {'ensure_ascii': False},
+])
+def test_json_writer_matches_json_dumps(dish, options):
+    # Given
+    dish['name'] = 'Rāmen'
+    # When
+    json_output = JSONWriter(**options).encode(dish)
+    # Then
+    assert json_output == json.dumps(dish, **options)
+
+def test_json_writer_formats_keys():
+    # When
+    json_output = JSONWriter(format_key=str.upper).encode({'name': 'Ramen', 'origin': {'country': 'Japan'}})
+    # Then
+    assert json.loads(json_output) == {'NAME': 'Ramen', 'ORIGIN': {'COUNTRY': 'Japan'}}
+
+def test_json_writer_sorts_keys_formatted_alike():
+    # When
+    json_output = JSONWriter(format_key=str.lower, sort_keys=True).encode({'Name': {'a': 1}, 'name': {'b': 2}})
+    # Then
+    assert json_output == '{"name": {"a": 1}, "name": {"b": 2}}'
+
+def test_json_writer_default():
+    # When
+    json_output = JSONWriter(default=sorted).encode({'tags': {'spicy', 'hot'}})
+    # Then
+    assert json_output == '{"tags": ["hot", "spicy"]}'
+
+def test_json_writer_unserializable():
+    with pytest.raises(TypeError):
+        JSONWriter().encode({'tags': {'spicy'}})
+
+def test_json_writer_circular_reference():
+    # Given
+    ingredients = []
+    ingredients.append(ingredients)
+    # Then
+    with pytest.raises(ValueError):
+        JSONWriter().encode(ingredients)
+
+def test_json_writer_deep_nesting():
+    # Given
+    data = current = {}
+    for _ in range(10000):
+        current['child'] = current = {}
+    # When
+    json_output = JSONWriter().encode(data)
+    # Then
+    assert json_output.count('{') == 10001
+
+def test_json_writer_dump_buffers_writes(dish):
+    # Given
+    chunks = []
+    class Writer:
+        def write(self, chunk):
+            chunks.append(chunk)
+    # When
+    JSONWriter().dump([dish] * 10, Writer(), buffer_size=100)
+    # Then
+    assert len(chunks) > 1
+    assert json.loads(''.join(chunks)) == json.loads(json.dumps([dish] * 10))
+
+def test_json_writer_raw_json():
+    # When
+    json_output = JSONWriter(indent=2).encode({'nutrition': RawJSON(b'{"calories":550}')})
+    # Then
+    assert json_output == '{\n  "nutrition": {"calories":550}\n}'
+
+def test_json_writer_raw_json_reindent():
+    # When
+    json_output = JSONWriter(indent=2).encode({'dish': {'nutrition': RawJSON('{"calories":550}', reindent=True)}})
+    # Then
+    assert json_output == json.dumps({'dish': {'nutrition': {'calories': 550}}}, indent=2)
+
+async def numbers(events, count):
+    for number in range(count):
+        events.append(f'fetch {number}')
+        yield number
+
+def test_async_array_items_are_written_as_they_come():
+    # Given
+    events = []
+    data = {'title': 'Menu', 'numbers': AsyncArray(numbers(events, 2)), 'done': True}
+    # When
+    async def write():
+        async for chunk in JSONWriter().aiterencode(data):
+            events.append(chunk)
+    asyncio.run(write())
+    # Then
+    assert events == ['{"title": "Menu", "numbers": [', 'fetch 0', '0', 'fetch 1', ', 1', '], "done": true}']
+
+@pytest.mark.parametrize('options', [{}, {'indent': 2}, {'indent': 2, 'sort_keys': True}])
+def test_async_array_matches_json_dumps(options):
+    # Given
+    data = {'empty': AsyncArray(numbers([], 0)), 'numbers': AsyncArray(numbers([], 3))}
+    expected = json.dumps({'empty': [], 'numbers': [0, 1, 2]}, **options)
+    # When
+    async def write():
+        return ''.join([chunk async for chunk in JSONWriter(**options).aiterencode(data)])
+    # Then
+    assert asyncio.run(write()) == expected
+
+def test_async_array_can_not_be_written_synchronously():
+    with pytest.raises(TypeError):
+        JSONWriter().encode([AsyncArray(numbers([], 1))])
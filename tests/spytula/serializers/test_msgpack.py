@@ -0,0 +1,82 @@
+import pytest
+import io
+import math
+import sys
+from spytula.builder import SpytulaBuilder
+from spytula.serializers.binary import BinaryWriter
+from spytula.serializers.msgpack import MsgPackWriter
+
+msgpack = pytest.importorskip('msgpack')
+
+@pytest.mark.parametrize('value', [
+    None, True, False, 0, 127, 128, 255, 256, 65535, 65536, 2 ** 32, 2 ** 64 - 1,
+    -1, -32, -33, -128, -129, -32768, -32769, -2 ** 31 - 1, -2 ** 63,
+    1.5, -0.0, math.inf, '', 'a' * 31, 'a' * 32, 'é' * 200, 'a' * 70000, b'', b'x' * 300,
+    [], list(range(15)), list(range(16)), list(range(70000)), {}, {str(i): i for i in range(16)},
+    (1, 2), {'a': {'b': [1, {'c': None}]}},
+])
+def test_msgpack_writer_matches_msgpack(value):
+    assert MsgPackWriter().encode(value) == msgpack.packb(value, use_bin_type=True)
+
+def test_binary_writer_is_abstract():
+    # Given
+    class NoneWriter(BinaryWriter):
+        def _encode_none(self):
+            return b'\xc0'
+    # Then
+    with pytest.raises(TypeError):
+        NoneWriter()
+
+def test_msgpack_writer_out_of_range():
+    with pytest.raises(OverflowError):
+        MsgPackWriter().encode(2 ** 64)
+
+def test_msgpack_writer_circular_reference():
+    # Given
+    data = []
+    data.append(data)
+    # Then
+    with pytest.raises(ValueError):
+        MsgPackWriter().encode(data)
+
+def test_msgpack_writer_deep_nesting():
+    # Given
+    data = []
+    for _ in range(5000):
+        data = [data]
+    # Then
+    assert MsgPackWriter().encode(data) == b'\x91' * 5000 + b'\x90'
+
+def test_to_msgpack_formats_keys():
+    # Given
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    for dish_builder, name in builder.each('all_dishes', ['Shoyu']):
+        dish_builder.attribute('dish_name', name)
+        dish_builder.raw('nutrition_facts', '{"total_calories": 550}')
+    expected = {'allDishes': [{'dishName': 'Shoyu', 'nutritionFacts': {'total_calories': 550}}]}
+    fp = io.BytesIO()
+    # When
+    output = builder.to_msgpack()
+    builder.dump_msgpack(fp, buffer_size=1)
+    # Then
+    assert msgpack.unpackb(output) == expected
+    assert fp.getvalue() == output
+
+def test_to_msgpack_without_msgpack(monkeypatch):
+    # Given
+    builder = SpytulaBuilder()
+    builder.attribute('name', 'Shoyu')
+    expected = builder.to_msgpack()
+    monkeypatch.setitem(sys.modules, 'msgpack', None)
+    # Then
+    assert builder.to_msgpack() == expected
+
+def test_to_msgpack_with_default():
+    # Given
+    builder = SpytulaBuilder()
+    builder.attribute('tags', {'ramen'})
+    # Then
+    with pytest.raises(TypeError):
+        builder.to_msgpack()
+    assert msgpack.unpackb(builder.to_msgpack(default=sorted)) == {'tags': ['ramen']}
@@ -0,0 +1,29 @@
+import yaml
+
+from collections import OrderedDict
+
+from spytula.serializers import yaml as yaml_serializer
+
+def test_get_dumper_is_cached():
+    assert yaml_serializer.get_dumper() is yaml_serializer.get_dumper()
+
+def test_get_dumper_uses_libyaml_when_available():
+    # Given
+    dumper = yaml_serializer.get_dumper()
+    # Then
+    if hasattr(yaml, 'CSafeDumper'):
+        assert issubclass(dumper, yaml.CSafeDumper)
+    else:
+        assert issubclass(dumper, yaml.SafeDumper)
+
+def test_dump_keeps_insertion_order():
+    # When
+    yaml_output = yaml_serializer.dump({'name': 'Ramen', 'origin': OrderedDict(country='Japan', city='Tokyo')})
+    # Then
+    assert yaml_output == "name: Ramen\norigin:\n  country: Japan\n  city: Tokyo\n"
+
+def test_dump_all():
+    # When
+    yaml_output = yaml_serializer.dump_all(({'name': name} for name in ['Ramen', 'Udon']))
+    # Then
+    assert list(yaml.safe_load_all(yaml_output)) == [{'name': 'Ramen'}, {'name': 'Udon'}]
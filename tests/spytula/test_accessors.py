@@ -0,0 +1,86 @@
+import pytest
+from collections import namedtuple
+from dataclasses import dataclass
+from spytula.accessors import get_accessor, read_values
+from spytula.builder import SpytulaBuilder
+
+Dish = namedtuple('Dish', ['name', 'origin', 'rating'])
+
+@dataclass
+class DishRecord:
+    name: str
+    origin: str
+    rating: float
+
+class SlottedDish:
+    __slots__ = ('name', 'origin', 'rating')
+    def __init__(self, name, origin, rating):
+        self.name, self.origin, self.rating = name, origin, rating
+
+class Row:
+    """A record exposing some values as attributes and the others by key."""
+    name = 'Ramen'
+    def __getitem__(self, key):
+        return {'origin': 'Japan', 'rating': 4.5}[key]
+
+@pytest.fixture()
+def builder():
+    return SpytulaBuilder()
+
+@pytest.mark.parametrize('record', [
+    {'name': 'Ramen', 'origin': 'Japan', 'rating': 4.5},
+    Dish('Ramen', 'Japan', 4.5),
+    DishRecord('Ramen', 'Japan', 4.5),
+    SlottedDish('Ramen', 'Japan', 4.5),
+    Row(),
+])
+def test_read_values(record):
+    assert read_values(record, ('name', 'origin', 'rating')) == ('Ramen', 'Japan', 4.5)
+    assert read_values(record, ('origin',)) == ('Japan',)
+    assert read_values(record, ()) == ()
+
+def test_accessors_are_cached():
+    assert get_accessor(dict, ('name',)) is get_accessor(dict, ('name',))
+    assert get_accessor(dict, ('name',)) is not get_accessor(Dish, ('name',))
+
+def test_read_values_from_mapping_with_method_names():
+    assert read_values({'items': 3}, ('items',)) == (3,)
+
+def test_read_values_missing_key():
+    with pytest.raises(KeyError):
+        read_values({'name': 'Ramen'}, ('origin',))
+
+def test_attributes_with_rename_and_transform(builder):
+    # When
+    builder.attributes(Dish('Ramen', 'Japan', 4.5), ['name', 'origin'], rename={'origin': 'country'},
+                       transform={'name': str.upper})
+    # Then
+    assert builder.data == {'name': 'RAMEN', 'country': 'Japan'}
+
+def test_attributes_many(builder):
+    # Given
+    dishes = [Dish('Ramen', 'Japan', 4.5), {'name': 'Pho', 'origin': 'Vietnam', 'rating': 4.8}, Row()]
+    # When
+    builder.attributes_many('dishes', iter(dishes), ['name', 'rating'], rename={'rating': 'stars'},
+                            transform={'rating': round})
+    # Then
+    assert builder.data == {'dishes': [
+        {'name': 'Ramen', 'stars': 4},
+        {'name': 'Pho', 'stars': 5},
+        {'name': 'Ramen', 'stars': 4},
+    ]}
+
+def test_attributes_many_with_key_format(builder):
+    # Given
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    builder.attributes_many('all_dishes', [DishRecord('Ramen', 'Japan', 4.5)], ['name'], rename={'name': 'dish_name'})
+    # Then
+    assert builder.to_json() == '{"allDishes": [{"dishName": "Ramen"}]}'
+
+@pytest.mark.parametrize('record', [Row(), DishRecord('Ramen', 'Japan', 4.5), {'name': 'Ramen', 'origin': 'Japan'}])
+def test_attributes_reads_any_record(builder, record):
+    # When
+    builder.attributes(record, ['name', 'origin'])
+    # Then
+    assert builder.data == {'name': 'Ramen', 'origin': 'Japan'}
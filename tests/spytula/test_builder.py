@@ -1,4 +1,6 @@
 import pytest
+import io
+import asyncio
 import json
 import yaml
 from spytula.builder import SpytulaBuilder
@@ -82,6 +84,24 @@ def test_spytula_builder_each(builder):
         assert ingredient['name'] == ingredients[idx]['name']
         assert ingredient['type'] == ingredients[idx]['type']
 
+def test_spytula_builder_each_with_generator(builder):
+    # Given
+    consumed = []
+    def ingredients():
+        for name in ['Noodles', 'Pork']:
+            consumed.append(name)
+            yield {'name': name}
+    # When
+    iterator = builder.each('ingredients', ingredients())
+    ingredient_builder, ingredient = next(iterator)
+    ingredient_builder.attribute('name', ingredient['name'])
+    # Then
+    assert consumed == ['Noodles']
+    assert json.loads(builder.to_json()) == {'ingredients': [{'name': 'Noodles'}]}
+    for ingredient_builder, ingredient in iterator:
+        ingredient_builder.attribute('name', ingredient['name'])
+    assert len(json.loads(builder.to_json())['ingredients']) == 2
+
 def test_spytula_builder_multiple_attributes(builder, dish):
     # When
     builder.attributes(dish, ['name', 'origin'])
@@ -151,6 +171,79 @@ def test_spytula_builder_partial(builder):
     # Then
     assert data['origin'] == 'Japan'
 
+def test_spytula_builder_raw(builder):
+    # Given
+    builder.attribute('name', 'Ramen')
+    builder.raw('nutrition', b'{"calories": 550}')
+    # When
+    json_output = builder.to_json()
+    # Then
+    assert json_output == '{"name": "Ramen", "nutrition": {"calories": 550}}'
+    assert builder.to_json_bytes() == json_output.encode('utf-8')
+    assert ''.join(builder.iter_json()) == json_output
+
+@pytest.mark.parametrize('backend', ['orjson', 'ujson'])
+def test_spytula_builder_raw_with_backend(builder, backend):
+    # Given
+    pytest.importorskip(backend)
+    builder.raw('nutrition', '{"calories": 550}')
+    # When
+    json_output = builder.to_json(backend=backend)
+    # Then
+    assert json.loads(json_output) == {'nutrition': {'calories': 550}}
+
+@pytest.mark.parametrize('backend', ['json', 'orjson', 'ujson'])
+def test_spytula_builder_raw_reindent_with_backend(builder, backend):
+    # Given
+    pytest.importorskip(backend)
+    with builder.node('dish') as dish_builder:
+        dish_builder.attribute('name', 'Ramen')
+        dish_builder.raw('nutrition', '{"calories": 550, "tags": ["hot"]}', reindent=True)
+    builder.raw('rating', '4.5')
+    # When
+    json_output = builder.to_json(indent=2, backend=backend)
+    # Then
+    assert json_output == json.dumps(
+        {'dish': {'name': 'Ramen', 'nutrition': {'calories': 550, 'tags': ['hot']}}, 'rating': 4.5}, indent=2)
+    assert builder.to_json_bytes(indent=2, backend=backend) == json_output.encode('utf-8')
+
+def test_spytula_builder_raw_passes_arguments_to_backend(builder, monkeypatch):
+    # Given
+    from spytula.serializers import backends
+    calls = []
+    class RecordingBackend(backends.JSONBackend):
+        def dumps(self, data, *args, **kwargs):
+            calls.append(args)
+            return json.dumps(data, **kwargs)
+    monkeypatch.setitem(backends._backend_factories, 'arguments', RecordingBackend)
+    monkeypatch.setattr(backends, '_backends', dict(backends._backends))
+    builder.raw('nutrition', '{"calories": 550}')
+    # When
+    json_output = builder.to_json('compact', backend='arguments')
+    # Then
+    assert calls == [('compact',)]
+    assert json_output == '{"nutrition": {"calories": 550}}'
+
+def test_spytula_builder_raw_to_yaml(builder):
+    # Given
+    builder.raw('nutrition', '{"calories": 550}')
+    # When
+    yaml_output = builder.to_yaml()
+    # Then
+    assert yaml.safe_load(yaml_output) == {'nutrition': {'calories': 550}}
+
+def test_spytula_builder_partial_serialized(builder):
+    # Given
+    partial_builder = SpytulaBuilder()
+    with partial_builder.node('dish_origin') as origin:
+        origin.attribute('country_name', 'Japan')
+    partial_builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    builder.partial(partial_builder, serialized=True, reindent=True)
+    json_output = builder.to_json(indent=2)
+    # Then
+    assert json_output == json.dumps({'dishOrigin': {'countryName': 'Japan'}}, indent=2)
+
 def test_to_json(builder):
     # Given
     builder.attribute("name", "John Doe")
@@ -164,6 +257,72 @@ def test_to_json(builder):
     # Then
     assert json.loads(json_string) == expected_json
 
+def test_iter_json(builder):
+    # Given
+    builder.attribute("name", "John Doe")
+    with builder.node("address") as address:
+        address.attribute("city", "Paris")
+    # When
+    chunks = list(builder.iter_json(indent=2))
+    # Then
+    assert len(chunks) > 1
+    assert ''.join(chunks) == builder.to_json(indent=2)
+
+def test_dump_json_with_key_format(builder):
+    # Given
+    builder.attribute("first_name", "John")
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    fp = io.StringIO()
+    # When
+    builder.dump_json(fp, sort_keys=True)
+    # Then
+    assert fp.getvalue() == builder.to_json(sort_keys=True)
+    assert json.loads(fp.getvalue()) == {"firstName": "John"}
+
+def render_dish(dish_builder, dish):
+    dish_builder.attribute('dish_name', dish['name'])
+    dish_builder.when('spicy', True, dish.get('spicy', False))
+
+def test_to_ndjson(builder):
+    # Given
+    dishes = [{'name': 'Ramen'}, {'name': 'Tantanmen', 'spicy': True}]
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    ndjson_output = builder.to_ndjson(dishes, render_dish)
+    # Then
+    assert ndjson_output == '{"dishName": "Ramen"}\n{"dishName": "Tantanmen", "spicy": true}\n'
+
+def test_to_ndjson_with_indent(builder):
+    with pytest.raises(ValueError):
+        builder.to_ndjson([{'name': 'Ramen'}], render_dish, indent=2)
+
+def test_dump_ndjson_in_batches(builder):
+    # Given
+    dishes = ({'name': f'Ramen {index}'} for index in range(5))
+    writes = []
+    class Writer:
+        mode = 'wb'
+        def write(self, chunk):
+            writes.append(chunk)
+        def flush(self):
+            writes.append(None)
+    # When
+    count = builder.dump_ndjson(Writer(), dishes, render_dish, batch_size=2, flush=True)
+    # Then
+    assert count == 5
+    assert writes[1::2] == [None, None, None]
+    lines = b''.join(writes[::2]).splitlines()
+    assert [json.loads(line) for line in lines] == [{'dish_name': f'Ramen {index}'} for index in range(5)]
+
+def test_dump_ndjson_text_file(builder):
+    # Given
+    fp = io.StringIO()
+    builder.root('dish')
+    # When
+    builder.dump_ndjson(fp, [{'name': 'Ramen'}], lambda dish_builder, dish: dish_builder.attribute('dish', dish))
+    # Then
+    assert fp.getvalue() == '{"name": "Ramen"}\n'
+
 def test_to_yaml(builder):
     # Given
     builder.attribute("name", "John Doe")
@@ -174,6 +333,30 @@ def test_to_yaml(builder):
     # Then
     assert yaml.safe_load(yaml_string) == yaml.safe_load(expected_yaml)
 
+def test_dump_yaml(builder):
+    # Given
+    builder.attribute("name", "John Doe")
+    builder.attribute("age", 30)
+    stream = io.StringIO()
+    # When
+    builder.dump_yaml(stream)
+    # Then
+    assert stream.getvalue() == builder.to_yaml()
+    assert stream.getvalue() == "name: John Doe\nage: 30\n"
+
+def test_dump_yaml_all():
+    # Given
+    builders = []
+    for name in ["John Doe", "Jane Doe"]:
+        builder = SpytulaBuilder()
+        builder.attribute("name", name)
+        builders.append(builder)
+    stream = io.StringIO()
+    # When
+    SpytulaBuilder.dump_yaml_all(builders, stream)
+    # Then
+    assert list(yaml.safe_load_all(stream.getvalue())) == [{"name": "John Doe"}, {"name": "Jane Doe"}]
+
 def test_with_root_option(builder, dish):
     # Given
     builder.root("ingredients")
@@ -184,4 +367,49 @@ def test_with_root_option(builder, dish):
     # Then
     assert 'Noodles' in data
     assert 'Pork' in data
-    assert len(data) == 4
\ No newline at end of file
+    assert len(data) == 4
+
+async def dish_cursor(names):
+    for name in names:
+        yield {'name': name}
+
+async def render_async_dish(dish_builder, dish):
+    dish_builder.attribute('dish_name', dish['name'])
+
+def test_stream_each_with_aiter_json(builder):
+    # Given
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.attribute('menu_title', 'Ramen')
+    builder.stream_each('all_dishes', dish_cursor(['Shoyu', 'Miso']), render_async_dish)
+    # When
+    async def write():
+        return [chunk async for chunk in builder.aiter_json()]
+    chunks = asyncio.run(write())
+    # Then
+    assert chunks[0] == '{"menuTitle": "Ramen", "allDishes": ['
+    assert json.loads(''.join(chunks)) == {'menuTitle': 'Ramen', 'allDishes': [{'dishName': 'Shoyu'}, {'dishName': 'Miso'}]}
+
+def test_adump_json_to_stream_writer(builder):
+    # Given
+    class StreamWriter:
+        def __init__(self):
+            self.chunks = []
+            self.drained = 0
+        def write(self, chunk):
+            self.chunks.append(chunk)
+        async def drain(self):
+            self.drained += 1
+    writer = StreamWriter()
+    builder.stream_each('dishes', ['Shoyu'], lambda dish_builder, name: dish_builder.attribute('name', name))
+    # When
+    asyncio.run(builder.adump_json(writer, indent=2))
+    # Then
+    assert writer.drained == len(writer.chunks) == 3
+    assert json.loads(b''.join(writer.chunks)) == {'dishes': [{'name': 'Shoyu'}]}
+
+def test_stream_each_with_to_json(builder):
+    # Given
+    builder.stream_each('dishes', [], render_async_dish)
+    # Then
+    with pytest.raises(TypeError):
+        builder.to_json()
@@ -0,0 +1,128 @@
+import pytest
+import json
+
+from datetime import timedelta
+
+from spytula.builder import SpytulaBuilder
+from spytula.cache import MISSING, CacheStore, FileStore, MemoryStore, get_default_store, set_default_store
+
+@pytest.fixture
+def store():
+    return MemoryStore()
+
+@pytest.fixture
+def dishes():
+    return [
+        {'id': 1, 'name': 'Ramen', 'version': 1},
+        {'id': 2, 'name': 'Udon', 'version': 1},
+    ]
+
+def render_dish(builder, dish, store, renders):
+    with builder.cache(('dish', dish['id']), version=dish['version'], store=store) as fragment:
+        if fragment.miss:
+            renders.append(dish['id'])
+            with fragment.node('dish') as dish_builder:
+                dish_builder.attribute('name', dish['name'])
+
+def test_memory_store(store):
+    # When
+    store.set('ramen', {'name': 'Ramen'})
+    # Then
+    assert store.read('ramen') == {'name': 'Ramen'}
+    assert store.read('udon') is MISSING
+    assert (store.hits, store.misses) == (1, 1)
+
+def test_cache_store_is_abstract():
+    # Given
+    class ReadOnlyStore(CacheStore):
+        def get(self, key):
+            return MISSING
+    # Then
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
+
+def test_memory_store_evicts_least_recently_used():
+    # Given
+    store = MemoryStore(maxsize=2)
+    store.set('ramen', 1)
+    store.set('udon', 2)
+    store.get('ramen')
+    # When
+    store.set('soba', 3)
+    # Then
+    assert store.get('udon') is MISSING
+    assert store.get('ramen') == 1
+    assert len(store) == 2
+
+def test_memory_store_expires(store):
+    # When
+    store.set('ramen', 1, expires_in=timedelta(seconds=-1))
+    # Then
+    assert store.get('ramen') is MISSING
+
+def test_file_store(tmp_path):
+    # Given
+    store = FileStore(str(tmp_path))
+    # When
+    store.set(('dish', 1), {'name': 'Ramen'})
+    store.set(('dish', 2), {'name': 'Udon'}, expires_in=-1)
+    # Then
+    assert store.read_many([('dish', 1), ('dish', 2), ('dish', 3)]) == {('dish', 1): {'name': 'Ramen'}}
+    assert (store.hits, store.misses) == (1, 2)
+    store.delete(('dish', 1))
+    assert store.get(('dish', 1)) is MISSING
+
+def test_builder_cache(store, dishes):
+    # Given
+    renders = []
+    # When
+    for _ in range(2):
+        builder = SpytulaBuilder()
+        render_dish(builder, dishes[0], store, renders)
+    # Then
+    assert renders == [1]
+    assert json.loads(builder.to_json()) == {'dish': {'name': 'Ramen'}}
+    assert (store.hits, store.misses) == (1, 1)
+
+def test_builder_cache_version(store, dishes):
+    # Given
+    renders = []
+    render_dish(SpytulaBuilder(), dishes[0], store, renders)
+    # When
+    dishes[0]['version'] = 2
+    render_dish(SpytulaBuilder(), dishes[0], store, renders)
+    # Then
+    assert renders == [1, 1]
+
+def test_builder_cache_default_store(dishes):
+    # Given
+    default_store = get_default_store()
+    set_default_store(MemoryStore())
+    builder = SpytulaBuilder()
+    try:
+        # When
+        with builder.cache('ramen') as fragment:
+            fragment.attribute('name', 'Ramen')
+        # Then
+        assert get_default_store().get(('ramen', None)) == {'name': 'Ramen'}
+    finally:
+        set_default_store(default_store)
+
+def test_builder_cache_each(store, dishes):
+    # Given
+    renders = []
+    def render(builder):
+        items = builder.cache_each('dishes', dishes, lambda dish: ('dish', dish['id']),
+                                   version=lambda dish: dish['version'], store=store)
+        for dish_builder, dish in items:
+            renders.append(dish['id'])
+            dish_builder.attribute('name', dish['name'])
+    render(SpytulaBuilder())
+    dishes[1]['version'] = 2
+    # When
+    builder = SpytulaBuilder()
+    render(builder)
+    # Then
+    assert renders == [1, 2, 2]
+    assert json.loads(builder.to_json()) == {'dishes': [{'name': 'Ramen'}, {'name': 'Udon'}]}
+    assert (store.hits, store.misses) == (1, 3)
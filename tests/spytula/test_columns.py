@@ -0,0 +1,72 @@
+import pytest
+import json
+
+from spytula.builder import SpytulaBuilder
+from spytula.columns import column_values, columns_to_rows
+
+@pytest.fixture
+def builder():
+    return SpytulaBuilder()
+
+def test_columns_to_rows():
+    # When
+    rows = columns_to_rows({'name': ['Noodles', 'Pork'], 'price': (1.5, 4.0)})
+    # Then
+    assert rows == [{'name': 'Noodles', 'price': 1.5}, {'name': 'Pork', 'price': 4.0}]
+
+def test_columns_to_rows_with_different_lengths():
+    with pytest.raises(ValueError):
+        columns_to_rows({'name': ['Noodles', 'Pork'], 'price': [1.5]})
+
+def test_columns_to_rows_empty():
+    assert columns_to_rows({'name': [], 'price': []}) == []
+
+def test_builder_columns(builder):
+    # When
+    builder.columns('ingredients', {'name': ['Noodles', 'Pork'], 'type': ['Main', 'Protein']})
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'ingredients': [{'name': 'Noodles', 'type': 'Main'}, {'name': 'Pork', 'type': 'Protein'}]}
+
+def test_columns_with_numpy_arrays(builder):
+    # Given
+    numpy = pytest.importorskip('numpy')
+    # When
+    builder.columns('ingredients', {'name': numpy.array(['Noodles', 'Pork']), 'price': numpy.array([1.5, 4.0])})
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'ingredients': [{'name': 'Noodles', 'price': 1.5}, {'name': 'Pork', 'price': 4.0}]}
+
+def test_columns_with_numpy_scalars():
+    # Given
+    numpy = pytest.importorskip('numpy')
+    # When
+    values = column_values([numpy.int64(1), numpy.int64(2)])
+    # Then
+    assert values == [1, 2]
+    assert type(values[0]) is int
+
+@pytest.mark.parametrize('column, expected', [
+    (['int', 2.5], [1, 2.5]),
+    (['int', 'abc'], [1, 'abc']),
+    ([2.5, 'int'], [2.5, 1]),
+])
+def test_columns_with_mixed_numpy_scalars(column, expected):
+    # Given
+    numpy = pytest.importorskip('numpy')
+    column = [numpy.int64(1) if value == 'int' else value for value in column]
+    # When
+    values = column_values(column)
+    # Then
+    assert values == expected
+    assert [type(value) for value in values] == [type(value) for value in expected]
+
+def test_columns_with_numpy_structured_array(builder):
+    # Given
+    numpy = pytest.importorskip('numpy')
+    ingredients = numpy.array([('Noodles', 1.5), ('Pork', 4.0)], dtype=[('name', 'U10'), ('price', 'f8')])
+    # When
+    builder.columns('ingredients', ingredients.view(numpy.recarray))
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'ingredients': [{'name': 'Noodles', 'price': 1.5}, {'name': 'Pork', 'price': 4.0}]}
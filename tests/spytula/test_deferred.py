@@ -0,0 +1,247 @@
+import pytest
+import asyncio
+import threading
+import time
+import spytula
+from concurrent.futures import ThreadPoolExecutor
+from spytula.builder import SpytulaBuilder
+from spytula import deferred
+from spytula.deferred import Batch, lazy
+
+@pytest.fixture()
+def builder():
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    return builder
+
+def test_lazy_is_exported():
+    assert spytula.lazy is lazy
+    assert spytula.Batch is Batch
+
+def test_lazy_resolved_when_serialized(builder):
+    # Given
+    calls = []
+    def fetch_stats(dish_id):
+        calls.append(dish_id)
+        return {'view_count': dish_id * 10}
+    builder.attribute('dish_stats', lazy(fetch_stats, 4))
+    # Then
+    assert calls == []
+    # When
+    json_output = builder.to_json()
+    # Then
+    assert json_output == '{"dishStats": {"viewCount": 40}}'
+    assert builder.data == {'dish_stats': {'view_count': 40}}
+    # When
+    builder.to_json()
+    # Then
+    assert calls == [4]
+
+def test_lazy_dropped_by_when_is_never_evaluated(builder):
+    # Given
+    calls = []
+    # When
+    builder.when('stats', lazy(calls.append, 1), False)
+    builder.to_json()
+    # Then
+    assert calls == []
+
+def test_lazy_values_resolved_concurrently(builder):
+    # Given
+    barrier = threading.Barrier(3, timeout=5)
+    def fetch(index):
+        barrier.wait()
+        return index
+    for dish_builder, index in builder.each('dishes', range(3)):
+        dish_builder.attribute('rank', lazy(fetch, index))
+    # When
+    builder.lazy_executor(ThreadPoolExecutor(max_workers=3))
+    json_output = builder.to_json()
+    # Then
+    assert json_output == '{"dishes": [{"rank": 0}, {"rank": 1}, {"rank": 2}]}'
+
+def test_lazy_returning_lazy(builder):
+    # When
+    builder.attribute('chef', lazy(lambda: {'chef_name': lazy(str.upper, 'ivan')}))
+    # Then
+    assert builder.to_json() == '{"chef": {"chefName": "IVAN"}}'
+
+def test_lazy_in_tuple(builder):
+    # When
+    builder.attribute('ratings', (lazy(lambda: 4.5),))
+    # Then
+    assert builder.to_json() == '{"ratings": [4.5]}'
+    assert builder.to_json(backend='json') == '{"ratings": [4.5]}'
+
+def test_batch_loads_keys_at_once(builder):
+    # Given
+    calls = []
+    def load_authors(ids):
+        calls.append(ids)
+        return [f'Chef {author_id}' for author_id in ids]
+    authors = Batch(load_authors)
+    # When
+    for recipe_builder, author_id in builder.each('recipes', [1, 2, 1]):
+        recipe_builder.attribute('author', authors.load(author_id))
+    # Then
+    assert builder.to_json() == '{"recipes": [{"author": "Chef 1"}, {"author": "Chef 2"}, {"author": "Chef 1"}]}'
+    assert calls == [[1, 2]]
+
+def test_batch_returning_mapping_with_max_size(builder):
+    # Given
+    calls = []
+    def load_authors(ids):
+        calls.append(ids)
+        return {author_id: f'Chef {author_id}' for author_id in ids}
+    authors = Batch(load_authors, max_size=2)
+    # When
+    builder.attribute('authors', [authors.load(author_id) for author_id in range(5)])
+    builder.resolve()
+    # Then
+    assert builder.data == {'authors': ['Chef 0', 'Chef 1', 'Chef 2', 'Chef 3', 'Chef 4']}
+    assert sorted(calls) == [[0, 1], [2, 3], [4]]
+
+def test_batch_returning_wrong_number_of_values(builder):
+    # Given
+    authors = Batch(lambda ids: [])
+    # When
+    builder.attribute('author', authors.load(1))
+    # Then
+    with pytest.raises(ValueError):
+        builder.to_json()
+
+def test_lazy_error_is_raised(builder):
+    # Given
+    def fail():
+        raise LookupError('stats')
+    # When
+    builder.attribute('stats', lazy(fail))
+    # Then
+    with pytest.raises(LookupError):
+        builder.to_json()
+
+@pytest.mark.parametrize('method', ['to_yaml', 'to_msgpack', 'to_cbor', 'freeze'])
+def test_lazy_resolved_by_other_outputs(builder, method):
+    # When
+    builder.attribute('dish_name', lazy(lambda: 'Ramen'))
+    getattr(builder, method)()
+    # Then
+    assert builder.data == {'dish_name': 'Ramen'}
+
+def test_lazy_value_outside_builder():
+    # Given
+    value = lazy(sum, [1, 2])
+    # Then
+    assert not value.resolved
+    assert value.value == 3
+    assert value.resolved
+    assert repr(value) == 'Lazy(value=3)'
+
+def test_lazy_coroutines_gathered(builder):
+    # Given
+    async def fetch(index):
+        await asyncio.sleep(0.05)
+        return index
+    # When
+    for dish_builder, index in builder.each('dishes', range(10)):
+        dish_builder.attribute('rank', lazy(fetch, index))
+    started = time.perf_counter()
+    json_output = builder.to_json()
+    # Then
+    assert time.perf_counter() - started < 0.4
+    assert json_output == '{"dishes": [' + ', '.join(f'{{"rank": {index}}}' for index in range(10)) + ']}'
+
+def test_aresolve(builder):
+    # Given
+    async def fetch_name():
+        return 'Ramen'
+    authors = Batch(lambda ids: [f'Chef {author_id}' for author_id in ids])
+    builder.attribute('dish_name', lazy(fetch_name))
+    builder.attribute('author', authors.load(1))
+    # When
+    async def write():
+        return [chunk async for chunk in builder.aiter_json()]
+    chunks = asyncio.run(write())
+    # Then
+    assert ''.join(chunks) == '{"dishName": "Ramen", "author": "Chef 1"}'
+
+def test_lazy_coroutine_in_running_loop(builder):
+    # Given
+    async def fetch_name():
+        return 'Ramen'
+    builder.attribute('dish_name', lazy(fetch_name))
+    # When
+    async def serialize():
+        return builder.to_json()
+    # Then
+    with pytest.raises(RuntimeError):
+        asyncio.run(serialize())
+
+def test_pending_values():
+    # When
+    value = lazy(int)
+    # Then
+    assert value._ref in deferred._pending
+    assert deferred.has_pending()
+    # When
+    reference = value._ref
+    del value
+    # Then
+    assert reference not in deferred._pending
+
+def test_resolved_values_are_not_pending():
+    # Given
+    value = lazy(int)
+    # When
+    value.value
+    # Then
+    assert value._ref not in deferred._pending
+
+def test_pending_values_across_threads():
+    # Given
+    def create_and_resolve():
+        for _ in range(1000):
+            lazy(int).value
+    # When
+    threads = [threading.Thread(target=create_and_resolve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Then
+    assert all(not reference().resolved for reference in list(deferred._pending) if reference() is not None)
+
+def test_builders_without_lazy_values_skip_looking_for_them(builder, monkeypatch):
+    # Given
+    pending = lazy(int)
+    for dish_builder, index in builder.each('dishes', range(3)):
+        dish_builder.attribute('rank', index)
+    # When
+    monkeypatch.setattr(deferred, '_collect', lambda values: pytest.fail('The data was looked into'))
+    # Then
+    assert builder.to_json() == '{"dishes": [{"rank": 0}, {"rank": 1}, {"rank": 2}]}'
+    assert not pending.resolved
+
+@pytest.mark.parametrize('add', [
+    lambda node, value: node.attribute('stats', {'views': [value]}),
+    lambda node, value: node.merge({'stats': value}),
+    lambda node, value: node.attributes({'stats': value}, ['stats']),
+    lambda node, value: node.attributes_many('stats', [{'views': value}], ['views']),
+])
+def test_lazy_values_of_nested_nodes_loaded_at_once(add):
+    # Given
+    builder = SpytulaBuilder()
+    calls = []
+    def load_many(keys):
+        calls.append(keys)
+        return keys
+    batch = Batch(load_many)
+    for dish_builder, index in builder.each('dishes', range(3)):
+        with dish_builder.node('stats') as stats_builder:
+            add(stats_builder, batch.load(index))
+        if index == 1:
+            break
+    # When
+    builder.to_json()
+    # Then
+    assert calls == [[0, 1]]
@@ -0,0 +1,144 @@
+import pytest
+import io
+import json
+import yaml
+from spytula.builder import SpytulaBuilder
+from spytula.frozen import FrozenNode
+
+@pytest.fixture()
+def author():
+    author = SpytulaBuilder()
+    author.key_format(camelize={'uppercase_first_letter': False})
+    author.attribute('full_name', 'Ivan Orkin')
+    with author.node('restaurant') as restaurant:
+        restaurant.attribute('city', 'New York')
+    return author
+
+@pytest.fixture()
+def builder():
+    return SpytulaBuilder()
+
+def test_freeze_keeps_keys_unformatted(author):
+    # When
+    frozen = author.freeze()
+    # Then
+    assert frozen.text == '{"full_name": "Ivan Orkin", "restaurant": {"city": "New York"}}'
+    assert frozen.to_json() == '{"fullName": "Ivan Orkin", "restaurant": {"city": "New York"}}'
+
+def test_freeze_is_a_snapshot(author):
+    # Given
+    frozen = author.freeze()
+    # When
+    author.attribute('full_name', 'Someone else')
+    author.data['restaurant']['city'] = 'Tokyo'
+    # Then
+    assert frozen.loads() == {'full_name': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}
+
+def test_frozen_node_as_attribute(author, builder):
+    # Given
+    frozen = author.freeze()
+    for recipe_builder, title in builder.each('recipes', ['Shio', 'Shoyu']):
+        recipe_builder.attribute('title', title)
+        recipe_builder.attribute('author', frozen)
+    expected = {'title': None, 'author': {'full_name': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}}
+    # When
+    data = json.loads(builder.to_json())
+    # Then
+    assert data == {'recipes': [dict(expected, title='Shio'), dict(expected, title='Shoyu')]}
+    assert ''.join(builder.iter_json()) == builder.to_json()
+
+@pytest.mark.parametrize('options', [{'indent': 2}, {'indent': 4, 'sort_keys': True}, {'separators': (',', ':')}])
+def test_frozen_node_with_options(author, builder, options):
+    # Given
+    builder.attribute('author', author.freeze())
+    builder.attribute('title', 'Shio')
+    expected = json.dumps({'author': {'full_name': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}, 'title': 'Shio'},
+                          **options)
+    # Then
+    assert ''.join(builder.iter_json(**options)) == expected
+    assert builder.to_json(**options) == expected
+
+def test_frozen_node_memoizes_encoded_json(author):
+    # Given
+    frozen = author.freeze()
+    # Then
+    assert frozen.to_json_bytes() is frozen.to_json_bytes()
+    assert frozen.to_json_bytes() == frozen.to_json().encode('utf-8')
+    assert frozen.to_json(indent=2) is frozen.to_json(indent=2)
+
+@pytest.mark.parametrize('backend', ['json', 'orjson', 'ujson'])
+def test_frozen_node_is_encoded_once_with_backend(author, builder, backend, monkeypatch):
+    # Given
+    pytest.importorskip(backend)
+    frozen = author.freeze()
+    builder.attribute('author', frozen)
+    expected = builder.to_json(indent=2, backend=backend)
+    # When
+    monkeypatch.setattr(FrozenNode, '_plain_data', lambda self: pytest.fail('The snapshot was encoded again'))
+    # Then
+    assert builder.to_json(backend=backend) == builder.to_json(backend=backend)
+    assert json.loads(builder.to_json(backend=backend)) == {'author': frozen.loads()}
+    assert builder.to_json(indent=2, backend=backend) == expected
+    assert builder.to_json_bytes(indent=2, backend=backend) == expected.encode('utf-8')
+
+def test_partial_with_frozen_node(author, builder):
+    # Given
+    frozen = author.freeze()
+    builder.key_format(underscore=True)
+    # When
+    builder.partial(frozen)
+    builder.merge(frozen)
+    # Then
+    assert frozen.fields()['restaurant'].text == '{"city": "New York"}'
+    assert json.loads(builder.to_json()) == {'full_name': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}
+
+@pytest.mark.parametrize('method', ['to_json', 'iter_json', 'to_yaml', 'to_msgpack', 'dump_msgpack', 'dump_yaml_all'])
+def test_frozen_node_with_key_format_of_builder(author, method):
+    # Given
+    author.key_format(underscore=True)
+    frozen = author.freeze()
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.attribute('post_title', 'Shio')
+    builder.attribute('author_info', frozen)
+    builder.merge(frozen)
+    expected = {'postTitle': 'Shio', 'authorInfo': {'fullName': 'Ivan Orkin', 'restaurant': {'city': 'New York'}},
+                'fullName': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}
+    # When
+    if method == 'to_json':
+        data = json.loads(builder.to_json(indent=2))
+    elif method == 'iter_json':
+        data = json.loads(''.join(builder.iter_json()))
+    elif method == 'to_yaml':
+        data = yaml.safe_load(builder.to_yaml())
+    elif method == 'to_msgpack':
+        msgpack = pytest.importorskip('msgpack')
+        data = msgpack.unpackb(builder.to_msgpack())
+    elif method == 'dump_msgpack':
+        msgpack = pytest.importorskip('msgpack')
+        fp = io.BytesIO()
+        builder.dump_msgpack(fp)
+        data = msgpack.unpackb(fp.getvalue())
+    else:
+        data = yaml.safe_load(SpytulaBuilder.dump_yaml_all([builder]))
+    # Then the keys of the snapshot are written with the key format of the builder
+    assert data == expected
+    assert frozen.to_json() == '{"full_name": "Ivan Orkin", "restaurant": {"city": "New York"}}'
+    assert builder.estimated_size() == len(builder.to_json())
+
+def test_merge_frozen_list(builder):
+    # Given
+    other_builder = SpytulaBuilder('items')
+    other_builder.attribute('items', [1, 2])
+    # Then
+    with pytest.raises(TypeError):
+        builder.merge(other_builder.freeze())
+
+def test_frozen_node_to_yaml(author, builder):
+    # Given
+    builder.attribute('author', author.freeze())
+    # Then
+    assert yaml.safe_load(builder.to_yaml()) == {'author': {'full_name': 'Ivan Orkin', 'restaurant': {'city': 'New York'}}}
+
+def test_frozen_node_repr():
+    assert repr(FrozenNode('[]')) == "FrozenNode('[]')"
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import spytula
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+
+def test_import_exports_builder():
+    assert spytula.SpytulaBuilder.__module__ == 'spytula.builder'
+
+def test_import_has_no_output():
+    # When
+    result = run_python('import spytula')
+    # Then
+    assert result.stdout == ''
+
+def test_import_defers_optional_modules():
+    # When
+    result = run_python('import sys, spytula; print(" ".join(sorted(sys.modules)))')
+    modules = result.stdout.split()
+    # Then
+    for module in ['yaml', 'inflection', 'orjson', 'ujson', 'msgpack', 'cbor2', 'numpy', 'mmap', 'asyncio',
+                   'concurrent.futures']:
+        assert module not in modules
+
+def test_import_defers_optional_spytula_modules():
+    # When
+    result = run_python('import sys, spytula; print(" ".join(sorted(sys.modules)))')
+    modules = result.stdout.split()
+    # Then
+    for module in ['cache', 'columns', 'deferred', 'frozen', 'limits', 'loading', 'patch', 'template']:
+        assert f'spytula.{module}' not in modules
+
+def test_lazy_exports():
+    # Then
+    assert spytula.lazy.__module__ == 'spytula.deferred'
+    assert spytula.Batch.__module__ == 'spytula.deferred'
+
+def test_yaml_and_inflection_imported_on_use():
+    # When
+    result = run_python(
+        'import sys, spytula\n'
+        'builder = spytula.SpytulaBuilder()\n'
+        'builder.key_format(underscore=True)\n'
+        'builder.to_yaml()\n'
+        'print(" ".join(sorted(sys.modules)))'
+    )
+    modules = result.stdout.split()
+    # Then
+    assert 'yaml' in modules
+    assert 'inflection' in modules
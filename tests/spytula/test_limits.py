@@ -0,0 +1,298 @@
+import pytest
+import io
+import json
+import random
+from spytula.builder import SpytulaBuilder
+from spytula.limits import LimitExceeded, Limits, apply_limits, estimated_size
+
+@pytest.fixture()
+def builder():
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    return builder
+
+def dishes(count):
+    for index in range(count):
+        yield {'dish_id': index, 'dish_name': f'Ramen {index}'}
+
+@pytest.mark.parametrize('data', [
+    {},
+    {'dish_name': 'Ramen', 'ratings': [4.5, 3, None, True, False], 'origin': {'country': 'Japan'}},
+    {'dish_name': 'Rāmen 🍜', 'tags': [[], {}, ['hot']]},
+    [{'dish_id': index} for index in range(3)],
+    {'dish_name': 'Shōyu "Ramen"\n', 'notes': ['\t\\', '\u00e9' * 10, '🍜' * 3]},
+])
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_estimated_size_is_exact_for_plain_data(data, indent, ensure_ascii):
+    # When
+    size = estimated_size(data, indent=indent, ensure_ascii=ensure_ascii)
+    # Then
+    assert size == len(json.dumps(data, indent=indent, ensure_ascii=ensure_ascii).encode('utf-8'))
+
+def test_estimated_size_of_builder(builder):
+    # Given
+    for dish_builder, dish in builder.each('all_dishes', dishes(3)):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    # Then
+    assert builder.estimated_size() == len(builder.to_json())
+    assert builder.estimated_size(indent=2) == len(builder.to_json(indent=2))
+
+def test_limits_unknown_overflow(builder):
+    with pytest.raises(ValueError):
+        builder.limits(max_items=1, overflow='ignore')
+
+def test_max_items_raises_while_building(builder):
+    # Given
+    builder.limits(max_items=2)
+    fetched = []
+    # When
+    with pytest.raises(LimitExceeded) as error:
+        for dish_builder, dish in builder.each('all_dishes', dishes(5)):
+            fetched.append(dish)
+    # Then
+    assert error.value.limit == 'max_items'
+    assert error.value.value == 2
+    assert len(fetched) == 2
+
+def test_max_items_truncates_while_building(builder):
+    # Given
+    builder.limits(max_items=2, overflow='truncate', marker={'truncated': True})
+    fetched = []
+    # When
+    for dish_builder, dish in builder.each('all_dishes', dishes(5)):
+        fetched.append(dish)
+        dish_builder.attribute('dish_id', dish['dish_id'])
+    # Then
+    assert len(fetched) == 2
+    assert builder.to_json() == '{"allDishes": [{"dishId": 0}, {"dishId": 1}, {"truncated": true}]}'
+
+def test_max_items_with_nodes(builder):
+    # Given
+    builder.limits(max_items=1, overflow='truncate')
+    # When
+    with builder.nodes('all_dishes') as add_dish:
+        for name in ['Ramen', 'Pho']:
+            with add_dish() as dish_builder:
+                dish_builder.attribute('dish_name', name)
+    # Then
+    assert builder.data == {'all_dishes': [{'dish_name': 'Ramen'}]}
+
+def test_max_items_with_tracking(builder):
+    # Given
+    builder.limits(max_items=1, overflow='truncate', marker='...')
+    builder.track_changes()
+    snapshot = builder.snapshot()
+    # When
+    for dish_builder, dish in builder.each('all_dishes', dishes(3)):
+        dish_builder.attribute('dish_id', dish['dish_id'])
+    # Then
+    assert builder.diff(snapshot) == [{'op': 'add', 'path': '/allDishes', 'value': [{'dishId': 0}, '...']}]
+
+def test_max_items_checked_at_serialization(builder):
+    # Given
+    builder.limits(max_items=2)
+    # When
+    builder.attribute('dish', {'tags': ['hot', 'spicy', 'vegan']})
+    # Then
+    with pytest.raises(LimitExceeded) as error:
+        builder.to_json()
+    assert error.value.path == '/dish/tags'
+
+def test_max_depth(builder):
+    # Given
+    builder.attribute('dish', {'origin': {'country': {'name': 'Japan'}}, 'name': 'Ramen'})
+    # When
+    builder.limits(max_depth=3, overflow='truncate', marker='...')
+    # Then
+    assert builder.to_json() == '{"dish": {"origin": {"country": "..."}, "name": "Ramen"}}'
+    # When
+    builder.limits(max_depth=3)
+    # Then
+    with pytest.raises(LimitExceeded) as error:
+        builder.to_json()
+    assert error.value.limit == 'max_depth'
+    assert error.value.path == '/dish/origin/country'
+
+@pytest.mark.parametrize('method', ['iter_json', 'dump_json'])
+def test_max_bytes_raises_while_streaming(builder, method):
+    # Given
+    for dish_builder, dish in builder.each('all_dishes', dishes(100)):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    builder.limits(max_bytes=1000)
+    fp = io.StringIO()
+    # When
+    with pytest.raises(LimitExceeded) as error:
+        if method == 'iter_json':
+            for chunk in builder.iter_json():
+                fp.write(chunk)
+        else:
+            builder.dump_json(fp, buffer_size=100)
+    # Then the chunks written before the error fit in the limit
+    assert error.value.limit == 'max_bytes'
+    assert 0 < len(fp.getvalue()) <= 1000
+
+@pytest.mark.parametrize('backend, options', [
+    ('json', {'separators': (',', ':')}),
+    ('orjson', {}),
+    ('ujson', {}),
+])
+def test_max_bytes_counts_real_separators(builder, backend, options):
+    # Given
+    for dish_builder, dish in builder.each('all_dishes', dishes(20)):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    json_output = builder.to_json(backend=backend, **options)
+    # When
+    builder.limits(max_bytes=len(json_output))
+    # Then
+    assert builder.to_json(backend=backend, **options) == json_output
+    assert ''.join(builder.iter_json(separators=(',', ':'))) == builder.to_json(separators=(',', ':'))
+
+def test_max_bytes_raises_when_root_does_not_fit(builder):
+    # Given
+    builder.attribute('dish_name', 'Ramen')
+    # When
+    builder.limits(max_bytes=2, overflow='truncate')
+    # Then
+    with pytest.raises(LimitExceeded):
+        builder.to_json(indent=2)
+
+def test_max_bytes_checks_exact_size(builder):
+    # Given
+    builder.attribute('dish_tags', {'hot', 'spicy', 'vegan'})
+    # When
+    builder.limits(max_bytes=estimated_size({'dishTags': {'hot'}}))
+    # Then values serialized by `default` are underestimated, but the document is checked once encoded
+    with pytest.raises(LimitExceeded):
+        builder.to_json(default=sorted)
+    with pytest.raises(LimitExceeded):
+        builder.to_json_bytes(default=sorted)
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_max_bytes_truncates(builder, indent):
+    # Given
+    for dish_builder, dish in builder.each('all_dishes', dishes(100)):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    builder.attribute('menu_title', 'Lunch')
+    # When
+    builder.limits(max_bytes=500, overflow='truncate', marker={'truncated': True})
+    json_output = builder.to_json(indent=indent)
+    # Then
+    data = json.loads(json_output)
+    assert len(json_output) <= 500
+    assert data['allDishes'][-1] == {'truncated': True}
+    assert data['allDishes'][:-1] == [{'dishId': index, 'dishName': f'Ramen {index}'}
+                                      for index in range(len(data['allDishes']) - 1)]
+    assert 'menuTitle' not in data
+
+def test_max_depth_marker_fits_in_max_bytes(builder):
+    # Given
+    builder.attribute('dish', {'origin': {'country': 'Japan'}})
+    builder.attribute('tags', [['hot'], ['spicy']])
+    # When
+    builder.limits(max_bytes=20, max_depth=1, overflow='truncate', marker={'truncated': True})
+    json_output = builder.to_json()
+    # Then
+    assert len(json_output) <= 20
+    assert json.loads(json_output) == {}
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_max_bytes_truncates_escaped_strings(builder, ensure_ascii):
+    # Given
+    builder.attribute('dish_names', ['héllo 🍜' * 10] * 20)
+    # When
+    builder.limits(max_bytes=500, overflow='truncate', marker='...')
+    json_output = builder.to_json_bytes(ensure_ascii=ensure_ascii)
+    # Then
+    assert len(json_output) <= 500
+    assert json.loads(json_output)['dishNames'][-1] == '...'
+
+def random_value(rng, depth=0):
+    kind = rng.choice(['str', 'int', 'float', 'list', 'dict'] if depth < 4 else ['str', 'int', 'float'])
+    if kind == 'str':
+        return ''.join(rng.choice('ab "\\\n\u00e9\u4e2d🍜') for _ in range(rng.randint(0, 12)))
+    if kind == 'int':
+        return rng.randint(-1000, 1000)
+    if kind == 'float':
+        return rng.random()
+    if kind == 'list':
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 8))]
+    return {f'key_{index}': random_value(rng, depth + 1) for index in range(rng.randint(0, 6))}
+
+@pytest.mark.parametrize('seed', range(40))
+def test_truncated_and_paginated_outputs_fit_in_max_bytes(seed):
+    # Given
+    rng = random.Random(seed)
+    builder = SpytulaBuilder()
+    builder.merge({f'key_{index}': random_value(rng) for index in range(6)})
+    builder.attribute('items', [random_value(rng, 1) for _ in range(30)])
+    max_bytes = rng.randint(40, 400)
+    options = {'indent': rng.choice([None, 2, 4]), 'ensure_ascii': rng.choice([True, False])}
+    marker = rng.choice([None, '...', {'truncated': True}])
+    max_depth = rng.choice([None, 2, 3])
+    # When
+    builder.limits(max_bytes=max_bytes, max_depth=max_depth, overflow='truncate', marker=marker)
+    truncated = builder.to_json_bytes(**options)
+    builder.limits(max_bytes=max_bytes, max_depth=max_depth, overflow='paginate', marker=marker)
+    pages = list(builder.iter_json_pages(**options))
+    # Then
+    assert len(truncated) <= max_bytes
+    assert all(len(page.encode('utf-8')) <= max_bytes for page in pages)
+
+def test_data_within_limits_is_not_copied(builder):
+    # Given
+    builder.attribute('tags', ['hot'])
+    limits = Limits(max_bytes=100, max_items=10, max_depth=3, overflow='truncate')
+    # Then
+    assert apply_limits(builder.data, limits) is builder.data
+
+def test_paginate(builder):
+    # Given
+    builder.attribute('menu_title', 'Lunch')
+    for dish_builder, dish in builder.each('all_dishes', dishes(5)):
+        dish_builder.attribute('dish_id', dish['dish_id'])
+    # When
+    builder.limits(max_items=2, overflow='paginate')
+    pages = [json.loads(page) for page in builder.iter_json_pages()]
+    # Then
+    assert pages == [
+        {'menuTitle': 'Lunch', 'allDishes': [{'dishId': 0}, {'dishId': 1}]},
+        {'menuTitle': 'Lunch', 'allDishes': [{'dishId': 2}, {'dishId': 3}]},
+        {'menuTitle': 'Lunch', 'allDishes': [{'dishId': 4}]},
+    ]
+    with pytest.raises(LimitExceeded):
+        builder.to_json()
+    with pytest.raises(LimitExceeded):
+        builder.to_yaml()
+    assert builder.data['all_dishes'] == [{'dish_id': index} for index in range(5)]
+
+def test_paginate_by_size(builder):
+    # Given
+    builder.attribute('menu_title', 'Lunch')
+    builder.attribute('tags', ['hot', 'spicy'])
+    for dish_builder, dish in builder.each('all_dishes', dishes(50)):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    # When
+    builder.limits(max_bytes=400, overflow='paginate')
+    pages = list(builder.iter_json_pages())
+    # Then
+    assert len(pages) > 1
+    assert all(len(page) <= 400 for page in pages)
+    assert all(json.loads(page)['tags'] == ['hot', 'spicy'] for page in pages)
+    assert [dish['dishId'] for page in pages for dish in json.loads(page)['allDishes']] == list(range(50))
+
+def test_single_page_without_limits(builder):
+    # Given
+    builder.attribute('menu_title', 'Lunch')
+    # Then
+    assert list(builder.iter_json_pages()) == ['{"menuTitle": "Lunch"}']
+
+@pytest.mark.parametrize('method', ['to_yaml', 'to_msgpack', 'to_cbor'])
+def test_limits_apply_to_other_outputs(builder, method):
+    # Given
+    builder.attribute('tags', ['hot', 'spicy', 'vegan'])
+    # When
+    builder.limits(max_items=2)
+    # Then
+    with pytest.raises(LimitExceeded):
+        getattr(builder, method)()
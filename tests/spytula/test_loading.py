@@ -0,0 +1,293 @@
+import pytest
+import io
+import json
+import yaml
+from spytula.builder import SpytulaBuilder
+from spytula import deferred
+from spytula.loading import LazyArray, LazyObject, RawSlice, YAMLEntry, load_json
+
+MENU = {
+    'menu_title': 'Menu',
+    'dish_stats': {'view_count': 1, 'like_count': 2, 'origin': {'country': 'Japan'}},
+    'all_dishes': [{'dish_name': 'Ramen', 'tags': ['hot', 'a "quoted, [bracket]"']}, {'dish_name': 'Pho'}],
+    'rating': 4.5,
+    'is_open': True,
+    'closed_on': None,
+}
+
+@pytest.fixture(params=[None, 2])
+def menu_file(request, tmp_path):
+    path = tmp_path / 'menu.json'
+    path.write_text(json.dumps(MENU, indent=request.param))
+    return path
+
+def test_load_json_keeps_values_as_slices(menu_file):
+    # When
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    # Then
+    assert isinstance(builder.data, LazyObject)
+    assert all(isinstance(value, RawSlice) for value in dict.values(builder.data))
+    assert json.loads(builder.to_json()) == MENU
+    assert all(isinstance(value, RawSlice) for value in dict.values(builder.data))
+
+def test_load_json_reads_values(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    # When
+    dishes = builder.data['all_dishes']
+    # Then
+    assert isinstance(dishes, LazyArray)
+    assert dishes[0]['tags'] == ['hot', 'a "quoted, [bracket]"']
+    assert dishes[-1:] == [{'dish_name': 'Pho'}]
+    assert builder.data['rating'] == 4.5
+    assert builder.data.get('is_open') is True
+    assert builder.data.get('closed_on', 'open') is None
+    assert builder.data.get('opened_on') is None
+    assert isinstance(dict.__getitem__(builder.data, 'dish_stats'), RawSlice)
+
+def test_load_json_iterated_values_are_parsed(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    # When
+    dish_names = [dish['dish_name'] for dish in builder.data['all_dishes']]
+    # Then
+    assert dish_names == ['Ramen', 'Pho']
+    assert list(builder.data['dish_stats'].values()) == [1, 2, {'country': 'Japan'}]
+    assert dict(builder.data['dish_stats']['origin'].items()) == {'country': 'Japan'}
+    assert dict(builder.data) == MENU
+    assert {**builder.data} == MENU
+    assert json.loads(builder.to_json()) == MENU
+
+def test_load_json_edits_nodes(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    # When
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 10)
+        with stats.node('origin') as origin:
+            origin.attribute('city', 'Tokyo')
+    builder.attribute('menu_title', 'Lunch')
+    builder.merge({'is_open': False})
+    # Then
+    assert json.loads(builder.to_json()) == dict(
+        MENU, menu_title='Lunch', is_open=False,
+        dish_stats={'view_count': 10, 'like_count': 2, 'origin': {'country': 'Japan', 'city': 'Tokyo'}})
+    assert isinstance(dict.__getitem__(builder.data, 'all_dishes'), RawSlice)
+
+@pytest.mark.parametrize('setup', [['track_changes'], ['limits'], ['limits', 'track_changes'], ['track_changes', 'limits']])
+def test_load_json_edits_nodes_of_tracking_and_limited_builders(menu_file, setup):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    for method in setup:
+        getattr(builder, method)(**({'max_items': 10} if method == 'limits' else {}))
+    snapshot = builder.snapshot()
+    # When
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 10)
+        with stats.node('origin') as origin:
+            origin.attribute('city', 'Tokyo')
+    # Then
+    assert isinstance(builder.data, LazyObject)
+    assert isinstance(dict.__getitem__(builder.data, 'all_dishes'), RawSlice)
+    assert json.loads(builder.to_json()) == dict(
+        MENU, dish_stats={'view_count': 10, 'like_count': 2, 'origin': {'country': 'Japan', 'city': 'Tokyo'}})
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/dish_stats/view_count', 'value': 10},
+                                      {'op': 'add', 'path': '/dish_stats/origin/city', 'value': 'Tokyo'}]
+
+def test_load_json_untouched_values_written_verbatim():
+    # Given
+    builder = SpytulaBuilder.load_json(io.BytesIO(b'{"dish_name": "Ramen", "dish_stats": {"view_count" :1}}'))
+    # When
+    builder.attribute('is_open', True)
+    # Then
+    assert builder.to_json() == '{"dish_name": "Ramen", "dish_stats": {"view_count" :1}, "is_open": true}'
+    assert ''.join(builder.iter_json()) == builder.to_json()
+
+@pytest.mark.parametrize('in_place', [False, True])
+def test_load_json_key_format(menu_file, in_place):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    builder.key_format(in_place=in_place, camelize={'uppercase_first_letter': False})
+    builder.track_changes()
+    snapshot = builder.snapshot()
+    # When
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 10)
+    builder.data['all_dishes'][1]['dish_name'] = 'Udon'
+    # Then
+    expected = {
+        'menuTitle': 'Menu',
+        'dishStats': {'viewCount': 10, 'likeCount': 2, 'origin': {'country': 'Japan'}},
+        'allDishes': [{'dishName': 'Ramen', 'tags': ['hot', 'a "quoted, [bracket]"']}, {'dishName': 'Udon'}],
+        'rating': 4.5,
+        'isOpen': True,
+        'closedOn': None,
+    }
+    assert json.loads(builder.to_json()) == expected
+    assert json.loads(''.join(builder.iter_json(indent=2))) == expected
+    assert yaml.safe_load(builder.to_yaml()) == expected
+    assert builder.estimated_size() == len(builder.to_json())
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/dishStats/viewCount', 'value': 10},
+                                      {'op': 'replace', 'path': '/allDishes/1/dishName', 'value': 'Udon'}]
+
+def test_load_json_saved_to_loaded_file(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    menu_file.chmod(0o640)
+    # When
+    builder.attribute('menu_title', 'Lunch')
+    builder.save_json(menu_file)
+    # Then
+    assert json.loads(menu_file.read_text()) == dict(MENU, menu_title='Lunch')
+    assert json.loads(builder.to_json()) == dict(MENU, menu_title='Lunch')
+    assert menu_file.stat().st_mode & 0o777 == 0o640
+    assert [path.name for path in menu_file.parent.iterdir()] == ['menu.json']
+
+def test_load_json_from_truncated_file(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    # When
+    with open(menu_file, 'w') as fp:
+        # Then
+        with pytest.raises(ValueError):
+            builder.dump_json(fp)
+        with pytest.raises(ValueError):
+            builder.data['all_dishes']
+
+def test_load_json_from_text_stream():
+    # When
+    builder = SpytulaBuilder.load_json(io.StringIO('{"dish_name": "Rāmen", "tags": []}'))
+    # Then
+    assert builder.data['dish_name'] == 'Rāmen'
+    assert builder.to_json(ensure_ascii=False) == '{"dish_name": "Rāmen", "tags": []}'
+
+@pytest.mark.parametrize('document', [b'[1, 2]', b'"Ramen"', b'', b'{"a" 1, 2}'])
+def test_load_json_expects_object(document):
+    with pytest.raises(ValueError):
+        load_json(io.BytesIO(document))
+
+@pytest.mark.parametrize('document', [
+    b'{"a" 1}', b'{"a": }', b'{"a": 1 2}', b'{"a": "x" "y"}', b'{"a": [1] 2}', b'{"a": 1,}', b'{,}', b'{1: 2}',
+    b'{"a": tru}', b'{"a": 01}', b'{"a": 1 "b": 2}',
+])
+def test_load_json_rejects_malformed_members(document):
+    with pytest.raises(ValueError):
+        load_json(io.BytesIO(document))
+
+@pytest.mark.parametrize('value', [b'[1,]', b'[1,,2]', b'[,]', b'[1:2]', b'{"b" 1}', b'{"b": 1,}'])
+def test_load_json_rejects_malformed_nested_members(value):
+    # Given
+    data = load_json(io.BytesIO(b'{"a": ' + value + b'}'))
+    # Then
+    with pytest.raises(ValueError):
+        data['a']
+
+@pytest.mark.parametrize('method, args', [('to_json', ()), ('dump_json', (io.StringIO(),)), ('to_msgpack', ())])
+def test_load_json_rejects_malformed_nested_values_when_written(method, args):
+    # Given
+    document = '{"dish_name": "Ramen", "dish_stats": {"tags": [1, }}, "rating": 1}'
+    builder = SpytulaBuilder.load_json(io.BytesIO(document.encode()))
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(document)
+    # When
+    with pytest.raises(json.JSONDecodeError) as error:
+        getattr(builder, method)(*args)
+    # Then
+    assert str(error.value) == str(expected.value)
+
+@pytest.mark.parametrize('method', ['to_yaml', 'to_msgpack', 'to_cbor'])
+def test_load_json_other_outputs(menu_file, method):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    expected_builder = SpytulaBuilder()
+    expected_builder.merge(MENU)
+    # Then
+    assert getattr(builder, method)() == getattr(expected_builder, method)()
+
+def test_load_json_diff(menu_file):
+    # Given
+    with open(menu_file, 'rb') as fp:
+        builder = SpytulaBuilder.load_json(fp)
+    snapshot = builder.snapshot()
+    # When
+    builder.data['all_dishes'][1]['dish_name'] = 'Udon'
+    # Then
+    assert snapshot.data == MENU
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/all_dishes/1/dish_name', 'value': 'Udon'}]
+    assert builder.data == dict(MENU, all_dishes=[MENU['all_dishes'][0], {'dish_name': 'Udon'}])
+
+def test_load_yaml(tmp_path):
+    # Given
+    path = tmp_path / 'menu.yml'
+    path.write_text('menu_title: Menu\n'
+                    'dish_stats:\n'
+                    '  view_count: 1\n'
+                    '  origin:\n'
+                    '    country: Japan\n'
+                    '"a: b": 1\n'
+                    'all_dishes:\n'
+                    '- dish_name: Ramen\n'
+                    '  tags: [hot]\n')
+    # When
+    with open(path, 'rb') as fp:
+        builder = SpytulaBuilder.load_yaml(fp)
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 2)
+        with stats.node('origin') as origin:
+            origin.attribute('city', 'Tokyo')
+    # Then
+    assert builder.data['all_dishes'] == [{'dish_name': 'Ramen', 'tags': ['hot']}]
+    assert json.loads(builder.to_json()) == {
+        'menu_title': 'Menu',
+        'dish_stats': {'view_count': 2, 'origin': {'country': 'Japan', 'city': 'Tokyo'}},
+        'a: b': 1,
+        'all_dishes': [{'dish_name': 'Ramen', 'tags': ['hot']}],
+    }
+
+@pytest.mark.parametrize('document', [
+    '# Menu\ntitle: Menu\n',
+    'base: &base\n  size: 1\ndish:\n  <<: *base\n',
+    '{title: Menu}',
+])
+def test_load_yaml_at_once(document):
+    # When
+    builder = SpytulaBuilder.load_yaml(io.BytesIO(document.encode()))
+    # Then
+    assert isinstance(builder.data, LazyObject)
+    assert json.loads(builder.to_json())
+
+@pytest.mark.parametrize('document', [
+    'title: "multi\nline: x"\nsize: 1\n',
+    "title: 'it''s\nline: x'\nsize: 1\n",
+    'tags: [hot,\nsize: 2]\nrating: 3\n',
+    'origin: {country: Japan,\nsize: 2}\nrating: 3\n',
+    'title: |\n  it\'s "open\nsize: 1\n',
+])
+def test_load_yaml_spanning_entries(document):
+    # When
+    builder = SpytulaBuilder.load_yaml(io.BytesIO(document.encode()))
+    # Then
+    assert json.loads(builder.to_json()) == yaml.safe_load(document)
+
+def test_load_yaml_closed_entries_are_lazy():
+    # Given
+    document = 'title: it\'s # "open\ntags: ["hot", {a: "b"}] # [\nsize: x[1\n'
+    # When
+    builder = SpytulaBuilder.load_yaml(io.BytesIO(document.encode()))
+    # Then
+    assert all(isinstance(dict.__getitem__(builder.data, key), YAMLEntry) for key in builder.data)
+    assert not deferred.has_pending()
+    assert json.loads(builder.to_json()) == yaml.safe_load(document)
+
+def test_load_yaml_expects_mapping():
+    with pytest.raises(ValueError):
+        SpytulaBuilder.load_yaml(io.BytesIO(b'- Ramen\n- Pho\n'))
@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+
+from spytula.builder import SpytulaBuilder
+from spytula.node import SpytulaNode
+
+@pytest.fixture
+def builder():
+    return SpytulaBuilder()
+
+def test_node_has_no_instance_dict():
+    with pytest.raises(AttributeError):
+        SpytulaNode().__dict__
+
+def test_node_children_are_light_builders(builder):
+    # When
+    with builder.node('dish') as dish:
+        dish.attribute('name', 'Ramen')
+    # Then
+    assert isinstance(dish, SpytulaBuilder)
+    assert vars(dish) == {}
+    assert dish.to_json() == '{"name": "Ramen"}'
+    assert type(builder.data['dish']) is dict
+
+def test_node_children_are_instances_of_builder_subclass():
+    # Given
+    class DishBuilder(SpytulaBuilder):
+        def dish(self, name):
+            self.attribute('name', name)
+    builder = DishBuilder()
+    builder.track_changes()
+    builder.limits(max_items=1, overflow='truncate')
+    # When
+    with builder.node('menu') as menu:
+        for dish_builder, name in menu.each('dishes', ['Ramen', 'Udon']):
+            dish_builder.dish(name)
+    # Then
+    assert isinstance(menu, DishBuilder)
+    assert isinstance(dish_builder, DishBuilder)
+    assert builder.data == {'menu': {'dishes': [{'name': 'Ramen'}]}}
+
+def test_node_children_of_builder_subclass_with_init():
+    # Given
+    class DishBuilder(SpytulaBuilder):
+        def __init__(self):
+            super().__init__()
+            self.currency = 'JPY'
+    # When
+    with DishBuilder().node('dish') as dish:
+        pass
+    # Then
+    assert dish.currency == 'JPY'
+
+def test_node_class_can_be_customized():
+    # Given
+    class DishNode(SpytulaNode):
+        __slots__ = ()
+        def dish(self, name):
+            self.attribute('name', name)
+    class DishBuilder(SpytulaBuilder):
+        _node_class = DishNode
+    builder = DishBuilder()
+    # When
+    for dish_builder, name in builder.each('dishes', ['Ramen', 'Udon']):
+        dish_builder.dish(name)
+    # Then
+    assert builder.data == {'dishes': [{'name': 'Ramen'}, {'name': 'Udon'}]}
+
+async def cursor(items):
+    for item in items:
+        yield item
+
+def test_node_with_async_with(builder):
+    # Given
+    async def build():
+        async with builder.node('dish') as dish:
+            dish.attribute('name', 'Ramen')
+        async with builder.nodes('ingredients') as add_ingredient:
+            async with add_ingredient() as ingredient:
+                ingredient.attribute('name', 'Noodles')
+    # When
+    asyncio.run(build())
+    # Then
+    assert builder.data == {'dish': {'name': 'Ramen'}, 'ingredients': [{'name': 'Noodles'}]}
+
+def test_node_is_not_added_on_error(builder):
+    # When
+    with pytest.raises(KeyError):
+        with builder.node('dish') as dish:
+            dish.attribute('name', {}['name'])
+    # Then
+    assert builder.data == {}
+
+def test_aeach_with_async_iterable(builder):
+    # Given
+    async def build():
+        async for dish, name in builder.aeach('dishes', cursor(['Ramen', 'Udon'])):
+            dish.attribute('name', name)
+    # When
+    asyncio.run(build())
+    # Then
+    assert builder.data == {'dishes': [{'name': 'Ramen'}, {'name': 'Udon'}]}
+
+def test_aeach_with_iterable(builder):
+    # Given
+    async def build():
+        async for dish, name in builder.aeach('dishes', ['Ramen']):
+            dish.attribute('name', name)
+    # When
+    asyncio.run(build())
+    # Then
+    assert builder.data == {'dishes': [{'name': 'Ramen'}]}
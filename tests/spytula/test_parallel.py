@@ -0,0 +1,78 @@
+import pytest
+import json
+from concurrent.futures import ThreadPoolExecutor
+from spytula.builder import SpytulaBuilder
+from spytula.parallel import render_chunk
+
+def render_dish(dish_builder, dish):
+    dish_builder.attribute('dish_name', dish['name'])
+
+@pytest.fixture()
+def builder():
+    return SpytulaBuilder()
+
+@pytest.fixture()
+def dishes():
+    return [{'name': f'Ramen {index}'} for index in range(25)]
+
+def test_render_parallel_keeps_order(builder, dishes):
+    # When
+    json_output = builder.render_parallel(dishes, render_dish, workers=2, chunk_size=4)
+    # Then
+    assert json.loads(json_output) == [{'dish_name': dish['name']} for dish in dishes]
+
+def test_render_parallel_matches_to_json(builder, dishes):
+    # Given
+    for dish_builder, dish in builder.each('dishes', dishes):
+        render_dish(dish_builder, dish)
+    expected = builder.to_json()
+    # When
+    json_output = SpytulaBuilder().render_parallel(dishes, render_dish, workers=2, chunk_size=7)
+    # Then
+    assert '{"dishes": ' + json_output + '}' == expected
+
+def test_render_parallel_with_key_format_and_root(builder, dishes):
+    # Given
+    builder.root('dish')
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    json_output = builder.render_parallel(dishes[:3], lambda dish_builder, dish: dish_builder.attribute('dish', dish),
+                                          executor=ThreadPoolExecutor(2), chunk_size=2)
+    # Then
+    assert json.loads(json_output) == dishes[:3]
+
+def test_render_parallel_ndjson(builder, dishes):
+    # Given
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    ndjson_output = builder.render_parallel(dishes, render_dish, workers=2, chunk_size=10, ndjson=True)
+    # Then
+    assert ndjson_output == builder.to_ndjson(dishes, render_dish)
+
+def test_render_parallel_empty(builder):
+    # When
+    assert builder.render_parallel([], render_dish, workers=2) == '[]'
+    assert builder.render_parallel([], render_dish, workers=2, ndjson=True) == ''
+
+def test_render_parallel_with_indent(builder, dishes):
+    with pytest.raises(ValueError):
+        builder.render_parallel(dishes, render_dish, workers=2, indent=2)
+
+def test_render_parallel_resolves_backend(builder, monkeypatch):
+    # Given
+    from spytula.serializers import backends
+    monkeypatch.setattr(backends, '_default_backend', 'json')
+    backends.set_json_backend('auto')
+    # When
+    config = builder._parallel_config()
+    # Then
+    assert config['json_backend'] == backends.get_json_backend('auto').name
+    assert config['json_backend'] in backends.AUTO_BACKENDS
+
+def test_render_chunk_with_separators(builder, dishes):
+    # Given
+    config = builder._parallel_config(separators=(',', ':'))
+    # When
+    chunk = render_chunk(config, render_dish, dishes[:2], False)
+    # Then
+    assert chunk == '{"dish_name":"Ramen 0"},{"dish_name":"Ramen 1"}'
@@ -0,0 +1,269 @@
+import pytest
+import copy
+import json
+from spytula.builder import SpytulaBuilder
+from spytula.patch import Snapshot, to_plain
+from spytula.tracking import TrackedDict, TrackedList
+
+def resolve_pointer(document, path):
+    parts = [part.replace('~1', '/').replace('~0', '~') for part in path.split('/')[1:]]
+    for part in parts[:-1]:
+        document = document[int(part) if isinstance(document, list) else part]
+    return document, parts[-1]
+
+def apply_patch(document, operations):
+    document = copy.deepcopy(document)
+    for operation in operations:
+        if operation['path'] == '':
+            document = operation['value']
+            continue
+        if operation['op'] == 'move':
+            parent, key = resolve_pointer(document, operation['from'])
+            value = parent.pop(int(key))
+        else:
+            value = operation.get('value')
+        parent, key = resolve_pointer(document, operation['path'])
+        if isinstance(parent, list):
+            if operation['op'] in ('add', 'move'):
+                parent.insert(int(key), value)
+            elif operation['op'] == 'remove':
+                del parent[int(key)]
+            else:
+                parent[int(key)] = value
+        elif operation['op'] == 'remove':
+            del parent[key]
+        else:
+            parent[key] = value
+    return document
+
+def apply_merge_patch(document, patch):
+    if not isinstance(patch, dict):
+        return patch
+    document = copy.deepcopy(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            document.pop(key, None)
+        else:
+            document[key] = apply_merge_patch(document.get(key), value)
+    return document
+
+def build(dishes, title='Menu'):
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.track_changes()
+    builder.attribute('menu_title', title)
+    for dish_builder, dish in builder.each('all_dishes', dishes):
+        dish_builder.attributes(dish, ['dish_id', 'dish_name'])
+    return builder
+
+DISHES = [{'dish_id': index, 'dish_name': f'Ramen {index}'} for index in range(5)]
+
+@pytest.mark.parametrize('new_dishes', [
+    DISHES,
+    DISHES + [{'dish_id': 5, 'dish_name': 'Pho'}],
+    [{'dish_id': 5, 'dish_name': 'Pho'}] + DISHES,
+    DISHES[1:],
+    DISHES[:2] + DISHES[3:],
+    list(reversed(DISHES)),
+    [dict(DISHES[0], dish_name='Udon')] + DISHES[1:],
+    [],
+])
+@pytest.mark.parametrize('list_keys', [None, {'all_dishes': 'dish_id'}])
+def test_diff_between_builders(new_dishes, list_keys):
+    # Given
+    snapshot = build(DISHES).snapshot()
+    new_builder = build(new_dishes, 'Lunch')
+    # When
+    operations = new_builder.diff(snapshot, list_keys=list_keys)
+    # Then
+    assert apply_patch(snapshot.data, operations) == json.loads(new_builder.to_json())
+    assert json.loads(json.dumps(operations)) == operations
+
+def test_diff_keyed_list_moves_items():
+    # Given
+    snapshot = build(DISHES).snapshot()
+    # When
+    operations = build(DISHES[1:] + DISHES[:1]).diff(snapshot, list_keys={'all_dishes': 'dish_id'})
+    # Then
+    assert operations == [{'op': 'move', 'from': '/allDishes/0', 'path': '/allDishes/4'}]
+
+def test_diff_keyed_list_with_missing_ids():
+    # Given
+    snapshot = build(DISHES).snapshot()
+    # When
+    operations = build([{'dish_id': 1, 'dish_name': 'Pho'}, {'dish_id': 1, 'dish_name': 'Udon'}]).diff(
+        snapshot, list_keys={'all_dishes': 'dish_id'})
+    # Then
+    assert operations == [
+        {'op': 'remove', 'path': '/allDishes/4'},
+        {'op': 'remove', 'path': '/allDishes/3'},
+        {'op': 'remove', 'path': '/allDishes/2'},
+        {'op': 'replace', 'path': '/allDishes/0/dishId', 'value': 1},
+        {'op': 'replace', 'path': '/allDishes/0/dishName', 'value': 'Pho'},
+        {'op': 'replace', 'path': '/allDishes/1/dishName', 'value': 'Udon'},
+    ]
+
+def test_diff_positional_list_trims_unchanged_items():
+    # Given
+    builder = build(DISHES)
+    snapshot = builder.snapshot()
+    dishes = builder.data['all_dishes']
+    # When
+    builder.attribute('all_dishes', dishes[:2] + [{'dish_id': 9}] + dishes[2:])
+    # Then
+    assert builder.diff(snapshot) == [{'op': 'add', 'path': '/allDishes/2', 'value': {'dishId': 9}}]
+
+def test_diff_after_changes():
+    # Given
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.track_changes()
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 1)
+    with builder.nodes('all_dishes') as add_dish:
+        with add_dish() as dish:
+            dish.attribute('dish_name', 'Ramen')
+    snapshot = builder.snapshot()
+    # When
+    stats.attribute('view_count', 2)
+    with add_dish() as dish:
+        dish.attribute('dish_name', 'Pho')
+    builder.merge({'is_open': True})
+    # Then
+    assert builder.diff(snapshot) == [
+        {'op': 'add', 'path': '/isOpen', 'value': True},
+        {'op': 'replace', 'path': '/dishStats/viewCount', 'value': 2},
+        {'op': 'add', 'path': '/allDishes/1', 'value': {'dishName': 'Pho'}},
+    ]
+
+def test_diff_skips_unchanged_tracked_nodes():
+    # Given
+    builder = build(DISHES)
+    with builder.node('dish_stats') as stats:
+        stats.attribute('updated_at', object())
+    snapshot = builder.snapshot(default=lambda o: 'object')
+    # When
+    builder.attribute('menu_title', 'Lunch')
+    # Then the unchanged nodes, which can't be converted without default, aren't compared
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/menuTitle', 'value': 'Lunch'}]
+    assert builder.merge_patch(snapshot) == {'menuTitle': 'Lunch'}
+    # When
+    stats.attribute('view_count', 1)
+    # Then
+    with pytest.raises(TypeError):
+        builder.diff(snapshot)
+
+def test_diff_without_tracking():
+    # Given
+    builder = SpytulaBuilder()
+    builder.attribute('dish', {'name': 'Ramen', 'tags': ['hot']})
+    snapshot = builder.snapshot()
+    # When
+    builder.attribute('dish', {'name': 'Ramen', 'tags': ['hot', 'spicy']})
+    # Then
+    assert builder.diff(snapshot) == [{'op': 'add', 'path': '/dish/tags/1', 'value': 'spicy'}]
+
+def test_diff_escapes_pointers():
+    # Given
+    builder = SpytulaBuilder()
+    snapshot = builder.snapshot()
+    # When
+    builder.attribute('a/b~c', 1)
+    # Then
+    assert builder.diff(snapshot) == [{'op': 'add', 'path': '/a~1b~0c', 'value': 1}]
+
+def test_diff_frozen_builders():
+    # Given
+    author = SpytulaBuilder()
+    author.attribute('chef_name', 'Ivan')
+    frozen_author = author.freeze()
+    builder = SpytulaBuilder()
+    builder.attribute('author', frozen_author)
+    snapshot = builder.snapshot()
+    # When
+    new_builder = SpytulaBuilder()
+    new_builder.attribute('author', frozen_author)
+    other_author = SpytulaBuilder()
+    other_author.attribute('chef_name', 'Yuki')
+    newer_builder = SpytulaBuilder()
+    newer_builder.attribute('author', other_author.freeze())
+    # Then
+    assert new_builder.diff(snapshot) == []
+    assert newer_builder.diff(snapshot) == [{'op': 'replace', 'path': '/author/chef_name', 'value': 'Yuki'}]
+
+def test_diff_frozen_builders_with_key_format():
+    # Given
+    author = SpytulaBuilder()
+    author.attribute('chef_name', 'Ivan')
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    builder.attribute('author_info', author.freeze())
+    snapshot = builder.snapshot()
+    # When
+    author.attribute('chef_name', 'Yuki')
+    builder.attribute('author_info', author.freeze())
+    # Then the keys of the snapshots are formatted like the keys of the builder
+    assert snapshot.data == {'authorInfo': {'chefName': 'Ivan'}}
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/authorInfo/chefName', 'value': 'Yuki'}]
+    assert builder.merge_patch(snapshot) == {'authorInfo': {'chefName': 'Yuki'}}
+
+def test_diff_type_change():
+    # Given
+    builder = SpytulaBuilder()
+    builder.attribute('rating', 1)
+    snapshot = builder.snapshot()
+    # When
+    builder.attribute('rating', True)
+    # Then
+    assert builder.diff(snapshot) == [{'op': 'replace', 'path': '/rating', 'value': True}]
+
+def test_merge_patch():
+    # Given
+    builder = build(DISHES)
+    with builder.node('dish_stats') as stats:
+        stats.attribute('view_count', 1)
+        stats.attribute('like_count', 1)
+    snapshot = builder.snapshot()
+    # When
+    stats.attribute('view_count', 2)
+    del builder.data['menu_title']
+    # Then
+    merge_patch = builder.merge_patch(snapshot)
+    assert merge_patch == {'menuTitle': None, 'dishStats': {'viewCount': 2}}
+    assert apply_merge_patch(snapshot.data, merge_patch) == json.loads(builder.to_json())
+
+def test_merge_patch_unchanged():
+    # Given
+    builder = build(DISHES)
+    snapshot = builder.snapshot()
+    # Then
+    assert builder.merge_patch(snapshot) == {}
+    assert build(DISHES).merge_patch(snapshot) == {}
+
+def test_snapshot_is_plain_json():
+    # Given
+    builder = build(DISHES)
+    # When
+    snapshot = builder.snapshot()
+    # Then
+    assert isinstance(snapshot, Snapshot)
+    assert snapshot.data == json.loads(builder.to_json())
+    assert type(snapshot.data) is dict
+
+def test_to_plain():
+    assert to_plain({'dish_name': ('Ramen', {1: None})}, str.upper) == {'DISH_NAME': ['Ramen', {'1': None}]}
+    with pytest.raises(TypeError):
+        to_plain({'dish': object()})
+    assert to_plain({'dish': object()}, default=lambda o: 'object') == {'dish': 'object'}
+
+def test_tracked_containers():
+    # Given
+    data, items = TrackedDict(), TrackedList()
+    versions = [data._version, items._version]
+    # When
+    data['name'] = 'Ramen'
+    items.append(1)
+    # Then
+    assert data._version > versions[0]
+    assert items._version > versions[1]
+    assert data == {'name': 'Ramen'} and items == [1]
@@ -0,0 +1,113 @@
+import pytest
+import io
+import json
+import threading
+import spytula
+from spytula.builder import SpytulaBuilder
+from spytula.profiling import add_observer, remove_observer, _observers
+
+def build():
+    builder = SpytulaBuilder()
+    builder.key_format(camelize={'uppercase_first_letter': False})
+    for dish_builder, name in builder.each('all_dishes', ['Shoyu', 'Miso']):
+        dish_builder.attribute('dish_name', name)
+    return builder
+
+def test_profile_to_json():
+    # When
+    with spytula.profile() as stats:
+        builder = build()
+        json_output = builder.to_json()
+    # Then
+    record, = stats.records
+    assert record.operation == 'to_json'
+    assert record.build_seconds > 0
+    assert record.format_seconds > 0
+    assert record.encode_seconds > 0
+    assert (record.nodes, record.attributes) == (3, 3)
+    assert record.keys_formatted == 3
+    assert record.key_cache_hits + record.key_cache_misses == 3
+    assert record.output_bytes == len(json_output)
+
+def test_profile_stats_totals():
+    # Given
+    builder = build()
+    # When
+    with spytula.profile() as stats:
+        builder.to_json()
+        builder.to_json_bytes()
+    # Then
+    assert [record.operation for record in stats.records] == ['to_json', 'to_json_bytes']
+    assert stats.build_seconds == 0
+    assert stats.attributes == 6
+    assert stats.key_cache_hit_rate == 1
+    assert stats.output_bytes == 2 * len(builder.to_json())
+
+@pytest.mark.parametrize('serialize, operation', [
+    (lambda builder: ''.join(builder.iter_json()), 'iter_json'),
+    (lambda builder: builder.dump_json(io.StringIO()), 'dump_json'),
+    (lambda builder: builder.to_yaml(), 'to_yaml'),
+    (lambda builder: builder.dump_yaml(io.StringIO()), 'dump_yaml'),
+])
+def test_profile_other_serializations(serialize, operation):
+    # Given
+    builder = build()
+    builder.attribute('title', 'Café')
+    # When
+    with spytula.profile() as stats:
+        serialize(builder)
+    # Then
+    record, = stats.records
+    assert record.operation == operation
+    assert record.attributes == 4
+    assert record.output_bytes > 0
+
+def test_profile_key_cache_ignores_other_threads():
+    # Given
+    builder = build()
+    def format_other_keys():
+        for index in range(5):
+            builder._key_formatter(f'other_thread_key_{index}_{id(builder)}')
+    # When
+    with spytula.profile() as stats:
+        chunks = builder.iter_json()
+        next(chunks)
+        thread = threading.Thread(target=format_other_keys)
+        thread.start()
+        thread.join()
+        list(chunks)
+    # Then
+    record, = stats.records
+    assert record.keys_formatted == 3
+    assert record.key_cache_hits + record.key_cache_misses == 3
+
+def test_profile_counts_utf8_bytes():
+    # Given
+    builder = SpytulaBuilder()
+    builder.attribute('name', 'Café')
+    # When
+    with spytula.profile() as stats:
+        json_output = builder.to_json(ensure_ascii=False)
+    # Then
+    assert stats.output_bytes == len(json_output.encode('utf-8')) == len(json_output) + 1
+
+def test_observer():
+    # Given
+    records = []
+    add_observer(records.append)
+    # When
+    try:
+        build().to_json()
+    finally:
+        remove_observer(records.append)
+    build().to_json()
+    # Then
+    assert len(records) == 1
+    assert _observers == []
+
+def test_profiling_disabled():
+    # When
+    builder = build()
+    # Then
+    assert builder._created_at is None
+    assert json.loads(builder.to_json()) == {'allDishes': [{'dishName': 'Shoyu'}, {'dishName': 'Miso'}]}
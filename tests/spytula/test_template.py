@@ -0,0 +1,122 @@
+import pytest
+
+from collections import namedtuple
+
+from spytula.builder import SpytulaBuilder
+from spytula.template import Template
+
+Ingredient = namedtuple('Ingredient', ['name', 'type', 'spicy'])
+
+@pytest.fixture
+def ingredients():
+    return [
+        {'name': 'Noodles', 'type': 'Main', 'spicy': False, 'origin': {'country': 'Japan'}},
+        {'name': 'Chili', 'type': 'Flavoring', 'spicy': True, 'origin': {'country': 'Mexico'}},
+    ]
+
+@pytest.fixture
+def template():
+    return SpytulaBuilder.template()
+
+def test_template_attributes(template, ingredients):
+    # Given
+    template.attributes(['name', 'type'])
+    # When
+    data = template.render_many(ingredients)
+    # Then
+    assert data == [{'name': 'Noodles', 'type': 'Main'}, {'name': 'Chili', 'type': 'Flavoring'}]
+
+def test_template_attribute_with_callable(template, ingredients):
+    # Given
+    template.attribute('type', lambda ingredient: ingredient['type'].upper())
+    # When
+    data = template.render(ingredients[0])
+    # Then
+    assert data == {'type': 'MAIN'}
+
+def test_template_when(template, ingredients):
+    # Given
+    template.attribute('name')
+    template.when('spicy', 'spicy', lambda spicy: spicy)
+    template.attribute('type')
+    # When
+    data = template.render_many(ingredients)
+    # Then
+    assert data == [{'name': 'Noodles', 'type': 'Main'}, {'name': 'Chili', 'spicy': True, 'type': 'Flavoring'}]
+
+def test_template_node(template, ingredients):
+    # Given
+    template.attribute('name')
+    with template.node('origin') as origin:
+        origin.attribute('country', lambda ingredient: ingredient['origin']['country'])
+    # When
+    data = template.render(ingredients[1])
+    # Then
+    assert data == {'name': 'Chili', 'origin': {'country': 'Mexico'}}
+
+def test_template_nodes(template, ingredients):
+    # Given
+    template.attribute('name', lambda dish: 'Ramen')
+    with template.nodes('ingredients', lambda dish: dish) as ingredient:
+        ingredient.attribute('name')
+    # When
+    data = template.render(ingredients)
+    # Then
+    assert data == {'name': 'Ramen', 'ingredients': [{'name': 'Noodles'}, {'name': 'Chili'}]}
+
+def test_template_objects(template):
+    # Given
+    template.attributes(['name', 'spicy'])
+    # When
+    data = template.render_many([Ingredient('Noodles', 'Main', False), {'name': 'Chili', 'spicy': True}])
+    # Then
+    assert data == [{'name': 'Noodles', 'spicy': False}, {'name': 'Chili', 'spicy': True}]
+
+def test_template_objects_with_keyword_attributes(template):
+    # Given
+    dish = type('Dish', (), {'name': 'Ramen', 'class': 'Main'})()
+    template.attribute('class')
+    template.attribute('dish_name', 'name')
+    # When
+    data = template.render_many([dish])
+    # Then
+    assert data == [{'class': 'Main', 'dish_name': 'Ramen'}]
+
+def test_template_key_format(template, ingredients):
+    # Given
+    template.attribute('ingredient_name', 'name')
+    with template.node('ingredient_origin') as origin:
+        origin.attribute('origin_country', lambda ingredient: ingredient['origin']['country'])
+    template.key_format(camelize={'uppercase_first_letter': False})
+    # When
+    data = template.render(ingredients[0])
+    # Then
+    assert data == {'ingredientName': 'Noodles', 'ingredientOrigin': {'originCountry': 'Japan'}}
+
+def test_template_matches_builder(template, ingredients):
+    # Given
+    builder = SpytulaBuilder()
+    for ingredient_builder, ingredient in builder.each('ingredients', ingredients):
+        ingredient_builder.attributes(ingredient, ['name', 'type'])
+    template.attributes(['name', 'type'])
+    # When
+    other_builder = SpytulaBuilder()
+    other_builder.attribute('ingredients', template.render_many(ingredients))
+    # Then
+    assert other_builder.to_json() == builder.to_json()
+
+def test_template_invalid_condition(template):
+    with pytest.raises(TypeError):
+        template.when('spicy', 'spicy', 'yes')
+
+def test_template_recompiles_when_changed(template, ingredients):
+    # Given
+    template.attribute('name')
+    template.render(ingredients[0])
+    # When
+    template.attribute('type')
+    # Then
+    assert template.render(ingredients[0]) == {'name': 'Noodles', 'type': 'Main'}
+
+def test_template_class():
+    assert isinstance(SpytulaBuilder.template(), Template)